@@ -4,17 +4,18 @@
 
 import os
 import logging
-from flask import Flask, render_template, request, jsonify, redirect, url_for
+import threading
+from flask import Flask, render_template, request, jsonify, redirect, url_for, abort, Response
 from config.settings import Settings
-from controllers.arduino_controller import ArduinoController
-from controllers.camera_controller import CameraController
-from controllers.turntable_controller import TurntableController
+from controllers.station_manager import StationRegistry
 from models.project import Project, ProjectManager
 from utils.arduino_finder import ArduinoFinder
 from utils.camera_finder import CameraFinder
 from utils.path_manager import PathManager
 from utils.image_processor import ImageProcessor
-from utils.background_remover import BackgroundRemover
+from utils.thumbnail_cache import ThumbnailCache
+from utils.http_cache import send_cached_file, send_cached_from_directory, versioned_url
+from utils import metrics
 
 # Logger konfigurieren
 logging.basicConfig(
@@ -39,16 +40,43 @@ settings = Settings()
 # Controller initialisieren
 arduino_finder = ArduinoFinder()
 camera_finder = CameraFinder()
-arduino_controller = None
-camera_controller = None
-turntable_controller = None
 
 # Projektverwaltung initialisieren
 project_manager = ProjectManager(path_manager.projects_dir)
 
 # Bildverarbeitung initialisieren
 image_processor = ImageProcessor(path_manager)
-background_remover = BackgroundRemover()
+
+# Hintergrundentfernung erst bei Bedarf erstellen (lädt OpenCV und ggf. PyTorch)
+_background_remover = None
+_background_remover_lock = threading.Lock()
+
+def get_background_remover():
+    """Gibt den BackgroundRemover zurück und erstellt ihn beim ersten Aufruf"""
+    global _background_remover
+    with _background_remover_lock:
+        if _background_remover is None:
+            from utils.background_remover import BackgroundRemover
+            from utils.transparent_writer import TransparentWriter
+            _background_remover = BackgroundRemover(TransparentWriter.from_settings(settings))
+        return _background_remover
+
+# Vorschaubilder initialisieren
+thumbnail_cache = ThumbnailCache(path_manager.cache_dir)
+
+# Aufnahmestationen (je Station eigene Controller, Sperre und Auftragswarteschlange)
+station_registry = StationRegistry(settings, project_manager.get_project)
+
+# Länge der Auftragswarteschlangen erst beim Abruf der Metriken bestimmen
+metrics.QUEUE_DEPTH.set_function(
+    lambda: {('jobs', station.id): station.queue_depth() for station in station_registry.get_all()})
+
+def get_station():
+    """Gibt die im Request angegebene Station zurück (Parameter 'station', sonst Standardstation)"""
+    station = station_registry.get(request.values.get('station'))
+    if station is None:
+        abort(404)
+    return station
 
 @app.route('/')
 def index():
@@ -103,30 +131,31 @@ def delete_project(project_id):
 @app.route('/project/<project_id>/capture', methods=['GET', 'POST'])
 def capture_session(project_id):
     """Eine neue Aufnahmesession für ein Projekt starten"""
-    global arduino_controller, camera_controller, turntable_controller
-    
     project = project_manager.get_project(project_id)
     if not project:
         return redirect(url_for('index'))
     
-    if not arduino_controller:
-        arduino_controller = ArduinoController(settings.arduino_port, settings.arduino_baudrate)
-    
-    if not camera_controller:
-        camera_controller = CameraController(settings.camera_type, settings.camera_device)
-    
-    if not turntable_controller:
-        turntable_controller = TurntableController(arduino_controller, project.angle_step)
-    
     if request.method == 'POST':
-        # Session starten und Fotos machen
-        if turntable_controller.start_session(project, camera_controller):
-            return redirect(url_for('view_project', project_id=project_id))
-        else:
-            error = "Fehler beim Starten der Aufnahmesession"
-            return render_template('capture.html', project=project, error=error)
+        station = get_station()
+        
+        # Auftrag in die Warteschlange der Station stellen (Start-Stopp oder eine durchgehende Umdrehung)
+        kind = 'continuous' if request.form.get('mode') == 'continuous' else 'capture'
+        station.submit(kind, project_id)
+        
+        # Die Session erscheint sofort im Zustand "läuft" im Projekt
+        return redirect(url_for('view_project', project_id=project_id))
+    
+    return render_template('capture.html', project=project, stations=station_registry.get_all())
+
+@app.route('/project/<project_id>/session/<session_id>/resume', methods=['POST'])
+def resume_session(project_id, session_id):
+    """Eine abgebrochene Aufnahmesession fortsetzen (nur fehlende Winkel aufnehmen)"""
+    project = project_manager.get_project(project_id)
+    if not project or not project.get_session(session_id):
+        abort(404)
     
-    return render_template('capture.html', project=project)
+    get_station().submit('resume', project_id, session_id)
+    return redirect(url_for('view_project', project_id=project_id))
 
 @app.route('/settings', methods=['GET', 'POST'])
 def app_settings():
@@ -144,6 +173,9 @@ def app_settings():
         # Einstellungen speichern
         settings.save()
         
+        # Controller der Stationen mit den neuen Einstellungen neu erstellen
+        station_registry.reload()
+        
         return redirect(url_for('index'))
     
     # Arduino-Ports finden
@@ -172,6 +204,65 @@ def view_360(project_id, session_id):
     
     return render_template('viewer.html', project=project, session=session)
 
+@app.route('/thumbnail/<project_id>/<session_id>')
+@app.route('/thumbnail/<project_id>/<session_id>/<int:angle>')
+def session_thumbnail(project_id, session_id, angle=None):
+    """Liefert ein Vorschaubild für eine Session (erstes Foto oder bestimmter Winkel)"""
+    project = project_manager.get_project(project_id)
+    if not project:
+        abort(404)
+    
+    session = project.get_session(session_id)
+    if not session:
+        abort(404)
+    
+    if angle is None:
+        photos = session.get_all_photos()
+        photo_path = photos[0] if photos else None
+    else:
+        photo_path = session.get_photo(angle)
+    
+    if not photo_path or not os.path.exists(photo_path):
+        abort(404)
+    
+    size = request.args.get('size', ThumbnailCache.DEFAULT_SIZE, type=int)
+    size = max(32, min(size, 1024))
+    fmt = 'webp' if request.args.get('format') == 'webp' else 'jpeg'
+    
+    thumbnail_path = thumbnail_cache.get_thumbnail(photo_path, size, fmt)
+    if not thumbnail_path:
+        abort(500)
+    
+    return send_cached_file(thumbnail_path)
+
+@app.template_global()
+def session_media_url(project, session, photo_path):
+    """Erzeugt eine inhaltsadressierte URL (?v=<Version>) für eine Session-Datei"""
+    session_path = os.path.join(project.path, "sessions", session.id)
+    filename = os.path.relpath(photo_path, session_path)
+    url = url_for('serve_session_file', project_id=project.id, session_id=session.id, filename=filename)
+    return versioned_url(url, photo_path)
+
+@app.route('/media/<project_id>/<session_id>/<path:filename>')
+def serve_session_file(project_id, session_id, filename):
+    """Liefert Session-Fotos und transparente PNGs mit HTTP-Caching aus"""
+    project = project_manager.get_project(project_id)
+    if not project or not project.get_session(session_id):
+        abort(404)
+    
+    session_path = os.path.join(project.path, "sessions", session_id)
+    return send_cached_from_directory(session_path, filename)
+
+@app.route('/exports/<path:filename>')
+def serve_export_file(filename):
+    """Liefert exportierte Viewer-Dateien mit HTTP-Caching aus"""
+    return send_cached_from_directory(path_manager.exports_dir, filename)
+
+@app.route('/temp/<filename>')
+def serve_temp_file(filename):
+    """Liefert temporäre Testbilder mit HTTP-Caching aus"""
+    return send_cached_from_directory(path_manager.temp_dir, filename)
+
 @app.route('/logs')
 def view_logs():
     """Anzeige der Anwendungslogs"""
@@ -193,6 +284,7 @@ def view_logs():
 @app.route('/project/<project_id>/session/<session_id>/background-removal')
 def background_removal(project_id, session_id):
     """Hintergrundentfernung für eine Fotosession"""
+    background_remover = get_background_remover()
     project = project_manager.get_project(project_id)
     if not project:
         return redirect(url_for('index'))
@@ -223,53 +315,99 @@ def api_project_sessions(project_id):
     sessions = [session.to_dict() for session in project.sessions]
     return jsonify(sessions)
 
+@app.route('/api/stations')
+def api_stations():
+    """API-Endpunkt mit dem Zustand aller Aufnahmestationen"""
+    return jsonify([station.get_status() for station in station_registry.get_all()])
+
+@app.route('/api/stations/<station_id>/jobs', methods=['GET', 'POST'])
+def api_station_jobs(station_id):
+    """API-Endpunkt für die Aufnahmeaufträge einer Station (POST stellt einen Auftrag ein)"""
+    station = station_registry.get(station_id)
+    if station is None:
+        abort(404)
+    
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or request.form
+        project_id = data.get('project_id')
+        if not project_manager.get_project(project_id):
+            return jsonify({'success': False, 'error': 'Projekt nicht gefunden'}), 404
+        
+        try:
+            job = station.submit(data.get('kind', 'capture'), project_id, data.get('session_id'))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        return jsonify({'success': True, 'job': job}), 202
+    
+    return jsonify(sorted(station.jobs.values(), key=lambda job: job['submitted'], reverse=True))
+
+@app.route('/api/jobs/<job_id>')
+def api_job_status(job_id):
+    """API-Endpunkt für den Zustand eines Aufnahmeauftrags"""
+    job = station_registry.find_job(job_id)
+    if job is None:
+        abort(404)
+    return jsonify(job)
+
 @app.route('/api/turntable/move', methods=['POST'])
 def api_move_turntable():
     """API-Endpunkt zum Bewegen des Drehtellers"""
-    global arduino_controller, turntable_controller
-    
-    if not arduino_controller:
-        arduino_controller = ArduinoController(settings.arduino_port, settings.arduino_baudrate)
-    
-    if not turntable_controller:
-        turntable_controller = TurntableController(arduino_controller, 5)
-    
+    station = get_station()
     degrees = int(request.form.get('degrees', 5))
-    success = turntable_controller.move_degrees(degrees)
+    
+    with station.lock:
+        success = station.get_turntable().move_degrees(degrees)
     
     return jsonify({'success': success})
 
 @app.route('/api/camera/capture', methods=['POST'])
 def api_capture_photo():
     """API-Endpunkt zum Aufnehmen eines Fotos"""
-    global camera_controller
-    
-    if not camera_controller:
-        camera_controller = CameraController(settings.camera_type, settings.camera_device)
+    station = get_station()
     
     project_id = request.form.get('project_id')
     session_id = request.form.get('session_id')
     angle = int(request.form.get('angle', 0))
     
     photo_path = path_manager.get_photo_path(project_id, session_id, angle)
-    success = camera_controller.capture_photo(photo_path)
+    with station.lock:
+        success = station.get_camera().capture_photo(photo_path)
     
     return jsonify({'success': success, 'path': photo_path if success else None})
 
+@app.route('/api/camera/capabilities')
+def api_camera_capabilities():
+    """API-Endpunkt für die unterstützten Formate, Auflösungen und Bildraten einer Webcam"""
+    from utils.camera_capabilities import camera_capabilities
+    
+    device = request.args.get('device', settings.camera_device)
+    refresh = request.args.get('refresh', 'false').lower() == 'true'
+    
+    capabilities = camera_capabilities.get_capabilities(device, refresh=refresh)
+    if capabilities is None:
+        return jsonify({'error': 'Fähigkeiten konnten nicht ermittelt werden', 'device': device}), 404
+    
+    width, height = settings.get_camera_width_height()
+    capabilities['recommended'] = camera_capabilities.choose_format(device, width, height)
+    return jsonify(capabilities)
+
 @app.route('/api/background/remove', methods=['POST'])
 def api_remove_background():
     """API-Endpunkt zur Hintergrundentfernung für ein einzelnes Bild"""
+    background_remover = get_background_remover()
     image_path = request.form.get('image_path')
-    reference_path = request.form.get('reference_path', None)
+    # Mehrere reference_path-Felder ergeben ein Hintergrundmodell
+    reference_paths = [path for path in request.form.getlist('reference_path') if path and os.path.exists(path)]
     use_ai = request.form.get('use_ai', 'true').lower() == 'true'
     
     if not image_path or not os.path.exists(image_path):
         return jsonify({'error': 'Ungültiger Bildpfad'}), 400
     
-    output_path = os.path.splitext(image_path)[0] + '_transparent.png'
+    # Endung richtet sich nach dem eingestellten Format der freigestellten Bilder
+    output_path = background_remover.transparent_writer.output_path(os.path.splitext(image_path)[0] + '_transparent.png')
     
-    if reference_path and os.path.exists(reference_path):
-        success = background_remover.remove_background_with_reference(image_path, reference_path, output_path)
+    if reference_paths:
+        success = background_remover.remove_background_with_reference(image_path, reference_paths, output_path)
     elif use_ai:
         success = background_remover.remove_background_with_ai(image_path, output_path)
     else:
@@ -284,6 +422,7 @@ def api_remove_background():
 @app.route('/api/project/<project_id>/session/<session_id>/background/remove', methods=['POST'])
 def api_remove_project_backgrounds(project_id, session_id):
     """API-Endpunkt zur Hintergrundentfernung für alle Bilder einer Session"""
+    background_remover = get_background_remover()
     project = project_manager.get_project(project_id)
     if not project:
         return jsonify({'error': 'Projekt nicht gefunden'}), 404
@@ -292,62 +431,120 @@ def api_remove_project_backgrounds(project_id, session_id):
     if not session:
         return jsonify({'error': 'Session nicht gefunden'}), 404
     
-    reference_path = request.form.get('reference_path', None)
+    reference_paths = request.form.getlist('reference_path')
     use_ai = request.form.get('use_ai', 'true').lower() == 'true'
     
-    result = background_remover.process_project_images(project, session, reference_path, use_ai)
+    result = background_remover.process_project_images(project, session, reference_paths, use_ai)
     
     return jsonify(result)
 
+@app.route('/api/export/360', methods=['POST'])
+def api_export_360():
+    """API-Endpunkt zum Export eines eigenständigen 360°-Viewers"""
+    project = project_manager.get_project(request.form.get('project_id'))
+    if not project:
+        return jsonify({'error': 'Projekt nicht gefunden'}), 404
+    
+    session = project.get_session(request.form.get('session_id'))
+    if not session:
+        return jsonify({'error': 'Session nicht gefunden'}), 404
+    
+    # Optional auf das Objekt zuschneiden und am Schwerpunkt ausrichten
+    crop = request.form.get('crop', 'false').lower() == 'true'
+    recenter = request.form.get('recenter', 'false').lower() == 'true'
+    padding = request.form.get('padding', 0.05, type=float)
+    reference_path = request.form.get('reference_path') or None
+    # Neu kodieren mit fester Qualität oder Zielgröße pro Bild (in KB)
+    quality = request.form.get('quality', None, type=int)
+    target_kb = request.form.get('target_kb', None, type=float)
+    
+    export_path = image_processor.prepare_360_viewer(project, session, crop=crop, recenter=recenter,
+                                                     padding=padding, reference_path=reference_path,
+                                                     quality=quality, target_kb=target_kb)
+    if not export_path:
+        return jsonify({'error': 'Export fehlgeschlagen'}), 500
+    
+    export_name = os.path.relpath(export_path, path_manager.exports_dir)
+    return jsonify({
+        'success': True,
+        'export_path': export_path,
+        'export_url': url_for('serve_export_file', filename=f"{export_name}/index.html")
+    })
+
+@app.route('/api/project/<project_id>/session/<session_id>/frames', methods=['POST'])
+def api_build_frame_store(project_id, session_id):
+    """API-Endpunkt zum Erstellen des Frame-Stores (dekodierte Bilder als Speicherabbild)"""
+    from utils.frame_store import FrameStore
+    
+    project = project_manager.get_project(project_id)
+    if not project:
+        return jsonify({'error': 'Projekt nicht gefunden'}), 404
+    
+    session = project.get_session(session_id)
+    if not session:
+        return jsonify({'error': 'Session nicht gefunden'}), 404
+    
+    scale = request.form.get('scale', 1, type=int)
+    if scale not in (1, 2, 4, 8):
+        return jsonify({'error': 'Ungültiger Verkleinerungsfaktor (1, 2, 4 oder 8)'}), 400
+    
+    session_dir = os.path.join(project.path, "sessions", session.id)
+    store = FrameStore.get_or_build(session, session_dir, scale)
+    if store is None:
+        return jsonify({'error': 'Frame-Store konnte nicht erstellt werden'}), 500
+    
+    return jsonify({
+        'success': True,
+        'path': store.data_path,
+        'frames': len(store.header['angles']),
+        'shape': store.header['shape'],
+        'scale': store.header['scale']
+    })
+
 @app.route('/api/status/arduino')
 def api_arduino_status():
     """API-Endpunkt zum Abrufen des Arduino-Status"""
-    global arduino_controller
+    station = get_station()
     
-    if not arduino_controller:
-        try:
-            arduino_controller = ArduinoController(settings.arduino_port, settings.arduino_baudrate)
-        except Exception as e:
-            logging.error(f"Fehler beim Initialisieren des Arduino-Controllers: {e}")
-            return jsonify({'connected': False, 'error': str(e)})
-    
-    connected = arduino_controller.is_connected()
+    try:
+        connected = station.get_arduino().is_connected()
+    except Exception as e:
+        logging.error(f"Fehler beim Initialisieren des Arduino-Controllers: {e}")
+        return jsonify({'connected': False, 'error': str(e)})
     
     return jsonify({
         'connected': connected,
-        'port': settings.arduino_port,
-        'baudrate': settings.arduino_baudrate
+        'station': station.id,
+        'port': station.get_setting('arduino_port'),
+        'baudrate': station.get_setting('arduino_baudrate')
     })
 
 @app.route('/api/status/camera')
 def api_camera_status():
     """API-Endpunkt zum Abrufen des Kamera-Status"""
-    global camera_controller
-    
-    if not camera_controller:
-        try:
-            camera_controller = CameraController(settings.camera_type, settings.camera_device)
-        except Exception as e:
-            logging.error(f"Fehler beim Initialisieren des Kamera-Controllers: {e}")
-            return jsonify({'available': False, 'error': str(e)})
+    station = get_station()
+    camera_type = station.get_setting('camera_type')
+    camera_device = station.get_setting('camera_device')
     
     # Kamera testen
     test_available = False
-    if settings.camera_type == 'webcam':
-        test_available = camera_finder.test_webcam(settings.camera_device)
-    elif settings.camera_type == 'gphoto2':
-        test_available = camera_finder.test_gphoto2_camera(settings.camera_device)
+    if camera_type == 'webcam':
+        test_available = camera_finder.test_webcam(camera_device, station.get_setting('camera_resolution'))
+    elif camera_type == 'gphoto2':
+        test_available = camera_finder.test_gphoto2_camera(camera_device)
     
     return jsonify({
         'available': test_available,
-        'type': settings.camera_type,
-        'device': settings.camera_device,
-        'resolution': settings.camera_resolution
+        'station': station.id,
+        'type': camera_type,
+        'device': camera_device,
+        'resolution': station.get_setting('camera_resolution')
     })
 
 @app.route('/api/status/background-removal')
 def api_background_removal_status():
     """API-Endpunkt zum Abrufen des Status der Hintergrundentfernung"""
+    background_remover = get_background_remover()
     is_available = background_remover.is_available()
     
     return jsonify({
@@ -356,9 +553,48 @@ def api_background_removal_status():
         'model_type': background_remover.model_type if is_available else None
     })
 
+@app.route('/api/calibrate/motor', methods=['POST'])
+def api_calibrate_motor():
+    """API-Endpunkt zur Kalibrierung des Motormodells (Geschwindigkeit und Anlaufzeit)"""
+    from utils.motor_calibration import MotorCalibrator
+    
+    station = get_station()
+    camera = station.get_camera()
+    
+    if camera.camera_type == 'gphoto2':
+        return jsonify({'success': False, 'error': 'Kalibrierung benötigt eine Webcam'}), 400
+    
+    data = request.get_json(silent=True) or {}
+    
+    try:
+        calibrator = MotorCalibrator(
+            station.get_arduino(), camera,
+            durations=tuple(data.get('durations', (5.0, 10.0, 20.0, 40.0))),
+            center=tuple(data.get('center', (0.5, 0.5))),
+            radius=float(data.get('radius', 0.45)),
+            aspect=float(data.get('aspect', 1.0))
+        )
+        with station.lock:
+            model, samples = calibrator.run(int(data.get('repeats', 1)))
+    except Exception as e:
+        logging.error(f"Fehler bei der Motorkalibrierung: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+    
+    station.save_motor_model(model)
+    
+    return jsonify({
+        'success': True,
+        'model': model.to_dict(),
+        'rms_error': model.rms_error,
+        'direction': model.direction,
+        'samples': [{'duration': duration, 'angle': angle} for duration, angle in samples]
+    })
+
 @app.route('/api/test/arduino', methods=['POST'])
 def api_test_arduino():
     """API-Endpunkt zum Testen des Arduino"""
+    from controllers.arduino_controller import ArduinoController
+    
     port = request.form.get('port', settings.arduino_port)
     baudrate = int(request.form.get('baudrate', settings.arduino_baudrate))
     
@@ -390,6 +626,8 @@ def api_test_arduino():
 @app.route('/api/test/camera', methods=['POST'])
 def api_test_camera():
     """API-Endpunkt zum Testen der Kamera"""
+    from controllers.camera_controller import CameraController
+    
     camera_type = request.form.get('type', settings.camera_type)
     camera_device = request.form.get('device', settings.camera_device)
     resolution = request.form.get('resolution', settings.camera_resolution)
@@ -397,14 +635,21 @@ def api_test_camera():
     # Temporärer Pfad für das Testbild
     test_image_path = os.path.join(path_manager.temp_dir, 'camera_test.jpg')
     
-    # Temporärer Kamera-Controller für den Test
-    test_controller = CameraController(camera_type, camera_device, resolution)
+    # Gehört die Kamera zu einer Station (z.B. mit laufender Vorschau), deren Controller verwenden
+    station_camera = next((station.camera for station in station_registry.get_all()
+                           if station.camera and station.camera.camera_type == camera_type
+                           and station.camera.device == camera_device), None)
+    if station_camera:
+        test_controller = station_camera
+    else:
+        # Temporärer Kamera-Controller für den Test
+        test_controller = CameraController(camera_type, camera_device, resolution)
     
     success = test_controller.capture_photo(test_image_path)
     
     if success and os.path.exists(test_image_path):
         # Bild wurde erfolgreich aufgenommen
-        image_url = f"/static/temp/camera_test.jpg?t={int(time.time())}"
+        image_url = versioned_url(url_for('serve_temp_file', filename='camera_test.jpg'), test_image_path)
         return jsonify({
             'success': True,
             'image_url': image_url,
@@ -417,9 +662,30 @@ def api_test_camera():
             'error': 'Konnte kein Foto aufnehmen'
         })
 
+@app.route('/api/camera/preview')
+def api_camera_preview():
+    """API-Endpunkt für die Live-Vorschau als MJPEG-Stream (multipart/x-mixed-replace)"""
+    from utils.preview_stream import PreviewStream
+    
+    station = get_station()
+    
+    if station.get_setting('camera_type') == 'gphoto2':
+        return jsonify({'success': False, 'error': 'Live-Vorschau wird nur für Webcams unterstützt'}), 400
+    
+    # Ein gemeinsamer Aufnahme-Thread für alle Betrachter, das Gerät wird nur einmal geöffnet
+    preview_stream = station.get_preview_stream()
+    preview_stream.configure(width=request.args.get('width', type=int),
+                             fps=request.args.get('fps', type=int))
+    
+    response = Response(preview_stream.frames(),
+                        mimetype=f'multipart/x-mixed-replace; boundary={PreviewStream.BOUNDARY}')
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
 @app.route('/api/test/background-removal', methods=['POST'])
 def api_test_background_removal():
     """API-Endpunkt zum Testen der Hintergrundentfernung"""
+    background_remover = get_background_remover()
     if not background_remover.is_available():
         return jsonify({
             'success': False,
@@ -433,13 +699,15 @@ def api_test_background_removal():
             'error': 'Ungültiger Bildpfad'
         })
     
-    output_path = os.path.join(path_manager.temp_dir, 'background_removal_test.png')
+    # Endung richtet sich nach dem eingestellten Format der freigestellten Bilder
+    output_path = background_remover.transparent_writer.output_path(
+        os.path.join(path_manager.temp_dir, 'background_removal_test.png'))
     
     success = background_remover.remove_background_with_ai(image_path, output_path)
     
     if success and os.path.exists(output_path):
         # Bild wurde erfolgreich verarbeitet
-        image_url = f"/static/temp/background_removal_test.png?t={int(time.time())}"
+        image_url = versioned_url(url_for('serve_temp_file', filename=os.path.basename(output_path)), output_path)
         return jsonify({
             'success': True,
             'image_url': image_url,
@@ -451,6 +719,11 @@ def api_test_background_removal():
             'error': 'Konnte Hintergrund nicht entfernen'
         })
 
+@app.route('/metrics')
+def metrics_endpoint():
+    """Laufzeitmetriken im Prometheus-Textformat"""
+    return Response(metrics.registry.render(), content_type=metrics.CONTENT_TYPE)
+
 @app.route('/api/logs')
 def api_logs():
     """API-Endpunkt zum Abrufen der Anwendungslogs"""
@@ -486,12 +759,14 @@ def api_logs():
 if __name__ == '__main__':
     # Beim Start der Anwendung die Controller initialisieren
     try:
-        arduino_controller = ArduinoController(settings.arduino_port, settings.arduino_baudrate)
-        camera_controller = CameraController(settings.camera_type, settings.camera_device)
-        turntable_controller = TurntableController(arduino_controller, 5)
+        for station in station_registry.get_all():
+            station.get_turntable()
+            station.get_camera()
     except Exception as e:
         print(f"Warnung: Controller konnten nicht initialisiert werden: {e}")
         print("Die Anwendung wird trotzdem gestartet. Bitte überprüfen Sie die Einstellungen.")
     
-    # Webserver starten
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    # Webserver starten (Servertyp und Threads über web.* in config.json)
+    from app.server import run_server
+    from app.services.config_manager import config_manager
+    run_server(app, config_manager)
@@ -2,7 +2,7 @@ from flask import Blueprint, jsonify, request
 import subprocess
 import traceback
 import os
-from app.utils.device_detector import device_detector
+from utils.device_registry import device_registry
 from app.services.config_manager import config_manager
 
 device_bp = Blueprint('device', __name__)
@@ -11,12 +11,24 @@ device_bp = Blueprint('device', __name__)
 def refresh_devices():
     """Aktualisiert die Liste der erkannten Geräte"""
     try:
-        # Device Detector neu initialisieren und alle Geräte suchen
-        device_detector.get_devices()
-        return jsonify({"status": "success"})
+        # Vollständigen Scan erzwingen (sonst nur bei Hotplug-Ereignissen)
+        version, _ = device_registry.refresh()
+        return jsonify({"status": "success", "version": version})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)})
 
+@device_bp.route('/list')
+def list_devices():
+    """Gibt die erkannten Geräte aus dem Speicher zurück (für UI-Polling)"""
+    version, devices = device_registry.get_snapshot()
+    
+    # Unveränderte Liste nicht erneut übertragen
+    since = request.args.get('since', type=int)
+    if since is not None and since == version:
+        return jsonify({"status": "success", "version": version, "changed": False})
+    
+    return jsonify({"status": "success", "version": version, "changed": True, "devices": devices})
+
 @device_bp.route('/update_config', methods=['POST'])
 def update_config_from_devices():
     """Aktualisiert die Konfiguration basierend auf erkannten Geräten"""
@@ -24,8 +36,8 @@ def update_config_from_devices():
         # Aktuelle Konfiguration laden
         current_config = config_manager.config.copy()
         
-        # Geräte erkennen
-        devices = device_detector.get_devices()
+        # Geräte aus der Registry (ohne erneuten Scan)
+        devices = device_registry.get_devices()
         
         # Arduino-Konfiguration aktualisieren, wenn Geräte gefunden wurden
         if devices['arduino']:
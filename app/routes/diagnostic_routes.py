@@ -1,12 +1,11 @@
-from flask import Blueprint, render_template, jsonify
+from flask import Blueprint, render_template, jsonify, Response
 import os
 import sys
+import json
 import platform
-import subprocess
-import time
-import serial
-from app.utils.device_detector import device_detector
+from utils.device_registry import device_registry
 from app.services.config_manager import config_manager
+from app.services.diagnostic_service import run_probes, iter_probe_results
 
 diagnostic_bp = Blueprint('diagnostic', __name__)
 
@@ -20,65 +19,52 @@ def diagnostics():
             'user': os.getlogin(),
             'current_directory': os.getcwd()
         },
-        'devices': device_detector.get_devices(),
+        'devices': device_registry.get_devices(),
         'config': config_manager.config
     }
     
-    # Füge Infos über serielle Ports hinzu
-    try:
-        import serial.tools.list_ports
-        ports = []
-        for port in serial.tools.list_ports.comports():
-            ports.append({
-                'device': port.device,
-                'name': port.name,
-                'description': port.description,
-                'hwid': port.hwid,
-                'vid': hex(port.vid) if port.vid is not None else None,
-                'pid': hex(port.pid) if port.pid is not None else None
-            })
-        diagnostic_data['serial_ports'] = ports
-    except Exception as e:
-        diagnostic_data['serial_ports_error'] = str(e)
+    # Alle Prüfungen laufen parallel, jede mit eigener Frist
+    probes = run_probes()
+    diagnostic_data['probes'] = probes
     
-    # Überprüfe Dateiberechtigungen
-    config_path = config_manager.config_path
-    diagnostic_data['file_permissions'] = {
-        'config_path': config_path,
-        'exists': os.path.exists(config_path),
-        'readable': os.access(config_path, os.R_OK) if os.path.exists(config_path) else None,
-        'writable': os.access(config_path, os.W_OK) if os.path.exists(config_path) else None,
-        'permissions': oct(os.stat(config_path).st_mode)[-3:] if os.path.exists(config_path) else None
-    }
+    # Serielle Ports
+    if probes['serial_ports']['status'] == 'ok':
+        diagnostic_data['serial_ports'] = probes['serial_ports']['result']
+    else:
+        diagnostic_data['serial_ports_error'] = probes['serial_ports']['result']
+    
+    # Dateiberechtigungen
+    if probes['config_permissions']['status'] == 'ok':
+        diagnostic_data['file_permissions'] = probes['config_permissions']['result']
     
-    # Versuche, die Arduino-Verbindung zu testen
+    # Arduino-Verbindung
     if diagnostic_data['devices']['arduino']:
-        arduino_port = diagnostic_data['devices']['arduino'][0]['port']
-        try:
-            with serial.Serial(arduino_port, 9600, timeout=1) as ser:
-                time.sleep(2)  # Warte auf Arduino Reset
-                ser.write(b'1')  # Sende Test-Befehl
-                time.sleep(0.5)
-                ser.write(b'0')
-                diagnostic_data['arduino_test'] = 'success'
-        except Exception as e:
-            diagnostic_data['arduino_test'] = f'error: {str(e)}'
+        arduino = probes['arduino']
+        diagnostic_data['arduino_test'] = arduino['result'] if arduino['status'] == 'ok' else f"error: {arduino['result']}"
     
-    # Teste gphoto2, wenn vorhanden
-    try:
-        gphoto2_output = subprocess.run(['gphoto2', '--auto-detect'], 
-                                      stdout=subprocess.PIPE, 
-                                      stderr=subprocess.PIPE, 
-                                      text=True)
-        diagnostic_data['gphoto2'] = {
-            'available': True,
-            'output': gphoto2_output.stdout,
-            'error': gphoto2_output.stderr if gphoto2_output.stderr else None
-        }
-    except Exception as e:
-        diagnostic_data['gphoto2'] = {
-            'available': False,
-            'error': str(e)
-        }
+    # Video-Geräte und gphoto2
+    for name in ('v4l2', 'gphoto2'):
+        probe = probes[name]
+        if probe['status'] == 'ok':
+            diagnostic_data[name] = probe['result']
+        else:
+            diagnostic_data[name] = {
+                'available': False,
+                'error': probe['result']
+            }
     
     return render_template('diagnostics.html', data=diagnostic_data)
+
+@diagnostic_bp.route('/probes')
+def probe_results():
+    """Gibt die Ergebnisse aller Prüfungen als JSON zurück"""
+    return jsonify(run_probes())
+
+@diagnostic_bp.route('/stream')
+def probe_stream():
+    """Liefert die Prüfergebnisse zeilenweise (NDJSON), sobald sie jeweils fertig sind"""
+    def generate():
+        for result in iter_probe_results():
+            yield json.dumps(result) + '\n'
+    
+    return Response(generate(), mimetype='application/x-ndjson')
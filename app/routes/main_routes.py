@@ -1,4 +1,6 @@
-from flask import Blueprint, render_template, send_from_directory
+from flask import Blueprint, render_template, Response
+from utils.http_cache import send_cached_from_directory
+from utils import metrics
 
 main_bp = Blueprint('main', __name__)
 
@@ -12,12 +14,17 @@ def settings():
     """Einstellungsseite"""
     return render_template('settings.html')
 
+@main_bp.route('/metrics')
+def metrics_endpoint():
+    """Laufzeitmetriken im Prometheus-Textformat"""
+    return Response(metrics.registry.render(), content_type=metrics.CONTENT_TYPE)
+
 @main_bp.route('/static/photos/<filename>')
 def serve_photo(filename):
     """Liefert ein Foto aus"""
-    return send_from_directory('static/photos', filename)
+    return send_cached_from_directory('static/photos', filename)
 
 @main_bp.route('/static/test/<filename>')
 def serve_test_photo(filename):
     """Liefert ein Testfoto aus"""
-    return send_from_directory('static/test', filename)
+    return send_cached_from_directory('static/test', filename)
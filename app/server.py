@@ -0,0 +1,99 @@
+"""
+Server-Start für die Weboberfläche
+
+Startet die Flask-App wahlweise mit dem Werkzeug-Entwicklungsserver,
+mit waitress oder mit gunicorn (gthread-Worker). Die Hardware-Controller
+(Arduino, Kamera) dürfen nur in genau einem Prozess existieren, deshalb
+wird immer mit einem einzigen Prozess und mehreren Threads gearbeitet.
+"""
+
+import logging
+
+logger = logging.getLogger('drehteller360.server')
+
+SERVER_TYPES = ('development', 'waitress', 'gunicorn')
+
+
+def _run_development(app, host, port, debug, threads, config):
+    """Startet den Werkzeug-Entwicklungsserver (mit Threads, ohne Reloader)"""
+    # Der Reloader würde einen zweiten Prozess starten und torch erneut importieren
+    use_reloader = config.get('web.reloader', False)
+    app.run(host=host, port=port, debug=debug, threaded=True, use_reloader=use_reloader)
+
+
+def _run_waitress(app, host, port, debug, threads, config):
+    """Startet den waitress-Server (ein Prozess, mehrere Threads)"""
+    from waitress import serve
+
+    serve(app, host=host, port=port, threads=threads,
+          channel_timeout=config.get('web.timeout', 600))
+
+
+def _run_gunicorn(app, host, port, debug, threads, config):
+    """Startet gunicorn mit genau einem gthread-Worker"""
+    from gunicorn.app.base import BaseApplication
+
+    class DrehtellerApplication(BaseApplication):
+        """Eingebettete gunicorn-Anwendung für die bereits erstellte Flask-App"""
+
+        def __init__(self, application, options):
+            self.application = application
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return self.application
+
+    options = {
+        'bind': f"{host}:{port}",
+        'workers': 1,
+        'worker_class': 'gthread',
+        'threads': threads,
+        # Eine Aufnahmesession kann mehrere Minuten dauern
+        'timeout': config.get('web.timeout', 600),
+        'preload_app': True
+    }
+    DrehtellerApplication(app, options).run()
+
+
+_RUNNERS = {
+    'development': _run_development,
+    'waitress': _run_waitress,
+    'gunicorn': _run_gunicorn
+}
+
+
+def run_server(app, config, server=None, threads=None):
+    """
+    Startet die Flask-App mit dem konfigurierten Server
+
+    :param app: Flask-App
+    :param config: ConfigManager mit den web.*-Schlüsseln
+    :param server: Optionaler Servertyp (überschreibt web.server)
+    :param threads: Optionale Thread-Anzahl (überschreibt web.threads)
+    """
+    host = config.get('web.host', '0.0.0.0')
+    port = int(config.get('web.port', 5000))
+    debug = config.get('web.debug', True)
+    server = server or config.get('web.server', 'waitress')
+    threads = int(threads or config.get('web.threads', 8))
+
+    if server not in SERVER_TYPES:
+        logger.warning(f"Unbekannter Servertyp '{server}', verwende 'development'")
+        server = 'development'
+
+    workers = int(config.get('web.workers', 1))
+    if workers != 1:
+        logger.warning("web.workers wird ignoriert: Hardware-Controller erfordern genau einen Prozess")
+
+    logger.info(f"Starte Server '{server}' auf {host}:{port} mit {threads} Threads")
+
+    try:
+        _RUNNERS[server](app, host, port, debug, threads, config)
+    except ImportError:
+        logger.warning(f"Server '{server}' ist nicht installiert, verwende Entwicklungsserver")
+        _run_development(app, host, port, debug, threads, config)
@@ -1,8 +1,28 @@
 # arduino_service.py
 #
-import serial
 import time
+import logging
+import threading
 from app.services.config_manager import config_manager
+from config.settings import Settings
+from utils.motor_model import MotorModel
+
+logger = logging.getLogger("drehteller360.arduino_service")
+
+# Nur ein Request-Thread darf gleichzeitig den seriellen Port benutzen
+_arduino_lock = threading.Lock()
+
+# Kalibriertes Motormodell, einmal aus den Einstellungen geladen
+_motor_model = None
+_motor_model_lock = threading.Lock()
+
+def get_motor_model():
+    """Gibt das Motormodell aus den Einstellungen zurück (dasselbe wie im TurntableController)"""
+    global _motor_model
+    with _motor_model_lock:
+        if _motor_model is None:
+            _motor_model = MotorModel.from_settings(Settings())
+        return _motor_model
 
 def init_arduino():
     """
@@ -11,7 +31,7 @@ def init_arduino():
     """
     # Simulator-Modus prüfen
     if config_manager.get('simulator.enabled', True):
-        print("Simulator-Modus aktiv, keine Arduino-Verbindung erforderlich")
+        logger.info("Simulator-Modus aktiv, keine Arduino-Verbindung erforderlich")
         return None
     
     try:
@@ -19,57 +39,73 @@ def init_arduino():
         port = config_manager.get('arduino.port', '/dev/ttyACM0')
         baudrate = config_manager.get('arduino.baudrate', 9600)
         
-        # Neue Verbindung öffnen
+        # Neue Verbindung öffnen (pyserial erst bei Bedarf laden)
+        import serial
         arduino = serial.Serial(port, baudrate, timeout=2)
         time.sleep(2)  # Warten auf Arduino Reset
         
-        print(f"Arduino-Verbindung hergestellt: {port} ({baudrate} Baud)")
+        logger.info(f"Arduino-Verbindung hergestellt: {port} ({baudrate} Baud)")
         return arduino
     except Exception as e:
-        print(f"Fehler beim Initialisieren der Arduino-Verbindung: {e}")
+        logger.error(f"Fehler beim Initialisieren der Arduino-Verbindung: {e}")
         return None
 
-def rotate_teller(degrees):
+def rotate_teller(degrees, motor_model=None):
     """
     Rotiert den Drehteller um die angegebenen Grad.
     Verwendet die sichere Methode, die nachweislich funktioniert.
+    motor_model: Zeitmodell des Motors (Standard: aus den Einstellungen)
     """
-    # Wenn Simulator-Modus aktiv ist
+    # Arduino-Port aus Konfiguration holen oder Standardwert verwenden
+    port = config_manager.get('arduino.port', '/dev/ttyACM0')
+    baudrate = config_manager.get('arduino.baudrate', 9600)
+    init_delay = 5  # WICHTIG: 5 Sekunden warten für die Initialisierung
+    
+    # Im Simulator-Modus läuft dasselbe serielle Protokoll gegen den Port des simulierten Arduino
     if config_manager.get('simulator.enabled', True):
-        print(f"Simulator: Rotation um {degrees} Grad")
-        return True
-        
+        from utils.hardware_simulator import get_hardware_simulator
+        simulator = get_hardware_simulator(config_manager.get('simulator', {}))
+        port = simulator.start()
+        init_delay = 0
+        # Die simulierte Mechanik ist exakt bekannt
+        motor_model = MotorModel(simulator.turntable.degrees_per_second, simulator.turntable.startup_lag)
+        logger.debug(f"Simulator: Rotation um {degrees} Grad über {port}")
+    elif motor_model is None:
+        motor_model = get_motor_model()
+    
+    with _arduino_lock:
+        return _rotate_teller_serial(degrees, port, baudrate, init_delay, motor_model)
+
+def _rotate_teller_serial(degrees, port, baudrate, init_delay, motor_model):
+    """Führt die Rotation über die serielle Verbindung aus (Aufrufer hält die Sperre)"""
     try:
-        # Arduino-Port aus Konfiguration holen oder Standardwert verwenden
-        port = config_manager.get('arduino.port', '/dev/ttyACM0')
-        baudrate = config_manager.get('arduino.baudrate', 9600)
-        
         # Neue Verbindung mit genau dem funktionierenden Muster
-        print(f"Öffne Arduino-Verbindung: {port}")
+        logger.debug(f"Öffne Arduino-Verbindung: {port}")
+        import serial
         arduino = serial.Serial(port, baudrate, timeout=1)
-        time.sleep(5)  # WICHTIG: 5 Sekunden warten für die Initialisierung
+        time.sleep(init_delay)
         
         # Befehl zum Einschalten senden
-        print("Sende '1' (Relais ein)")
+        logger.debug("Sende '1' (Relais ein)")
         arduino.write(b'1')
         
         # Berechnete Zeit für die Drehung warten
-        rotation_time = abs(degrees) / 0.8  # 0.8° pro Sekunde
-        print(f"Warte auf Rotation ({rotation_time} Sekunden)")
+        rotation_time = motor_model.duration_for(abs(degrees))
+        logger.debug(f"Warte auf Rotation ({rotation_time} Sekunden)")
         time.sleep(rotation_time)
         
         # Befehl zum Ausschalten senden
-        print("Sende '0' (Relais aus)")
+        logger.debug("Sende '0' (Relais aus)")
         arduino.write(b'0')
         time.sleep(0.5)
         
         # Verbindung schließen
         arduino.close()
         
-        print(f"Drehteller um {degrees} Grad gedreht.")
+        logger.info(f"Drehteller um {degrees} Grad gedreht.")
         return True
     except Exception as e:
-        print(f"Fehler beim Drehen des Tellers: {e}")
+        logger.error(f"Fehler beim Drehen des Tellers: {e}")
         # Versuchen, die Verbindung zu schließen, falls sie noch offen ist
         try:
             if 'arduino' in locals() and arduino.is_open:
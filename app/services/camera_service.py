@@ -3,17 +3,12 @@ import subprocess
 import time
 import re
 from app.services.config_manager import config_manager
+from utils.metrics import GPHOTO2_TIMEOUTS_TOTAL
 
 def take_photo(filename=None):
     """
     Nimmt ein Foto auf
     """
-    # Wenn Simulator-Modus aktiv ist
-    if config_manager.get('simulator.enabled', True):
-        print("Simulator: Foto aufnehmen")
-        # Hier würde der Simulator-Code stehen
-        return "simulation.jpg"
-        
     try:
         # Pfad für das Speichern von Fotos
         photo_dir = 'static/photos'
@@ -23,6 +18,15 @@ def take_photo(filename=None):
         if not filename:
             filename = f"photo_{int(time.time())}.jpg"
         
+        # Wenn Simulator-Modus aktiv ist, ein synthetisches Bild rendern
+        if config_manager.get('simulator.enabled', True):
+            print("Simulator: Foto aufnehmen")
+            from utils.hardware_simulator import get_hardware_simulator
+            simulator = get_hardware_simulator(config_manager.get('simulator', {}))
+            if not simulator.camera.capture(os.path.join(photo_dir, filename)):
+                raise Exception("Simulierte Kamera hat kein Foto geliefert")
+            return filename
+        
         # Kamera-Einstellungen aus Konfiguration holen
         camera_type = config_manager.get('camera.type', 'webcam')
         camera_device = config_manager.get('camera.device_path', '/dev/video0')
@@ -75,6 +79,7 @@ def take_photo(filename=None):
                     
                 print(f"Foto erfolgreich aufgenommen: {output_path}")
             except subprocess.TimeoutExpired:
+                GPHOTO2_TIMEOUTS_TOTAL.inc()
                 print("Timeout bei gphoto2 - Kamera reagiert nicht")
                 
                 # Versuche, alle gphoto2-Prozesse zu beenden
@@ -86,50 +91,7 @@ def take_photo(filename=None):
                     pass
                     
                 raise Exception("Timeout beim Fotografieren")
-              else:
-            # Webcam mit OpenCV
-            print(f"Versuche, Foto mit OpenCV aufzunehmen: {camera_device}")
-            try:
-                import cv2
-                cap = cv2.VideoCapture(camera_device)
-                
-                # Auflösung einstellen
-                width = config_manager.get('camera.resolution.width', 1280)
-                height = config_manager.get('camera.resolution.height', 720)
-                cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
-                cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
-                
-                # Foto aufnehmen
-                ret, frame = cap.read()
-                if not ret:
-                    raise Exception(f"Fehler beim Auslesen der Kamera: {camera_device}")
-                    
-                # Foto speichern
-                cv2.imwrite(output_path, frame)
-                cap.release()
-            except ImportError:
-                print("OpenCV nicht installiert, verwende fswebcam als Fallback")
-                
-                # Fallback zu fswebcam, wenn OpenCV nicht verfügbar ist
-                try:
-                    subprocess.run([
-                        'fswebcam',
-                        '--no-banner',
-                        '--resolution', f"{width}x{height}",
-                        '-d', camera_device,
-                        output_path
-                    ], check=True)
-                except subprocess.CalledProcessError as e:
-                    raise Exception(f"Fehler bei fswebcam: {e}")
-            
-        print(f"Foto aufgenommen und gespeichert als: {filename}")
-        return filename
-    except Exception as e:
-        print(f"Fehler beim Aufnehmen des Fotos: {e}")
-        import traceback
-        traceback.print_exc()
-        return None
-else:
+        else:
             # Webcam mit OpenCV
             print(f"Versuche, Foto mit OpenCV aufzunehmen: {camera_device}")
             try:
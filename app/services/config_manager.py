@@ -1,6 +1,7 @@
 import os
 import json
 import logging
+from utils.motor_model import MotorModel
 
 # Logger konfigurieren
 logger = logging.getLogger("drehteller360.config_manager")
@@ -24,12 +25,30 @@ class ConfigManager:
             'default_interval': 5
         },
         'simulator': {
-            'enabled': True
+            'enabled': True,
+            # Zeitverhalten des simulierten Drehtellers
+            'degrees_per_second': MotorModel.DEFAULT_DEGREES_PER_SECOND,
+            'startup_lag': 0.1,
+            'settle_time': 0.3,
+            # Latenz, Streuung und Fehlerrate der seriellen Antworten
+            'serial_latency_ms': 5,
+            'serial_jitter_ms': 2,
+            'serial_failure_rate': 0.0,
+            # Latenz, Streuung und Fehlerrate der Kamera
+            'capture_latency_ms': 50,
+            'capture_jitter_ms': 10,
+            'capture_failure_rate': 0.0,
+            'noise': 2.0
         },
         'web': {
             'host': '0.0.0.0',
             'port': 5000,
-            'debug': True
+            'debug': True,
+            'server': 'waitress',  # 'development', 'waitress' oder 'gunicorn'
+            'threads': 8,
+            'workers': 1,  # Hardware-Controller erfordern genau einen Prozess
+            'timeout': 600,
+            'reloader': False
         }
     }
 
@@ -0,0 +1,193 @@
+# diagnostic_service.py
+#
+# Führt die Diagnose-Prüfungen parallel in einem Thread-Pool aus. Jede Prüfung
+# hat eine eigene Frist; die Diagnoseseite wartet damit höchstens so lange
+# wie die langsamste Prüfung bzw. deren Frist, nicht die Summe aller Prüfungen.
+
+import os
+import time
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, TimeoutError
+from app.services.config_manager import config_manager
+from utils.device_registry import device_registry
+
+# Fristen pro Prüfung in Sekunden
+PROBE_DEADLINES = {
+    'serial_ports': 2.0,
+    'arduino': 4.0,
+    'v4l2': 3.0,
+    'gphoto2': 5.0,
+    'config_permissions': 1.0
+}
+
+# Zuschlag auf die Frist einer Prüfung (Thread-Start, Rückgabe des Ergebnisses)
+DEADLINE_GRACE = 0.5
+
+_executor = ThreadPoolExecutor(max_workers=len(PROBE_DEADLINES), thread_name_prefix='diagnostics')
+
+
+def probe_serial_ports(deadline):
+    """Listet alle seriellen Ports auf"""
+    import serial.tools.list_ports
+    ports = []
+    for port in serial.tools.list_ports.comports():
+        ports.append({
+            'device': port.device,
+            'name': port.name,
+            'description': port.description,
+            'hwid': port.hwid,
+            'vid': hex(port.vid) if port.vid is not None else None,
+            'pid': hex(port.pid) if port.pid is not None else None
+        })
+    return ports
+
+
+def probe_arduino(deadline):
+    """Prüft, ob der erste erkannte Arduino auf eine Statusabfrage antwortet"""
+    devices = device_registry.get_devices(timeout=deadline)
+    if not devices['arduino']:
+        return 'no device'
+
+    arduino_port = devices['arduino'][0]['port']
+    baudrate = config_manager.get('arduino.baudrate', 9600)
+    remaining = max(0.1, deadline - 2.0)
+
+    import serial
+    with serial.Serial(arduino_port, baudrate, timeout=remaining) as ser:
+        time.sleep(2)  # Warte auf Arduino Reset
+        ser.reset_input_buffer()
+        # Statusabfrage statt Relais-Impuls, damit sich der Teller nicht bewegt
+        ser.write(b'S')
+        response = ser.readline().decode(errors='ignore').strip()
+
+    if response.startswith('STATUS'):
+        return 'success'
+    return f'error: unerwartete Antwort {response!r}'
+
+
+def probe_v4l2(deadline):
+    """Listet Video-Geräte über v4l2-ctl auf"""
+    result = subprocess.run(['v4l2-ctl', '--list-devices'],
+                            stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE,
+                            text=True,
+                            timeout=deadline)
+    return {
+        'available': True,
+        'output': result.stdout,
+        'error': result.stderr if result.stderr else None
+    }
+
+
+def probe_gphoto2(deadline):
+    """Sucht DSLR-Kameras über gphoto2 --auto-detect"""
+    gphoto2_output = subprocess.run(['gphoto2', '--auto-detect'],
+                                    stdout=subprocess.PIPE,
+                                    stderr=subprocess.PIPE,
+                                    text=True,
+                                    timeout=deadline)
+    return {
+        'available': True,
+        'output': gphoto2_output.stdout,
+        'error': gphoto2_output.stderr if gphoto2_output.stderr else None
+    }
+
+
+def probe_config_permissions(deadline):
+    """Überprüft die Dateiberechtigungen der Konfigurationsdatei"""
+    config_path = config_manager.config_path
+    exists = os.path.exists(config_path)
+    return {
+        'config_path': config_path,
+        'exists': exists,
+        'readable': os.access(config_path, os.R_OK) if exists else None,
+        'writable': os.access(config_path, os.W_OK) if exists else None,
+        'permissions': oct(os.stat(config_path).st_mode)[-3:] if exists else None
+    }
+
+
+PROBES = {
+    'serial_ports': probe_serial_ports,
+    'arduino': probe_arduino,
+    'v4l2': probe_v4l2,
+    'gphoto2': probe_gphoto2,
+    'config_permissions': probe_config_permissions
+}
+
+
+def _run_probe(name, probe, deadline):
+    """Führt eine Prüfung aus und misst ihre Dauer"""
+    start = time.monotonic()
+    try:
+        result = probe(deadline)
+        status = 'ok'
+    except subprocess.TimeoutExpired:
+        result = f'Timeout nach {deadline:.1f} s'
+        status = 'timeout'
+    except FileNotFoundError as e:
+        result = f'nicht installiert: {e.filename}'
+        status = 'error'
+    except Exception as e:
+        result = str(e)
+        status = 'error'
+    return {
+        'probe': name,
+        'status': status,
+        'result': result,
+        'duration': round(time.monotonic() - start, 3)
+    }
+
+
+def _submit_all(names=None):
+    """Startet alle (oder die angegebenen) Prüfungen parallel
+
+    Gibt {Future: (Name, Frist als monotone Zeit)} zurück; jede Prüfung hat ihre eigene Frist.
+    """
+    names = names or list(PROBES)
+    start = time.monotonic()
+    return {
+        _executor.submit(_run_probe, name, PROBES[name], PROBE_DEADLINES[name]):
+            (name, start + PROBE_DEADLINES[name] + DEADLINE_GRACE)
+        for name in names
+    }
+
+
+def _timeout_result(name):
+    """Ergebnis für eine Prüfung, die ihre Frist überschritten hat"""
+    return {
+        'probe': name,
+        'status': 'timeout',
+        'result': f'Keine Antwort innerhalb von {PROBE_DEADLINES[name]:.1f} s',
+        'duration': PROBE_DEADLINES[name]
+    }
+
+
+def run_probes(names=None):
+    """Führt die Prüfungen parallel aus; jede wird nach ihrer eigenen Frist als timeout gemeldet"""
+    futures = _submit_all(names)
+
+    results = {}
+    for future, (name, deadline) in sorted(futures.items(), key=lambda item: item[1][1]):
+        try:
+            results[name] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except TimeoutError:
+            results[name] = _timeout_result(name)
+    return results
+
+
+def iter_probe_results(names=None):
+    """Liefert die Ergebnisse der Prüfungen, sobald sie fertig sind oder ihre Frist überschreiten"""
+    pending = _submit_all(names)
+
+    while pending:
+        next_deadline = min(deadline for _, deadline in pending.values())
+        done, _ = wait(pending, timeout=max(0.0, next_deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+        for future in done:
+            pending.pop(future)
+            yield future.result()
+
+        now = time.monotonic()
+        for future, (name, deadline) in list(pending.items()):
+            if deadline <= now:
+                pending.pop(future)
+                yield _timeout_result(name)
@@ -0,0 +1,2 @@
+# Datei: benchmarks/__init__.py
+# Benchmarks für das 360° Drehteller Fotografie-System (laufen gegen den Hardware-Simulator)
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+# Datei: benchmarks/session_benchmark.py
+# End-to-End-Benchmark einer kompletten 360°-Session gegen den Hardware-Simulator
+#
+# Aufruf (aus dem Projektverzeichnis):
+#   python -m benchmarks.session_benchmark --angle-steps 30 15 10 --output bench.json
+#   python -m benchmarks.session_benchmark --baseline bench_baseline.json
+
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import platform
+import argparse
+import resource
+import tempfile
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from controllers.arduino_controller import ArduinoController
+from controllers.camera_controller import CameraController
+from controllers.turntable_controller import TurntableController
+from utils.settle_detector import SettleDetector
+from utils.motor_model import MotorModel
+from models.project import Project, ProjectManager
+from utils.path_manager import PathManager
+from utils.image_processor import ImageProcessor
+from utils.hardware_simulator import get_hardware_simulator
+
+logger = logging.getLogger('drehteller360.benchmark')
+
+STAGES = ['rotate', 'settle', 'capture', 'encode', 'write', 'segment', 'export']
+
+
+class StageTimer:
+    """Sammelt Laufzeiten pro Verarbeitungsstufe"""
+
+    def __init__(self):
+        self.samples = {stage: [] for stage in STAGES}
+
+    def record(self, stage, seconds):
+        """Speichert eine gemessene Dauer"""
+        self.samples.setdefault(stage, []).append(seconds)
+
+    def instrument(self, obj, method_name, stage):
+        """Ersetzt eine Methode eines Objekts durch eine zeitmessende Variante"""
+        original = getattr(obj, method_name)
+
+        @functools.wraps(original)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.record(stage, time.perf_counter() - start)
+
+        setattr(obj, method_name, timed)
+
+    def summary(self):
+        """Fasst die Messwerte pro Stufe zusammen (Zeiten in Millisekunden)"""
+        result = {}
+        for stage, samples in self.samples.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            result[stage] = {
+                'count': len(ordered),
+                'total_s': round(sum(ordered), 4),
+                'mean_ms': round(sum(ordered) / len(ordered) * 1000, 3),
+                'p50_ms': round(ordered[len(ordered) // 2] * 1000, 3),
+                'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+                'max_ms': round(ordered[-1] * 1000, 3)
+            }
+        return result
+
+
+def peak_rss_mb():
+    """Gibt den bisherigen Spitzenwert des residenten Speichers des Prozesses in MB zurück"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux liefert KB, macOS Bytes
+    if platform.system() == 'Darwin':
+        return round(peak / (1024 * 1024), 1)
+    return round(peak / 1024, 1)
+
+
+def run_session(angle_step, args, base_dir):
+    """Führt eine komplette Session inklusive Segmentierung und Export aus"""
+    timer = StageTimer()
+
+    simulator = get_hardware_simulator({
+        'degrees_per_second': args.speed,
+        'startup_lag': 0.0,
+        'resolution': args.resolution
+    })
+    simulator.turntable.reset()
+
+    path_manager = PathManager(os.path.join(base_dir, f"step_{angle_step}"))
+    path_manager.ensure_directories()
+    project_manager = ProjectManager(path_manager.projects_dir)
+
+    project = Project(name=f"Benchmark {angle_step}°", angle_step=angle_step)
+    project_manager.save_project(project)
+
+    arduino = ArduinoController(ArduinoController.SIMULATOR_PORT)
+    camera = CameraController('simulator', 'simulator', args.resolution)
+    settle_detector = SettleDetector(timeout=max(args.settle_time, 1.0)) if args.adaptive_settle else None
+    # Bewegungszeiten an die simulierte Drehgeschwindigkeit anpassen
+    turntable = TurntableController(arduino, angle_step, settle_detector, MotorModel(args.speed))
+    turntable.settle_time = args.settle_time
+
+    timer.instrument(turntable, 'move_degrees', 'rotate')
+    timer.instrument(turntable, 'wait_for_settle', 'settle')
+    timer.instrument(simulator.camera, 'read_frame', 'capture')
+    timer.instrument(camera, '_encode_frame', 'encode')
+    timer.instrument(camera, '_write_bytes', 'write')
+
+    start = time.perf_counter()
+    success = turntable.start_session(project, camera)
+    session_time = time.perf_counter() - start
+
+    if not success:
+        raise RuntimeError(f"Session mit {angle_step}° Schrittweite fehlgeschlagen")
+
+    session = project.sessions[-1]
+
+    # Segmentierung mit Referenzbild (leerer Teller)
+    if not args.skip_segment:
+        try:
+            from utils.background_remover import BackgroundRemover
+            remover = BackgroundRemover()
+        except ImportError as e:
+            logger.warning(f"Segmentierung übersprungen: {str(e)}")
+            remover = None
+
+        if remover is not None:
+            reference_path = os.path.join(base_dir, f"reference_{angle_step}.jpg")
+            simulator.camera.capture(reference_path, include_object=False)
+            timer.instrument(remover, 'remove_background_with_reference', 'segment')
+            remover.process_project_images(project, session, reference_path, use_ai=False)
+
+    # Export des 360°-Viewers
+    if not args.skip_export:
+        image_processor = ImageProcessor(path_manager)
+        timer.instrument(image_processor, 'prepare_360_viewer', 'export')
+        image_processor.prepare_360_viewer(project, session)
+
+    camera.cleanup()
+    arduino.disconnect()
+
+    return {
+        'angle_step': angle_step,
+        'frames': len(session.photos),
+        'session_wall_time_s': round(session_time, 4),
+        'total_wall_time_s': round(time.perf_counter() - start, 4),
+        'stages': timer.summary(),
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+def run_isolated(angle_step, args, base_dir):
+    """Führt eine Session in einem eigenen Prozess aus
+
+    ru_maxrss sinkt nie; nur in einem frischen Prozess misst peak_rss_mb den
+    Spitzenwert dieses Laufs statt des größten vorherigen.
+    """
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    try:
+        return run_session(angle_step, args, base_dir)
+    finally:
+        get_hardware_simulator().stop()
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    """Vergleicht Ergebnisse mit einer gespeicherten Baseline und gibt Regressionen zurück"""
+    regressions = []
+    baseline_runs = {run['angle_step']: run for run in baseline.get('runs', [])}
+
+    for run in results['runs']:
+        reference = baseline_runs.get(run['angle_step'])
+        if not reference:
+            continue
+
+        checks = [('total_wall_time_s', run['total_wall_time_s'], reference.get('total_wall_time_s'))]
+        for stage, stats in run['stages'].items():
+            reference_stats = reference.get('stages', {}).get(stage)
+            if reference_stats:
+                checks.append((f"{stage}.mean_ms", stats['mean_ms'], reference_stats.get('mean_ms')))
+        checks.append(('peak_rss_mb', run['peak_rss_mb'], reference.get('peak_rss_mb')))
+
+        for name, current, previous in checks:
+            if not previous:
+                continue
+            change = (current - previous) / previous
+            if change > tolerance:
+                regressions.append({
+                    'angle_step': run['angle_step'],
+                    'metric': name,
+                    'baseline': previous,
+                    'current': current,
+                    'change': round(change, 3)
+                })
+
+    return regressions
+
+
+def parse_args(argv=None):
+    """Liest die Kommandozeilenargumente"""
+    parser = argparse.ArgumentParser(description='End-to-End-Benchmark einer 360°-Session (Simulator)')
+    parser.add_argument('--angle-steps', type=int, nargs='+', default=[30, 15, 10],
+                        help='Zu messende Winkelschritte in Grad')
+    parser.add_argument('--resolution', default='1280x720', help='Kameraauflösung (BxH)')
+    parser.add_argument('--speed', type=float, default=90.0,
+                        help='Simulierte Drehgeschwindigkeit in Grad pro Sekunde')
+    parser.add_argument('--settle-time', type=float, default=0.05,
+                        help='Wartezeit nach jeder Bewegung in Sekunden')
+    parser.add_argument('--adaptive-settle', action='store_true',
+                        help='Ruheerkennung über Frame-Differenzen statt fester Wartezeit')
+    parser.add_argument('--skip-segment', action='store_true', help='Segmentierung nicht messen')
+    parser.add_argument('--skip-export', action='store_true', help='Export nicht messen')
+    parser.add_argument('--output', default='bench_results.json', help='Ausgabedatei (JSON)')
+    parser.add_argument('--baseline', help='Baseline-Datei zum Vergleich (JSON)')
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help='Erlaubte Verschlechterung gegenüber der Baseline (0.10 = 10 %%)')
+    parser.add_argument('--keep-files', action='store_true', help='Temporäre Sessiondaten behalten')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Führt den Benchmark aus und schreibt die Ergebnisse"""
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    width, height = (int(value) for value in args.resolution.lower().split('x'))
+    args.resolution = (width, height)
+
+    base_dir = tempfile.mkdtemp(prefix='drehteller_bench_')
+    results = {
+        'meta': {
+            'timestamp': time.time(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'resolution': f"{width}x{height}",
+            'speed_deg_per_s': args.speed,
+            'settle_time_s': args.settle_time,
+            'adaptive_settle': args.adaptive_settle
+        },
+        'runs': []
+    }
+
+    # Jeder Lauf in einem neu gestarteten Prozess (spawn, kein Erbe des Speichers früherer Läufe)
+    context = multiprocessing.get_context('spawn')
+    try:
+        for angle_step in args.angle_steps:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                run = executor.submit(run_isolated, angle_step, args, base_dir).result()
+            results['runs'].append(run)
+            print(f"{angle_step:>3}°: {run['frames']:>3} Bilder, "
+                  f"Session {run['session_wall_time_s']:.2f} s, "
+                  f"gesamt {run['total_wall_time_s']:.2f} s, "
+                  f"Spitzen-RSS {run['peak_rss_mb']:.0f} MB")
+            for stage in STAGES:
+                stats = run['stages'].get(stage)
+                if stats:
+                    print(f"      {stage:<8} n={stats['count']:<4} mittel {stats['mean_ms']:>9.2f} ms  "
+                          f"p95 {stats['p95_ms']:>9.2f} ms")
+    finally:
+        if not args.keep_files:
+            shutil.rmtree(base_dir, ignore_errors=True)
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=4)
+    print(f"Ergebnisse gespeichert: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+
+        regressions = compare_with_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print("Regressionen gegenüber der Baseline:")
+            for regression in regressions:
+                print(f"  {regression['angle_step']:>3}° {regression['metric']}: "
+                      f"{regression['baseline']} -> {regression['current']} "
+                      f"(+{regression['change'] * 100:.1f} %)")
+            return 1
+        print("Keine Regressionen gegenüber der Baseline")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# Datei: benchmarks/startup_importtime.py
+# Misst die Importzeit beim Start (python -X importtime) und zeigt, welche Pakete sie verursachen
+#
+# Aufruf (aus dem Projektverzeichnis):
+#   python -m benchmarks.startup_importtime
+#   python -m benchmarks.startup_importtime --module web.py --top 15 --max-ms 1000
+#   python -m benchmarks.startup_importtime --module models
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+
+# Schwere Abhängigkeiten, die beim Start nicht geladen werden sollen
+HEAVY_PACKAGES = ['torch', 'torchvision', 'cv2', 'numpy', 'serial', 'PIL']
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_import(module):
+    """Importiert ein Modul in einem frischen Interpreter und gibt (Wandzeit in s, Einträge, Fehler) zurück
+
+    module: Modulname oder Skriptpfad (z.B. app.py, das neben dem Paket app liegt und
+    ohne Serverstart geladen wird). Einträge sind Tupel (Modulname, Eigenzeit in µs,
+    kumulierte Zeit in µs, Tiefe).
+
+    Der Import läuft mit einem temporären Arbeits- und Home-Verzeichnis, damit
+    dabei angelegte Dateien (app.log, ~/Drehteller-Projekte usw.) nicht im
+    Projekt bzw. im echten Home-Verzeichnis zurückbleiben.
+    """
+    if module.endswith('.py'):
+        path = os.path.join(PROJECT_DIR, module)
+        code = ("import importlib.util as util; "
+                f"spec = util.spec_from_file_location('startup_main', {path!r}); "
+                "spec.loader.exec_module(util.module_from_spec(spec))")
+    else:
+        code = f'import {module}'
+    command = [sys.executable, '-X', 'importtime', '-c', code]
+
+    with tempfile.TemporaryDirectory(prefix='startup_importtime_') as sandbox:
+        env = dict(os.environ, HOME=sandbox)
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [PROJECT_DIR, os.environ.get('PYTHONPATH')]))
+        start = time.perf_counter()
+        result = subprocess.run(command, cwd=sandbox, env=env, capture_output=True, text=True)
+        wall_time = time.perf_counter() - start
+
+    entries = []
+    errors = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            errors.append(line)
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # Kopfzeile
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), int(fields[0]), int(fields[1]), depth))
+
+    error = '\n'.join(errors[-5:]) if result.returncode != 0 else None
+    return wall_time, entries, error
+
+
+def summarize_packages(entries):
+    """Summiert die Eigenzeiten pro Top-Level-Paket (in ms)"""
+    packages = {}
+    for name, self_us, _, _ in entries:
+        package = name.split('.')[0]
+        packages[package] = packages.get(package, 0.0) + self_us / 1000.0
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)
+
+
+def parse_args(argv=None):
+    """Liest die Kommandozeilenargumente"""
+    parser = argparse.ArgumentParser(description='Importzeit beim Start der Anwendung messen')
+    parser.add_argument('--module', default='app.py', help='Zu ladendes Skript oder Modul (z.B. app.py, web.py, models)')
+    parser.add_argument('--top', type=int, default=20, help='Anzahl der angezeigten Pakete bzw. Module')
+    parser.add_argument('--repeat', type=int, default=3, help='Anzahl der Messungen (der schnellste Lauf zählt)')
+    parser.add_argument('--max-ms', type=float,
+                        help='Grenzwert der Importzeit in ms, bei Überschreitung Exit-Code 1')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Misst die Importzeit und gibt die Aufschlüsselung aus"""
+    args = parse_args(argv)
+
+    best = None
+    for _ in range(max(1, args.repeat)):
+        wall_time, entries, error = measure_import(args.module)
+        if error:
+            print(f"Import von {args.module} fehlgeschlagen:\n{error}")
+            return 2
+        if best is None or wall_time < best[0]:
+            best = (wall_time, entries)
+
+    wall_time, entries = best
+    total_ms = sum(self_us for _, self_us, _, _ in entries) / 1000.0
+    print(f"Import von {args.module}: {total_ms:.1f} ms Importzeit, {wall_time * 1000:.1f} ms Interpreterstart gesamt")
+
+    print(f"\nPakete nach Eigenzeit (Top {args.top}):")
+    for package, milliseconds in summarize_packages(entries)[:args.top]:
+        print(f"  {package:<32} {milliseconds:>9.1f} ms")
+
+    print(f"\nModule nach kumulierter Zeit (Top {args.top}):")
+    for name, _, cumulative_us, depth in sorted(entries, key=lambda entry: entry[2], reverse=True)[:args.top]:
+        print(f"  {'  ' * min(depth, 4)}{name:<{40 - 2 * min(depth, 4)}} {cumulative_us / 1000.0:>9.1f} ms")
+
+    loaded = {name.split('.')[0] for name, _, _, _ in entries}
+    heavy = [package for package in HEAVY_PACKAGES if package in loaded]
+    if heavy:
+        print(f"\nBeim Start geladene schwere Pakete: {', '.join(heavy)}")
+    else:
+        print("\nKeine schweren Pakete beim Start geladen")
+
+    if args.max_ms is not None and total_ms > args.max_ms:
+        print(f"Importzeit {total_ms:.1f} ms überschreitet den Grenzwert von {args.max_ms:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,6 +5,7 @@ import os
 import json
 import logging
 from pathlib import Path
+from utils.motor_model import MotorModel
 
 class Settings:
     """Klasse zur Verwaltung der Anwendungseinstellungen"""
@@ -27,6 +28,18 @@ class Settings:
         self.camera_type = 'webcam'  # 'webcam' oder 'gphoto2'
         self.camera_device = '/dev/video0'
         self.camera_resolution = '1920x1080'
+        self.camera_warmup_frames = 5  # Frames vor jeder Aufnahme
+        self.settle_threshold = 1.0  # Ruheerkennung: mittlere Grauwertdifferenz
+        self.settle_timeout = 3.0  # Ruheerkennung: maximale Wartezeit in Sekunden
+        self.motor_degrees_per_second = MotorModel.DEFAULT_DEGREES_PER_SECOND  # Motormodell (per Kalibrierung ermittelt)
+        self.motor_startup_lag = 0.0  # Sekunden bis der Teller nach dem Einschalten dreht
+        self.transparent_format = 'png'  # Freigestellte Bilder: 'png', 'webp', 'avif' oder 'jpeg' (JPEG + Maske)
+        self.transparent_quality = 85  # Qualität für webp/avif/jpeg
+        self.png_compression = 3  # zlib-Stufe für PNG (0-9)
+        self.transparent_trim = False  # Auf den Objektrahmen beschneiden (Versatz in transparent.json)
+        # Weitere Aufnahmestationen: Liste von Dictionaries mit 'id', 'name' und eigenen Werten
+        # (z.B. 'arduino_port', 'camera_device'); fehlende Werte gelten wie oben
+        self.stations = []
         self.project_dir = os.path.join(os.path.expanduser('~'), 'Drehteller-Projekte')
         
         # Konfiguration laden, falls vorhanden
@@ -45,6 +58,16 @@ class Settings:
                     self.camera_type = config.get('camera_type', self.camera_type)
                     self.camera_device = config.get('camera_device', self.camera_device)
                     self.camera_resolution = config.get('camera_resolution', self.camera_resolution)
+                    self.camera_warmup_frames = config.get('camera_warmup_frames', self.camera_warmup_frames)
+                    self.settle_threshold = config.get('settle_threshold', self.settle_threshold)
+                    self.settle_timeout = config.get('settle_timeout', self.settle_timeout)
+                    self.motor_degrees_per_second = config.get('motor_degrees_per_second', self.motor_degrees_per_second)
+                    self.motor_startup_lag = config.get('motor_startup_lag', self.motor_startup_lag)
+                    self.transparent_format = config.get('transparent_format', self.transparent_format)
+                    self.transparent_quality = config.get('transparent_quality', self.transparent_quality)
+                    self.png_compression = config.get('png_compression', self.png_compression)
+                    self.transparent_trim = config.get('transparent_trim', self.transparent_trim)
+                    self.stations = config.get('stations', self.stations)
                     self.project_dir = config.get('project_dir', self.project_dir)
                     
                     self.logger.info("Einstellungen aus %s geladen", self.config_file)
@@ -66,6 +89,16 @@ class Settings:
                     'camera_type': self.camera_type,
                     'camera_device': self.camera_device,
                     'camera_resolution': self.camera_resolution,
+                    'camera_warmup_frames': self.camera_warmup_frames,
+                    'settle_threshold': self.settle_threshold,
+                    'settle_timeout': self.settle_timeout,
+                    'motor_degrees_per_second': self.motor_degrees_per_second,
+                    'motor_startup_lag': self.motor_startup_lag,
+                    'transparent_format': self.transparent_format,
+                    'transparent_quality': self.transparent_quality,
+                    'png_compression': self.png_compression,
+                    'transparent_trim': self.transparent_trim,
+                    'stations': self.stations,
                     'project_dir': self.project_dir
                 }
                 json.dump(config, f, indent=4)
@@ -1,8 +1,18 @@
 # Datei: controllers/__init__.py
 # Initialisierungsmodul für das Controllers-Paket
 
-from .arduino_controller import ArduinoController
-from .camera_controller import CameraController
-from .turntable_controller import TurntableController
+# Die Controller werden erst beim ersten Zugriff importiert (pyserial und OpenCV laden langsam)
+_EXPORTS = {
+    'ArduinoController': 'controllers.arduino_controller',
+    'CameraController': 'controllers.camera_controller',
+    'TurntableController': 'controllers.turntable_controller'
+}
 
 __all__ = ['ArduinoController', 'CameraController', 'TurntableController']
+
+def __getattr__(name):
+    """Importiert einen Controller beim ersten Zugriff"""
+    if name in _EXPORTS:
+        import importlib
+        return getattr(importlib.import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -3,12 +3,21 @@
 
 import time
 import logging
-import serial
-import serial.tools.list_ports
+import threading
+from utils.metrics import SERIAL_RECONNECTS_TOTAL, FAILURES_TOTAL
 
 class ArduinoController:
     """Klasse zur Steuerung des Arduino, der den Drehteller antreibt"""
     
+    # Port-Name, unter dem der Hardware-Simulator angesprochen wird ('simulator:<name>' für
+    # einen eigenen simulierten Teller, z.B. pro Station)
+    SIMULATOR_PORT = 'simulator'
+    
+    @classmethod
+    def is_simulator_port(cls, port):
+        """Prüft, ob der Port einen simulierten Arduino bezeichnet"""
+        return port == cls.SIMULATOR_PORT or str(port or '').startswith(cls.SIMULATOR_PORT + ':')
+    
     def __init__(self, port=None, baudrate=9600):
         """Initialisiert die Arduino-Verbindung"""
         self.logger = logging.getLogger(__name__)
@@ -16,6 +25,10 @@ class ArduinoController:
         self.baudrate = baudrate
         self.serial = None
         self.connected = False
+        # Wurde bereits einmal verbunden (weitere Verbindungen zählen als Neuverbindung)
+        self._was_connected = False
+        # Serielle Zugriffe aus mehreren Request-Threads serialisieren
+        self.lock = threading.RLock()
         
         # Verbindung herstellen, wenn ein Port angegeben wurde
         if port:
@@ -24,9 +37,21 @@ class ArduinoController:
     def connect(self):
         """Stellt eine Verbindung zum Arduino her"""
         try:
-            self.serial = serial.Serial(self.port, self.baudrate, timeout=2)
-            time.sleep(2)  # Warten auf Arduino-Reset nach Verbindungsaufbau
+            # pyserial erst beim Verbindungsaufbau laden
+            import serial
+            
+            if self.is_simulator_port(self.port):
+                # Simulierter Arduino über ein Pseudo-Terminal (gleiches serielles Protokoll)
+                from utils.hardware_simulator import get_hardware_simulator
+                device = get_hardware_simulator(key=self.port).start()
+                self.serial = serial.Serial(device, self.baudrate, timeout=2)
+            else:
+                self.serial = serial.Serial(self.port, self.baudrate, timeout=2)
+                time.sleep(2)  # Warten auf Arduino-Reset nach Verbindungsaufbau
             self.connected = True
+            if self._was_connected:
+                SERIAL_RECONNECTS_TOTAL.inc(port=self.port)
+            self._was_connected = True
             self.logger.info("Verbindung zum Arduino hergestellt: %s @ %d Baud", 
                             self.port, self.baudrate)
             return True
@@ -54,6 +79,11 @@ class ArduinoController:
     
     def send_command(self, command):
         """Sendet einen Befehl an den Arduino"""
+        with self.lock:
+            return self._send_command(command)
+    
+    def _send_command(self, command):
+        """Sendet einen Befehl an den Arduino (Aufrufer hält die Sperre)"""
         if not self.connected:
             if not self.connect():
                 self.logger.error("Kann Befehl nicht senden: Keine Verbindung zum Arduino")
@@ -70,6 +100,7 @@ class ArduinoController:
             return response == "OK"
         except Exception as e:
             self.logger.error("Fehler beim Senden des Befehls an Arduino: %s", str(e))
+            FAILURES_TOTAL.inc(stage='serial')
             # Bei Fehler Verbindung trennen und neu verbinden
             self.disconnect()
             return False
@@ -84,11 +115,12 @@ class ArduinoController:
     
     def rotate_for_duration(self, duration_ms):
         """Dreht den Motor für eine bestimmte Zeit (in Millisekunden)"""
-        if not self.turn_motor_on():
-            return False
-        
-        # Warten für die angegebene Dauer
-        time.sleep(duration_ms / 1000.0)
-        
-        # Motor ausschalten
-        return self.turn_motor_off()
+        with self.lock:
+            if not self.turn_motor_on():
+                return False
+            
+            # Warten für die angegebene Dauer
+            time.sleep(duration_ms / 1000.0)
+            
+            # Motor ausschalten
+            return self.turn_motor_off()
@@ -4,18 +4,29 @@
 import os
 import time
 import logging
+import threading
 import subprocess
 import cv2
 from pathlib import Path
+from utils.mjpeg import is_raw_jpeg, decode_frame, frame_to_jpeg_bytes
+from utils.metrics import CAPTURE_SECONDS, IMAGE_WRITE_SECONDS, FAILURES_TOTAL, GPHOTO2_TIMEOUTS_TOTAL
 
 class CameraController:
     """Klasse zur Steuerung der Kamera (Webcam oder gphoto2-Kamera)"""
     
-    def __init__(self, camera_type='webcam', device='/dev/video0', resolution=(1920, 1080)):
+    def __init__(self, camera_type='webcam', device='/dev/video0', resolution=(1920, 1080),
+                 mjpeg_passthrough=True, warmup_frames=5, gphoto2_timeout=60):
         """Initialisiert den Kameracontroller"""
         self.logger = logging.getLogger(__name__)
         self.camera_type = camera_type
         self.device = device
+        # Maximale Dauer einer gphoto2-Aufnahme in Sekunden (hängende Kamera)
+        self.gphoto2_timeout = gphoto2_timeout
+        # Anzahl der Frames, die vor der Aufnahme gelesen werden (Belichtung, Puffer)
+        self.warmup_frames = warmup_frames
+        # MJPEG-Frames der Webcam unverändert speichern (ohne Dekodieren und Neukodieren)
+        self.mjpeg_passthrough = mjpeg_passthrough
+        self.passthrough_active = False
         
         # Auflösung als Tupel (Breite, Höhe)
         if isinstance(resolution, str) and 'x' in resolution:
@@ -27,7 +38,14 @@ class CameraController:
             self.resolution = (1920, 1080)  # Standardauflösung
         
         self.webcam = None
+        self.capture_format = None  # Gewähltes Pixelformat, Auflösung und Bildrate
         self.gphoto2_available = self._check_gphoto2()
+        # Gerätezugriffe aus mehreren Request-Threads serialisieren
+        self.lock = threading.RLock()
+        # Rückrufe für Frames, die während einer Aufnahme gelesen werden (z.B. Live-Vorschau)
+        self.frame_listeners = []
+        # SessionTrace der laufenden Session (Schreib-Spans), gesetzt vom TurntableController
+        self.trace = None
     
     def _check_gphoto2(self):
         """Prüft, ob gphoto2 installiert ist"""
@@ -49,11 +67,33 @@ class CameraController:
                 else:
                     device_id = self.device
                 
-                self.webcam = cv2.VideoCapture(device_id)
+                # Schnellstes Format für die Auflösung aus den gecachten Fähigkeiten wählen
+                capture_format = self._choose_capture_format()
+                passthrough = (self.mjpeg_passthrough and capture_format is not None
+                               and capture_format['fourcc'] == 'MJPG')
                 
-                # Auflösung einstellen
-                self.webcam.set(cv2.CAP_PROP_FRAME_WIDTH, self.resolution[0])
-                self.webcam.set(cv2.CAP_PROP_FRAME_HEIGHT, self.resolution[1])
+                if passthrough:
+                    # Nur das V4L2-Backend liefert bei CONVERT_RGB=0 den rohen JPEG-Bitstrom
+                    self.webcam = cv2.VideoCapture(device_id, cv2.CAP_V4L2)
+                else:
+                    self.webcam = cv2.VideoCapture(device_id)
+                
+                if capture_format:
+                    # Das Pixelformat muss vor der Auflösung gesetzt werden
+                    self.webcam.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*capture_format['fourcc']))
+                    self.webcam.set(cv2.CAP_PROP_FRAME_WIDTH, capture_format['width'])
+                    self.webcam.set(cv2.CAP_PROP_FRAME_HEIGHT, capture_format['height'])
+                    if capture_format['fps']:
+                        self.webcam.set(cv2.CAP_PROP_FPS, capture_format['fps'])
+                    self.capture_format = capture_format
+                    
+                    if passthrough:
+                        self.passthrough_active = bool(self.webcam.set(cv2.CAP_PROP_CONVERT_RGB, 0))
+                        self.logger.info("MJPEG-Passthrough %s", "aktiv" if self.passthrough_active else "nicht unterstützt")
+                else:
+                    # Auflösung einstellen
+                    self.webcam.set(cv2.CAP_PROP_FRAME_WIDTH, self.resolution[0])
+                    self.webcam.set(cv2.CAP_PROP_FRAME_HEIGHT, self.resolution[1])
                 
                 if not self.webcam.isOpened():
                     self.logger.error("Webcam konnte nicht geöffnet werden: %s", self.device)
@@ -68,31 +108,82 @@ class CameraController:
                 return False
         return True
     
+    def _choose_capture_format(self):
+        """Ermittelt Pixelformat, Auflösung und Bildrate anhand der Gerätefähigkeiten"""
+        if self.device.isdigit() or not self.device.startswith('/dev/'):
+            return None
+        
+        try:
+            from utils.camera_capabilities import camera_capabilities
+            capture_format = camera_capabilities.choose_format(self.device, *self.resolution)
+            if capture_format:
+                self.logger.info("Webcam-Format gewählt: %s %dx%d @ %s fps",
+                                 capture_format['fourcc'], capture_format['width'],
+                                 capture_format['height'], capture_format['fps'])
+            return capture_format
+        except Exception as e:
+            self.logger.warning("Webcam-Fähigkeiten nicht verfügbar: %s", str(e))
+            return None
+    
     def _close_webcam(self):
         """Schließt die Webcam"""
         if self.webcam is not None:
             self.webcam.release()
             self.webcam = None
+            self.passthrough_active = False
+    
+    def _notify_frame_listeners(self, frame):
+        """Gibt einen gelesenen Frame an registrierte Rückrufe weiter"""
+        for listener in self.frame_listeners:
+            try:
+                listener(frame)
+            except Exception as e:
+                self.logger.debug("Fehler in einem Frame-Listener: %s", str(e))
+    
+    def read_frame(self):
+        """Liest einen Frame von der Webcam (bei MJPEG-Passthrough als rohen JPEG-Bitstrom)"""
+        with self.lock:
+            if self.camera_type == 'simulator':
+                from utils.hardware_simulator import get_hardware_simulator, simulator_key
+                simulator = get_hardware_simulator(key=simulator_key(self.device))
+                simulator.configure({'resolution': self.resolution})
+                return simulator.camera.read_frame()
+            if not self._setup_webcam():
+                return False, None
+            return self.webcam.read()
     
-    def capture_webcam_photo(self, output_path):
+    def read_decoded_frame(self):
+        """Liest einen Frame von der Webcam und dekodiert ihn bei Bedarf zu BGR"""
+        ret, frame = self.read_frame()
+        if not ret:
+            return False, None
+        frame = decode_frame(frame)
+        return frame is not None, frame
+    
+    def capture_webcam_photo(self, output_path, warmup_frames=None):
         """Nimmt ein Foto mit der Webcam auf"""
         if not self._setup_webcam():
             return False
         
+        if warmup_frames is None:
+            warmup_frames = self.warmup_frames
+        
         try:
             # Stellen Sie sicher, dass das Verzeichnis existiert
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
             
             # Mehrere Frames lesen, um sicherzustellen, dass die Kamera sich angepasst hat
-            for _ in range(5):
+            for index in range(max(1, warmup_frames)):
+                if index:
+                    time.sleep(0.1)
                 ret, frame = self.webcam.read()
                 if not ret:
                     self.logger.error("Fehler beim Lesen des Webcam-Frames")
                     return False
-                time.sleep(0.1)
+                self._notify_frame_listeners(frame)
             
             # Letzten Frame speichern
-            success = cv2.imwrite(output_path, frame)
+            success = self._save_frame(frame, output_path)
             
             if success:
                 self.logger.info("Webcam-Foto gespeichert: %s", output_path)
@@ -104,6 +195,57 @@ class CameraController:
             self.logger.error("Fehler bei der Webcam-Fotoaufnahme: %s", str(e))
             return False
     
+    def _encode_frame(self, frame, output_path):
+        """Kodiert einen Frame im Format der Zieldatei (z.B. JPEG)"""
+        extension = os.path.splitext(output_path)[1] or '.jpg'
+        success, buffer = cv2.imencode(extension, frame)
+        return buffer if success else None
+    
+    def _write_bytes(self, data, output_path):
+        """Schreibt kodierte Bilddaten auf die Festplatte"""
+        with open(output_path, 'wb') as f:
+            f.write(data)
+        return True
+    
+    def _save_frame(self, frame, output_path):
+        """Kodiert einen Frame und speichert ihn"""
+        trace = self.trace
+        with IMAGE_WRITE_SECONDS.time(kind='capture'):
+            if trace is None:
+                return self._encode_and_write(frame, output_path)
+            with trace.span('write', file=os.path.basename(output_path)) as span:
+                span['ok'] = self._encode_and_write(frame, output_path)
+                return span['ok']
+    
+    def _encode_and_write(self, frame, output_path):
+        """Kodiert einen Frame bei Bedarf und schreibt ihn"""
+        if is_raw_jpeg(frame):
+            extension = os.path.splitext(output_path)[1].lower()
+            if extension in ('.jpg', '.jpeg'):
+                # JPEG-Bitstrom der Kamera direkt schreiben (kein Qualitätsverlust)
+                return self._write_bytes(frame_to_jpeg_bytes(frame), output_path)
+            frame = decode_frame(frame)
+            if frame is None:
+                return False
+        
+        buffer = self._encode_frame(frame, output_path)
+        if buffer is None:
+            return False
+        return self._write_bytes(buffer.tobytes(), output_path)
+    
+    def save_frame(self, frame, output_path):
+        """Speichert einen zuvor gelesenen Frame (z.B. aus read_frame) als Bilddatei"""
+        try:
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            if self._save_frame(frame, output_path):
+                self.logger.info("Frame gespeichert: %s", output_path)
+                return True
+            self.logger.error("Fehler beim Speichern des Frames: %s", output_path)
+            return False
+        except Exception as e:
+            self.logger.error("Fehler beim Speichern des Frames: %s", str(e))
+            return False
+    
     def capture_gphoto2_photo(self, output_path):
         """Nimmt ein Foto mit einer gphoto2-kompatiblen Kamera auf"""
         if not self.gphoto2_available:
@@ -127,7 +269,7 @@ class CameraController:
             
             # gphoto2-Befehl ausführen
             self.logger.debug("gphoto2-Befehl: %s", ' '.join(cmd))
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=self.gphoto2_timeout)
             
             if result.returncode == 0:
                 self.logger.info("gphoto2-Foto gespeichert: %s", output_path)
@@ -135,20 +277,62 @@ class CameraController:
             else:
                 self.logger.error("gphoto2-Fehler: %s", result.stderr)
                 return False
+        except subprocess.TimeoutExpired:
+            GPHOTO2_TIMEOUTS_TOTAL.inc()
+            self.logger.error("gphoto2-Aufnahme nach %d s abgebrochen", self.gphoto2_timeout)
+            return False
         except Exception as e:
             self.logger.error("Fehler bei der gphoto2-Fotoaufnahme: %s", str(e))
             return False
     
-    def capture_photo(self, output_path):
+    def capture_simulator_photo(self, output_path):
+        """Nimmt ein synthetisches Foto mit der simulierten Kamera auf"""
+        from utils.hardware_simulator import get_hardware_simulator, simulator_key
+        
+        # Das Gerät ('simulator:<name>') wählt den Teller, den auch der Arduino gleichen Namens dreht
+        simulator = get_hardware_simulator(key=simulator_key(self.device))
+        simulator.configure({'resolution': self.resolution})
+        
+        try:
+            ret, frame = simulator.camera.read_frame()
+            if not ret:
+                self.logger.error("Fehler beim Lesen des Simulator-Frames")
+                return False
+            self._notify_frame_listeners(frame)
+            
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            if self._save_frame(frame, output_path):
+                self.logger.info("Simulator-Foto gespeichert: %s", output_path)
+                return True
+            
+            self.logger.error("Fehler beim Speichern des Simulator-Fotos: %s", output_path)
+            return False
+        except Exception as e:
+            self.logger.error("Fehler bei der Simulator-Fotoaufnahme: %s", str(e))
+            return False
+    
+    def capture_photo(self, output_path, warmup_frames=None):
         """Nimmt ein Foto auf (je nach Kameratyp)"""
+        with self.lock:
+            with CAPTURE_SECONDS.time(camera_type=self.camera_type):
+                success = self._capture_photo(output_path, warmup_frames)
+            if not success:
+                FAILURES_TOTAL.inc(stage='capture')
+            return success
+    
+    def _capture_photo(self, output_path, warmup_frames=None):
+        """Löst die Aufnahme des jeweiligen Kameratyps aus (Aufrufer hält die Sperre)"""
         if self.camera_type == 'webcam':
-            return self.capture_webcam_photo(output_path)
+            return self.capture_webcam_photo(output_path, warmup_frames)
         elif self.camera_type == 'gphoto2':
             return self.capture_gphoto2_photo(output_path)
+        elif self.camera_type == 'simulator':
+            return self.capture_simulator_photo(output_path)
         else:
             self.logger.error("Unbekannter Kameratyp: %s", self.camera_type)
             return False
     
     def cleanup(self):
         """Ressourcen freigeben, wenn die Kamera nicht mehr benötigt wird"""
-        self._close_webcam()
+        with self.lock:
+            self._close_webcam()
@@ -0,0 +1,296 @@
+# Datei: controllers/station_manager.py
+# Modul zur Verwaltung mehrerer Aufnahmestationen (Drehteller + Kamera) auf einem Server
+
+import time
+import uuid
+import queue
+import logging
+import threading
+from utils.motor_model import MotorModel
+
+class Station:
+    """Eine Aufnahmestation mit eigenen Controllern, eigener Sperre und eigener Auftragswarteschlange"""
+
+    # Auftragsarten und die zugehörigen Methoden des TurntableControllers
+    JOB_KINDS = ('capture', 'continuous', 'resume')
+    # Anzahl abgeschlossener Aufträge, die für Statusabfragen aufbewahrt werden
+    MAX_FINISHED_JOBS = 100
+
+    def __init__(self, station_id, config, settings, project_loader):
+        """Initialisiert die Station (Controller werden beim ersten Zugriff erstellt)"""
+        self.logger = logging.getLogger(__name__)
+        self.id = station_id
+        self.name = config.get('name', station_id)
+        self.config = config
+        self.settings = settings
+        self.project_loader = project_loader
+
+        # Sperre für Hardware-Abläufe dieser Station (andere Stationen laufen unabhängig)
+        self.lock = threading.RLock()
+        # Kurze Sperre für das Erstellen der Controller (blockiert nicht während einer Aufnahme)
+        self._init_lock = threading.RLock()
+        self._reset_pending = False
+        self.arduino = None
+        self.camera = None
+        self.turntable = None
+        self.preview_stream = None
+
+        self.jobs = {}
+        self._queue = queue.Queue()
+        self._worker = None
+        self.current_job = None
+
+    def get_setting(self, key, default=None):
+        """Stationswert mit Rückfall auf die globalen Einstellungen"""
+        return self.config.get(key, getattr(self.settings, key, default))
+
+    def get_motor_model(self):
+        """Motormodell der Station (jeder Motor wird einzeln kalibriert)"""
+        return MotorModel(self.get_setting('motor_degrees_per_second'), self.get_setting('motor_startup_lag', 0.0))
+
+    def save_motor_model(self, model):
+        """Speichert ein kalibriertes Motormodell für diese Station"""
+        with self._init_lock:
+            if self.turntable:
+                self.turntable.motor_model = model
+
+        # Zusätzliche Stationen speichern ihr Modell in ihrem Eintrag, die Standardstation global
+        if any(config is self.config for config in self.settings.stations):
+            self.config['motor_degrees_per_second'] = model.degrees_per_second
+            self.config['motor_startup_lag'] = model.startup_lag
+            return self.settings.save()
+        return model.save_to_settings(self.settings)
+
+    def _simulator_name(self):
+        """Simulator-Port bzw. -Gerät dieser Station (jede Station dreht ihren eigenen Teller)"""
+        port = str(self.get_setting('arduino_port') or '')
+        return port if port.startswith('simulator:') else f"simulator:{self.id}"
+
+    def get_arduino(self):
+        """Gibt den Arduino-Controller zurück (und verbindet bei Bedarf neu)"""
+        from controllers.arduino_controller import ArduinoController
+
+        with self._init_lock:
+            if self.arduino is None:
+                port = self.get_setting('arduino_port')
+                if port == ArduinoController.SIMULATOR_PORT:
+                    port = self._simulator_name()
+                self.arduino = ArduinoController(port, self.get_setting('arduino_baudrate', 9600))
+            elif not self.arduino.is_connected() and self.arduino.port:
+                self.arduino.connect()
+            return self.arduino
+
+    def get_camera(self):
+        """Gibt den Kamera-Controller zurück"""
+        from controllers.camera_controller import CameraController
+
+        with self._init_lock:
+            if self.camera is None:
+                camera_type = self.get_setting('camera_type', 'webcam')
+                device = self.get_setting('camera_device', '/dev/video0')
+                if camera_type == 'simulator' and not str(device).startswith('simulator:'):
+                    device = self._simulator_name()
+                self.camera = CameraController(camera_type, device,
+                                               self.get_setting('camera_resolution', '1920x1080'),
+                                               warmup_frames=self.get_setting('camera_warmup_frames', 5))
+            return self.camera
+
+    def get_turntable(self):
+        """Gibt den Drehteller-Controller mit Ruheerkennung und Motormodell zurück"""
+        from controllers.turntable_controller import TurntableController
+        from utils.settle_detector import SettleDetector
+
+        with self._init_lock:
+            arduino = self.get_arduino()
+            if self.turntable is None:
+                settle_detector = SettleDetector(self.get_setting('settle_threshold', 1.0), self.get_setting('settle_timeout', 3.0))
+                self.turntable = TurntableController(arduino, 5, settle_detector, self.get_motor_model())
+            return self.turntable
+
+    def get_preview_stream(self):
+        """Gibt den Vorschau-Stream der Stationskamera zurück"""
+        from utils.preview_stream import PreviewStream
+
+        with self._init_lock:
+            camera = self.get_camera()
+            if self.preview_stream is None or self.preview_stream.camera is not camera:
+                if self.preview_stream is not None:
+                    self.preview_stream.close()
+                self.preview_stream = PreviewStream(camera)
+            return self.preview_stream
+
+    def reset(self):
+        """Gibt die Controller frei, z.B. nach geänderten Einstellungen"""
+        # Während eines Auftrags erst danach freigeben
+        if self.current_job is not None:
+            self._reset_pending = True
+            return
+
+        with self._init_lock:
+            self._reset_pending = False
+            if self.preview_stream:
+                self.preview_stream.close()
+            if self.camera:
+                self.camera.cleanup()
+            if self.arduino:
+                self.arduino.disconnect()
+            self.arduino = None
+            self.camera = None
+            self.turntable = None
+            self.preview_stream = None
+
+    def submit(self, kind, project_id, session_id=None):
+        """Stellt einen Aufnahmeauftrag in die Warteschlange der Station"""
+        if kind not in self.JOB_KINDS:
+            raise ValueError(f"Unbekannte Auftragsart: {kind}")
+
+        job = {
+            'id': str(uuid.uuid4()),
+            'station': self.id,
+            'kind': kind,
+            'project_id': project_id,
+            'session_id': session_id,
+            'status': 'queued',
+            'submitted': time.time(),
+            'started': None,
+            'finished': None
+        }
+        self._prune_jobs()
+        self.jobs[job['id']] = job
+        self._queue.put(job)
+        self._ensure_worker()
+        self.logger.info(f"Auftrag {job['id']} ({kind}) für Station {self.id} eingereiht")
+        return job
+
+    def _prune_jobs(self):
+        """Entfernt die ältesten abgeschlossenen Aufträge über MAX_FINISHED_JOBS hinaus"""
+        finished = [job_id for job_id, job in list(self.jobs.items()) if job['status'] in ('done', 'failed')]
+        for job_id in finished[:max(0, len(finished) - self.MAX_FINISHED_JOBS)]:
+            self.jobs.pop(job_id, None)
+
+    def _ensure_worker(self):
+        """Startet den Worker-Thread der Station, falls er nicht läuft"""
+        with self._init_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name=f'Station-{self.id}', daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        """Worker-Thread: arbeitet die Aufträge der Station nacheinander ab"""
+        while True:
+            job = self._queue.get()
+            self.current_job = job
+            job['status'] = 'running'
+            job['started'] = time.time()
+
+            try:
+                success = self._execute(job)
+                job['status'] = 'done' if success else 'failed'
+            except Exception as e:
+                self.logger.error(f"Fehler bei Auftrag {job['id']} auf Station {self.id}: {str(e)}")
+                job['status'] = 'failed'
+                job['error'] = str(e)
+            finally:
+                job['finished'] = time.time()
+                self.current_job = None
+                self._queue.task_done()
+                if self._reset_pending:
+                    self.reset()
+
+    def _execute(self, job):
+        """Führt einen Auftrag mit den Controllern der Station aus"""
+        project = self.project_loader(job['project_id'])
+        if not project:
+            job['error'] = 'Projekt nicht gefunden'
+            return False
+
+        with self.lock:
+            turntable = self.get_turntable()
+            camera = self.get_camera()
+            turntable.last_session_id = None
+
+            if job['kind'] == 'continuous':
+                success = turntable.start_continuous_session(project, camera)
+            elif job['kind'] == 'resume':
+                success = turntable.resume_session(project, job['session_id'], camera)
+            else:
+                success = turntable.start_session(project, camera)
+
+            # Die neue Session dem Auftrag zuordnen (project.sessions kann Sessions anderer Stationen enthalten)
+            if turntable.last_session_id and not job['session_id']:
+                job['session_id'] = turntable.last_session_id
+            return success
+
+    def queue_depth(self):
+        """Anzahl der wartenden Aufträge"""
+        return self._queue.qsize()
+
+    def get_status(self):
+        """Gibt den Zustand der Station zurück"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'arduino_port': self.get_setting('arduino_port'),
+            'arduino_baudrate': self.get_setting('arduino_baudrate'),
+            'camera_type': self.get_setting('camera_type'),
+            'camera_device': self.get_setting('camera_device'),
+            'camera_resolution': self.get_setting('camera_resolution'),
+            'busy': self.current_job is not None,
+            'queued': self.queue_depth(),
+            'current_job': self.current_job
+        }
+
+
+class StationRegistry:
+    """Zuordnung von Stations-IDs zu Stationen (Konfiguration aus den Einstellungen)"""
+
+    DEFAULT_STATION = 'default'
+
+    def __init__(self, settings, project_loader):
+        """Initialisiert die Registry"""
+        self.logger = logging.getLogger(__name__)
+        self.settings = settings
+        self.project_loader = project_loader
+        self._stations = {}
+        self._lock = threading.Lock()
+        self.reload()
+
+    def reload(self):
+        """Liest die Stationen aus den Einstellungen neu ein"""
+        with self._lock:
+            # Die Standardstation verwendet die globalen Einstellungen
+            configs = {self.DEFAULT_STATION: {'name': 'Standard'}}
+            for config in self.settings.stations:
+                if config.get('id'):
+                    configs[config['id']] = config
+
+            for station_id in list(self._stations):
+                if station_id not in configs:
+                    self._stations.pop(station_id).reset()
+
+            for station_id, config in configs.items():
+                station = self._stations.get(station_id)
+                if station is None:
+                    self._stations[station_id] = Station(station_id, config, self.settings, self.project_loader)
+                else:
+                    # Geänderte Einstellungen: Controller beim nächsten Zugriff neu erstellen
+                    station.config = config
+                    station.name = config.get('name', station_id)
+                    station.reset()
+
+    def get(self, station_id=None):
+        """Gibt eine Station zurück (ohne ID die Standardstation)"""
+        with self._lock:
+            return self._stations.get(station_id or self.DEFAULT_STATION)
+
+    def get_all(self):
+        """Gibt alle Stationen zurück"""
+        with self._lock:
+            return list(self._stations.values())
+
+    def find_job(self, job_id):
+        """Sucht einen Auftrag über alle Stationen"""
+        for station in self.get_all():
+            if job_id in station.jobs:
+                return station.jobs[job_id]
+        return None
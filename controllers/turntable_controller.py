@@ -6,26 +6,89 @@ import logging
 import math
 import os
 import uuid
+import threading
 from pathlib import Path
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
 from models.photo_session import PhotoSession
+from utils.motor_model import MotorModel
+from utils.metrics import ROTATION_SECONDS, SETTLE_SECONDS, FRAMES_TOTAL, FAILURES_TOTAL
+from utils.session_trace import SessionTrace
 
 class TurntableController:
     """Klasse zur Steuerung des Drehtellers mit dem Arduino"""
     
-    # Konstanten für den Drehteller (0,8° pro Umdrehung bei diesem Motor)
-    MOTOR_DEGREE_PER_SECOND = 0.8 / 5.0  # 0,8° in 5 Sekunden (basierend auf den Angaben)
+    # Nennwert des Motors (0,8° in 5 Sekunden), gemeinsam mit Einstellungen und Simulator
+    MOTOR_DEGREE_PER_SECOND = MotorModel.DEFAULT_DEGREES_PER_SECOND
     
-    def __init__(self, arduino_controller, default_angle_step=5):
+    # Kameratypen, die fortlaufend Frames für die Ruheerkennung liefern können
+    STREAMING_CAMERA_TYPES = ('webcam', 'simulator')
+    
+    # Sessions, die gerade aufgenommen werden (über alle Stationen des Prozesses)
+    _active_sessions = set()
+    _active_lock = threading.Lock()
+    
+    def __init__(self, arduino_controller, default_angle_step=5, settle_detector=None, motor_model=None):
         """Initialisiert den Drehteller-Controller"""
         self.logger = logging.getLogger(__name__)
         self.arduino = arduino_controller
         self.default_angle_step = default_angle_step
-        self.current_position = 0  # Aktuelle Position in Grad (0-360)
+        self.current_position = 0.0  # Geschätzte Position in Grad (0-360)
+        # Zeitmodell des Motors (Geschwindigkeit und Anlaufzeit, siehe MotorCalibrator)
+        self.motor_model = motor_model or MotorModel(self.MOTOR_DEGREE_PER_SECOND)
+        self.settle_time = 1.0  # Wartezeit nach jeder Bewegung in Sekunden (ohne Ruheerkennung)
+        self.settle_detector = settle_detector  # Optionaler SettleDetector
+        self.trace = None  # SessionTrace der laufenden Session
+        self.last_session_id = None  # Zuletzt angelegte Session (für die Zuordnung zu Aufträgen)
+    
+    def _span(self, name, **fields):
+        """Span im Trace der laufenden Session (ohne Trace wirkungslos)"""
+        return self.trace.span(name, **fields) if self.trace else nullcontext({})
+    
+    def _tagged(self, **fields):
+        """Felder für alle Spans des Threads im Block (ohne Trace wirkungslos)"""
+        return self.trace.tagged(**fields) if self.trace else nullcontext()
+    
+    def _add_span(self, name, start, end, depth=0, **fields):
+        """Schreibt einen bereits gemessenen Span (ohne Trace wirkungslos)"""
+        if self.trace:
+            self.trace.add_span(name, start, end, depth, **fields)
+    
+    def _start_trace(self, session, base_path, camera_controller, kind):
+        """Beginnt den Trace eines Laufs im Session-Verzeichnis (auch für die Kamera)"""
+        try:
+            self.trace = SessionTrace(base_path, session.id, kind)
+        except OSError as e:
+            self.logger.warning(f"Session-Trace konnte nicht angelegt werden: {str(e)}")
+            return
+        camera_controller.trace = self.trace
+    
+    def _stop_trace(self, camera_controller, success):
+        """Schließt den Trace des Laufs"""
+        if self.trace:
+            camera_controller.trace = None
+            self.trace.close(success)
+            self.trace = None
+    
+    @classmethod
+    def _claim_session(cls, session_id):
+        """Markiert eine Session als in Aufnahme; False, wenn sie bereits aufgenommen wird"""
+        with cls._active_lock:
+            if session_id in cls._active_sessions:
+                return False
+            cls._active_sessions.add(session_id)
+            return True
+    
+    @classmethod
+    def _release_session(cls, session_id):
+        """Gibt eine Session nach Ende der Aufnahme wieder frei"""
+        with cls._active_lock:
+            cls._active_sessions.discard(session_id)
     
     def calculate_rotation_time(self, degrees):
         """Berechnet die Zeit, die für eine Rotation um einen bestimmten Winkel benötigt wird"""
-        # Die Zeit wird in Millisekunden zurückgegeben
-        return int((degrees / self.MOTOR_DEGREE_PER_SECOND) * 1000)
+        # Die Zeit wird in Millisekunden zurückgegeben (inklusive Anlaufzeit des Motors)
+        return self.motor_model.duration_ms_for(degrees)
     
     def move_degrees(self, degrees):
         """Bewegt den Drehteller um einen bestimmten Winkel (in Grad)"""
@@ -37,23 +100,108 @@ class TurntableController:
         rotation_time_ms = self.calculate_rotation_time(degrees)
         
         # Motor für die berechnete Zeit einschalten
-        success = self.arduino.rotate_for_duration(rotation_time_ms)
+        with ROTATION_SECONDS.time():
+            success = self.arduino.rotate_for_duration(rotation_time_ms)
         
         if success:
-            # Position aktualisieren
-            self.current_position = (self.current_position + degrees) % 360
-            self.logger.info("Drehteller um %d Grad gedreht, neue Position: %d Grad", 
+            # Position aus der tatsächlichen Einschaltdauer schätzen (Rundung der Millisekunden)
+            moved = self.motor_model.angle_for(rotation_time_ms / 1000.0)
+            self.current_position = (self.current_position + moved) % 360
+            self.logger.info("Drehteller um %d Grad gedreht, geschätzte Position: %.2f Grad", 
                             degrees, self.current_position)
         else:
+            FAILURES_TOTAL.inc(stage='rotation')
             self.logger.error("Fehler beim Drehen des Tellers um %d Grad", degrees)
         
         return success
     
+    def wait_for_settle(self, camera_controller=None):
+        """Wartet, bis der Teller nach einer Bewegung zur Ruhe gekommen ist"""
+        if (self.settle_detector and camera_controller
+                and camera_controller.camera_type in self.STREAMING_CAMERA_TYPES):
+            settled, elapsed, _ = self.settle_detector.wait(camera_controller.read_frame)
+            if settled or elapsed >= self.settle_detector.timeout:
+                SETTLE_SECONDS.observe(elapsed, method='detector')
+                return settled
+            # Keine Frames verfügbar, feste Wartezeit verwenden
+        
+        time.sleep(self.settle_time)
+        SETTLE_SECONDS.observe(self.settle_time, method='fixed')
+        return False
+    
     def reset_position(self):
         """Setzt die aktuelle Position auf 0 Grad zurück (ohne Bewegung)"""
-        self.current_position = 0
+        self.current_position = 0.0
         self.logger.info("Drehteller-Position zurückgesetzt")
     
+    def _create_session(self, project):
+        """Legt eine neue Session an und trägt sie sofort (im Zustand in_progress) ins Projekt ein"""
+        session_id = str(uuid.uuid4())
+        session = PhotoSession(
+            id=session_id,
+            name=f"Session {time.strftime('%Y-%m-%d %H:%M')}",
+            timestamp=time.time(),
+            angle_step=project.angle_step
+        )
+        
+        # Speicherpfad für die Fotos
+        base_path = os.path.join(project.path, "sessions", session_id)
+        os.makedirs(base_path, exist_ok=True)
+        
+        # Auch eine abgebrochene Session bleibt so im Projekt sichtbar und fortsetzbar
+        self._claim_session(session_id)
+        self.last_session_id = session_id
+        project.add_session(session)
+        session.save_manifest(base_path)
+        project.save()
+        return session, base_path
+    
+    def _finish_session(self, project, session, base_path, success):
+        """Setzt den Endzustand der Session und speichert Manifest und Projekt"""
+        session.set_status(PhotoSession.STATUS_COMPLETED if success else PhotoSession.STATUS_FAILED)
+        session.save_manifest(base_path)
+        project.save_session(session)
+        self._release_session(session.id)
+    
+    def _capture_steps(self, session, base_path, angles, camera_controller):
+        """Nimmt die angegebenen Winkel im Start-Stopp-Betrieb auf (Checkpoint nach jedem Bild)"""
+        # Nach erkannter Ruhe liefert die Kamera bereits aktuelle Frames
+        warmup_frames = None
+        
+        for index, angle in enumerate(angles):
+            # Dateiname für das Foto
+            photo_filename = os.path.join(base_path, f"angle_{angle:03d}.jpg")
+            
+            # Foto aufnehmen
+            self.logger.info(f"Nehme Foto bei {angle} Grad auf")
+            with self._span('capture', angle=angle) as span:
+                span['ok'] = camera_controller.capture_photo(photo_filename, warmup_frames)
+            if not span['ok']:
+                self.logger.error(f"Fehler beim Aufnehmen des Fotos bei {angle} Grad")
+                return False
+            
+            # Session-Informationen aktualisieren und Checkpoint schreiben
+            FRAMES_TOTAL.inc(stage='capture')
+            session.add_photo(angle, photo_filename)
+            session.position = self.current_position
+            with self._span('checkpoint', angle=angle) as span:
+                span['ok'] = session.save_manifest(base_path)
+            
+            # Wenn wir nicht beim letzten Schritt sind, drehen wir weiter
+            if index < len(angles) - 1:
+                next_angle = angles[index + 1]
+                with self._span('move', angle=next_angle) as span:
+                    span['ok'] = self.move_degrees((next_angle - angle) % 360)
+                if not span['ok']:
+                    return False
+                session.position = self.current_position
+                # Warten, bis der Teller zur Ruhe gekommen ist
+                with self._span('settle', angle=next_angle) as span:
+                    settled = span['settled'] = self.wait_for_settle(camera_controller)
+                warmup_frames = 1 if settled else None
+        
+        return True
+    
     def start_session(self, project, camera_controller):
         """Startet eine Fotosession für ein Projekt"""
         if not self.arduino or not self.arduino.is_connected():
@@ -64,57 +212,276 @@ class TurntableController:
             self.logger.error("Kamera-Controller ist nicht initialisiert")
             return False
         
+        session = None
         try:
-            # Neue Session erstellen
-            session_id = str(uuid.uuid4())
-            session = PhotoSession(
-                id=session_id,
-                name=f"Session {time.strftime('%Y-%m-%d %H:%M')}",
-                timestamp=time.time(),
-                angle_step=project.angle_step
-            )
-            
-            # Speicherpfad für die Fotos
-            base_path = os.path.join(project.path, "sessions", session_id)
-            os.makedirs(base_path, exist_ok=True)
-            
             # Drehteller auf Position 0 zurücksetzen (ohne Bewegung)
             self.reset_position()
             
-            # Anzahl der benötigten Schritte berechnen
-            total_steps = 360 // project.angle_step
+            session, base_path = self._create_session(project)
+            angles = session.get_expected_angles()
             
-            self.logger.info(f"Starte Fotosession mit {total_steps} Schritten alle {project.angle_step} Grad")
+            self.logger.info(f"Starte Fotosession mit {len(angles)} Schritten alle {project.angle_step} Grad")
             
-            for step in range(total_steps):
-                # Aktuelle Winkelposition
-                angle = step * project.angle_step
-                
-                # Dateiname für das Foto
-                photo_filename = os.path.join(base_path, f"angle_{angle:03d}.jpg")
-                
-                # Foto aufnehmen
-                self.logger.info(f"Nehme Foto bei {angle} Grad auf")
-                if not camera_controller.capture_photo(photo_filename):
-                    self.logger.error(f"Fehler beim Aufnehmen des Fotos bei {angle} Grad")
+            # Zeitverlauf aller Schritte in trace.jsonl im Session-Verzeichnis aufzeichnen
+            self._start_trace(session, base_path, camera_controller, 'capture')
+            success = self._capture_steps(session, base_path, angles, camera_controller)
+            self._stop_trace(camera_controller, success)
+            self._finish_session(project, session, base_path, success)
+            
+            if success:
+                self.logger.info(f"Fotosession erfolgreich abgeschlossen: {session.id}")
+            return success
+            
+        except Exception as e:
+            self.logger.error(f"Fehler während der Fotosession: {str(e)}")
+            self._stop_trace(camera_controller, False)
+            if session:
+                self._finish_session(project, session, base_path, False)
+            return False
+    
+    def resume_session(self, project, session_id, camera_controller):
+        """Setzt eine abgebrochene Session fort und nimmt nur die fehlenden Winkel auf"""
+        if not self.arduino or not self.arduino.is_connected():
+            self.logger.error("Arduino ist nicht verbunden")
+            return False
+        
+        if not camera_controller:
+            self.logger.error("Kamera-Controller ist nicht initialisiert")
+            return False
+        
+        session = project.get_session(session_id)
+        if not session:
+            self.logger.error(f"Session nicht gefunden: {session_id}")
+            return False
+        
+        # Eine laufende Aufnahme nicht ein zweites Mal in dasselbe Verzeichnis starten; ein
+        # in_progress ohne laufende Aufnahme (z.B. nach einem Absturz) darf fortgesetzt werden
+        if not self._claim_session(session_id):
+            self.logger.error(f"Session {session_id} wird gerade aufgenommen und kann nicht fortgesetzt werden")
+            return False
+        
+        base_path = os.path.join(project.path, "sessions", session_id)
+        try:
+            # Das Manifest enthält den Stand nach dem letzten erfolgreichen Bild
+            session.load_manifest(base_path)
+            missing = session.get_missing_angles()
+            if not missing:
+                self._finish_session(project, session, base_path, True)
+                return True
+            
+            session.set_status(PhotoSession.STATUS_IN_PROGRESS)
+            session.save_manifest(base_path)
+            project.save_session(session)
+            
+            # Vom gespeicherten Tellerstand zum ersten fehlenden Winkel drehen
+            self.current_position = session.position
+            offset = (missing[0] - self.current_position) % 360
+            self.logger.info(f"Setze Session {session_id} fort: {len(missing)} fehlende Winkel, "
+                             f"Drehung um {offset:.1f} Grad")
+            self._start_trace(session, base_path, camera_controller, 'resume')
+            if offset > 0.5:
+                with self._span('move', angle=missing[0]) as span:
+                    span['ok'] = self.move_degrees(offset)
+                if not span['ok']:
+                    self._stop_trace(camera_controller, False)
+                    self._finish_session(project, session, base_path, False)
                     return False
-                
-                # Session-Informationen aktualisieren
-                session.add_photo(angle, photo_filename)
-                
-                # Wenn wir nicht beim letzten Schritt sind, drehen wir weiter
-                if step < total_steps - 1:
-                    self.move_degrees(project.angle_step)
-                    # Kurze Pause für Stabilisierung
-                    time.sleep(1)
+                with self._span('settle', angle=missing[0]) as span:
+                    span['settled'] = self.wait_for_settle(camera_controller)
             
-            # Session zum Projekt hinzufügen
-            project.add_session(session)
-            project.save()
+            success = self._capture_steps(session, base_path, missing, camera_controller)
+            self._stop_trace(camera_controller, success)
+            self._finish_session(project, session, base_path, success)
+            return success
             
-            self.logger.info(f"Fotosession erfolgreich abgeschlossen: {session_id}")
-            return True
+        except Exception as e:
+            self.logger.error(f"Fehler beim Fortsetzen der Fotosession: {str(e)}")
+            self._stop_trace(camera_controller, False)
+            self._finish_session(project, session, base_path, False)
+            return False
+
+    def start_continuous_session(self, project, camera_controller, exposure_latency=0.0):
+        """Startet eine Fotosession in einer durchgehenden Umdrehung (ohne Start-Stopp)
+
+        Der Motor läuft eine volle Umdrehung. Webcams liefern fortlaufend Frames, von
+        denen pro Zielwinkel der nächstgelegene gespeichert wird; andere Kameras werden
+        zu vorausberechneten Zeitpunkten ausgelöst. Die Winkel stammen aus dem Motormodell.
+        exposure_latency: Zeit zwischen Belichtung und Rückgabe eines Frames in Sekunden
+        """
+        if not self.arduino or not self.arduino.is_connected():
+            self.logger.error("Arduino ist nicht verbunden")
+            return False
+        
+        if not camera_controller:
+            self.logger.error("Kamera-Controller ist nicht initialisiert")
+            return False
+        
+        session = None
+        success = False
+        try:
+            self.reset_position()
+            session, base_path = self._create_session(project)
+            session.mode = 'continuous'
+            
+            targets = session.get_expected_angles()
+            revolution_time = self.motor_model.duration_for(360)
+            
+            self.logger.info(f"Starte kontinuierliche Fotosession mit {len(targets)} Bildern "
+                             f"in {revolution_time:.1f} s")
+            
+            self._start_trace(session, base_path, camera_controller, 'continuous')
+            # Arduino und Kamera für die gesamte Umdrehung belegen
+            with self.arduino.lock, camera_controller.lock:
+                if camera_controller.camera_type in self.STREAMING_CAMERA_TYPES:
+                    captured = self._capture_streaming(session, camera_controller, targets, base_path,
+                                                       revolution_time, exposure_latency)
+                else:
+                    captured = self._capture_scheduled(session, camera_controller, targets, base_path,
+                                                       revolution_time, exposure_latency)
+            
+            FRAMES_TOTAL.inc(len(captured), stage='capture')
+            session.position = self.current_position
+            
+            success = len(captured) == len(targets)
+            if not success:
+                self.logger.error(f"Nur {len(captured)} von {len(targets)} Bildern aufgenommen")
+            self._finish_session(project, session, base_path, success)
+            
+            if success:
+                self.logger.info(f"Kontinuierliche Fotosession erfolgreich abgeschlossen: {session.id}")
+            return success
             
         except Exception as e:
-            self.logger.error(f"Fehler während der Fotosession: {str(e)}")
+            self.logger.error(f"Fehler während der kontinuierlichen Fotosession: {str(e)}")
+            self.arduino.turn_motor_off()
+            if session:
+                self._finish_session(project, session, base_path, False)
             return False
+        finally:
+            self._stop_trace(camera_controller, success)
+    
+    def _checkpoint(self, session, base_path, angle, photo_filename, actual_angle):
+        """Trägt ein Bild der Umdrehung in die Session ein und schreibt den Checkpoint"""
+        session.add_photo(angle, photo_filename, actual_angle)
+        with self._span('checkpoint', angle=angle) as span:
+            span['ok'] = session.save_manifest(base_path)
+    
+    def _capture_streaming(self, session, camera_controller, targets, base_path, revolution_time, exposure_latency):
+        """Liest Frames während der Umdrehung und wählt pro Zielwinkel den nächstgelegenen
+
+        Im Trace umfasst der Span 'move' eines Winkels die Drehung seit dem vorherigen
+        Zielwinkel, 'capture' das Lesen des gewählten Frames.
+        """
+        captured = []
+        pending = []
+        best = None  # (Abweichung, Winkel, Frame, Lesebeginn, Leseende) für den aktuellen Zielwinkel
+        index = 0
+        
+        def store(target, frame, photo_filename, actual_angle):
+            # Läuft im Schreib-Thread; der Checkpoint folgt erst auf das gespeicherte Bild
+            with self._tagged(angle=target):
+                if not camera_controller.save_frame(frame, photo_filename):
+                    return False
+                self._checkpoint(session, base_path, target, photo_filename, actual_angle)
+                return True
+        
+        # Speichern im Hintergrund, damit keine Frames des Streams verloren gehen
+        with ThreadPoolExecutor(max_workers=1) as writer:
+            def finish(target, candidate):
+                nonlocal segment_start
+                distance, actual_angle, frame, read_start, read_end = candidate
+                now = time.monotonic()
+                self._add_span('move', segment_start, now, angle=target)
+                self._add_span('capture', read_start, read_end, depth=1, angle=target,
+                               actual_angle=round(actual_angle, 3))
+                segment_start = now
+                photo_filename = os.path.join(base_path, f"angle_{target:03d}.jpg")
+                pending.append((writer.submit(store, target, frame, photo_filename, actual_angle),
+                                (target, photo_filename, actual_angle)))
+            
+            if not self.arduino.turn_motor_on():
+                return captured
+            motor_start = segment_start = time.monotonic()
+            
+            try:
+                while index < len(targets):
+                    elapsed = time.monotonic() - motor_start
+                    if elapsed > revolution_time:
+                        break
+                    
+                    read_start = time.monotonic()
+                    ret, frame = camera_controller.read_frame()
+                    read_end = time.monotonic()
+                    if not ret:
+                        continue
+                    actual_angle = self.motor_model.angle_for(read_end - motor_start - exposure_latency)
+                    
+                    # Winkel steigen monoton: entfernt sich der Frame vom Ziel, ist das beste Bild gefunden
+                    while index < len(targets):
+                        distance = abs(actual_angle - targets[index])
+                        if best is None or distance <= best[0]:
+                            best = (distance, actual_angle, frame, read_start, read_end)
+                            break
+                        finish(targets[index], best)
+                        index += 1
+                        best = None
+                
+                # Umdrehung vollenden, damit der Teller wieder bei 0 Grad steht
+                with self._span('move'):
+                    remaining = motor_start + revolution_time - time.monotonic()
+                    if remaining > 0:
+                        time.sleep(remaining)
+            finally:
+                self.arduino.turn_motor_off()
+            
+            if best is not None and index < len(targets):
+                finish(targets[index], best)
+            
+            self.current_position = self.motor_model.angle_for(time.monotonic() - motor_start) % 360
+        
+        for future, result in pending:
+            if future.result():
+                captured.append(result)
+        return captured
+    
+    def _capture_scheduled(self, session, camera_controller, targets, base_path, revolution_time, exposure_latency):
+        """Löst die Kamera zu den laut Motormodell berechneten Zeitpunkten aus
+
+        Im Trace umfasst der Span 'move' eines Winkels das Warten auf seinen Auslösezeitpunkt.
+        """
+        captured = []
+        
+        if not self.arduino.turn_motor_on():
+            return captured
+        motor_start = time.monotonic()
+        
+        try:
+            for target in targets:
+                trigger_time = motor_start + self.motor_model.duration_for(target) - exposure_latency
+                with self._span('move', angle=target):
+                    delay = trigger_time - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                
+                triggered = time.monotonic()
+                photo_filename = os.path.join(base_path, f"angle_{target:03d}.jpg")
+                with self._span('capture', angle=target) as span:
+                    span['ok'] = camera_controller.capture_photo(photo_filename)
+                if not span['ok']:
+                    self.logger.error(f"Fehler beim Aufnehmen des Fotos bei {target} Grad")
+                    break
+                
+                actual_angle = self.motor_model.angle_for(triggered - motor_start + exposure_latency)
+                self._checkpoint(session, base_path, target, photo_filename, actual_angle)
+                captured.append((target, photo_filename, actual_angle))
+            
+            # Umdrehung vollenden, damit der Teller wieder bei 0 Grad steht
+            with self._span('move'):
+                remaining = motor_start + revolution_time - time.monotonic()
+                if remaining > 0:
+                    time.sleep(remaining)
+        finally:
+            self.arduino.turn_motor_off()
+        
+        self.current_position = self.motor_model.angle_for(time.monotonic() - motor_start) % 360
+        return captured
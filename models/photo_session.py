@@ -2,6 +2,7 @@
 # Modul für das Fotosession-Datenmodell
 
 import os
+import json
 import time
 import uuid
 import logging
@@ -10,6 +11,14 @@ from pathlib import Path
 class PhotoSession:
     """Klasse zur Darstellung einer Fotosession"""
     
+    # Manifest im Session-Verzeichnis, wird nach jedem Bild aktualisiert
+    MANIFEST_FILE = 'session.json'
+    
+    # Zustände einer Session
+    STATUS_IN_PROGRESS = 'in_progress'
+    STATUS_FAILED = 'failed'
+    STATUS_COMPLETED = 'completed'
+    
     def __init__(self, id=None, name="Neue Session", timestamp=None, angle_step=5):
         """Initialisiert eine Fotosession"""
         self.id = id or str(uuid.uuid4())
@@ -17,21 +26,80 @@ class PhotoSession:
         self.timestamp = timestamp or time.time()
         self.angle_step = angle_step
         self.photos = {}  # Dictionary mit Winkel als Schlüssel und Dateipfad als Wert
+        self.frame_angles = {}  # Tatsächlicher Winkel laut Motormodell (kontinuierlicher Modus)
+        self.mode = 'step'  # 'step' (Start-Stopp) oder 'continuous' (eine durchgehende Umdrehung)
+        self.status = self.STATUS_IN_PROGRESS
+        self.position = 0.0  # Geschätzte Tellerposition nach dem letzten Schritt (für die Fortsetzung)
         self.completed = False
     
-    def add_photo(self, angle, photo_path):
+    def add_photo(self, angle, photo_path, actual_angle=None):
         """Fügt ein Foto zur Session hinzu"""
         self.photos[angle] = photo_path
+        if actual_angle is not None:
+            self.frame_angles[angle] = round(actual_angle, 3)
     
     def get_photo(self, angle):
         """Gibt den Pfad eines Fotos für einen bestimmten Winkel zurück"""
-        return self.photos.get(angle)
+        # Winkel-Schlüssel können als Zahl oder (aus älteren Dateien) als Zeichenkette vorliegen
+        return self.photos.get(angle, self.photos.get(str(angle)))
+    
+    def get_expected_angles(self):
+        """Gibt alle Winkel zurück, die eine vollständige Session enthält"""
+        return [step * self.angle_step for step in range(360 // self.angle_step)]
+    
+    def get_missing_angles(self):
+        """Gibt die Winkel zurück, für die noch kein Foto vorhanden ist"""
+        return [angle for angle in self.get_expected_angles()
+                if not self.get_photo(angle) or not os.path.exists(self.get_photo(angle))]
+    
+    def set_status(self, status):
+        """Setzt den Zustand der Session (in_progress, failed, completed)"""
+        self.status = status
+        self.completed = status == self.STATUS_COMPLETED
+    
+    def save_manifest(self, session_dir):
+        """Schreibt das Manifest atomar in das Session-Verzeichnis"""
+        manifest_path = os.path.join(session_dir, self.MANIFEST_FILE)
+        temp_path = manifest_path + '.tmp'
+        try:
+            with open(temp_path, 'w') as f:
+                json.dump(self.to_dict(), f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, manifest_path)
+            return True
+        except Exception as e:
+            logging.error(f"Fehler beim Speichern des Session-Manifests {manifest_path}: {str(e)}")
+            return False
+    
+    def load_manifest(self, session_dir):
+        """Übernimmt den Stand aus dem Manifest (aktueller als project.json während einer Aufnahme)"""
+        manifest_path = os.path.join(session_dir, self.MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            return False
+        try:
+            with open(manifest_path, 'r') as f:
+                manifest = PhotoSession.from_dict(json.load(f))
+        except Exception as e:
+            logging.error(f"Fehler beim Laden des Session-Manifests {manifest_path}: {str(e)}")
+            return False
+        
+        self.photos.update(manifest.photos)
+        self.frame_angles.update(manifest.frame_angles)
+        self.position = manifest.position
+        self.set_status(manifest.status)
+        return True
     
     def get_all_photos(self):
         """Gibt alle Fotos der Session zurück"""
         # Sortieren nach Winkel
         return [self.photos[angle] for angle in sorted(self.photos.keys())]
     
+    def iter_frames(self, scale=1, prefetch=4, session_dir=None):
+        """Liefert (Winkel, Pfad, Frame) nach Winkel sortiert, im Hintergrund vorausgeladen"""
+        from utils.session_reader import SessionReader
+        return iter(SessionReader(self, scale, prefetch, session_dir))
+    
     def to_dict(self):
         """Konvertiert die Session in ein Dictionary"""
         return {
@@ -40,9 +108,18 @@ class PhotoSession:
             'timestamp': self.timestamp,
             'angle_step': self.angle_step,
             'photos': self.photos,
+            'frame_angles': self.frame_angles,
+            'mode': self.mode,
+            'status': self.status,
+            'position': self.position,
             'completed': self.completed
         }
     
+    @staticmethod
+    def _int_keys(mapping):
+        """Wandelt numerische Schlüssel (Winkel) wieder in Ganzzahlen um"""
+        return {int(key) if str(key).isdigit() else key: value for key, value in mapping.items()}
+    
     @classmethod
     def from_dict(cls, data):
         """Erstellt eine Session aus einem Dictionary"""
@@ -53,7 +130,14 @@ class PhotoSession:
             angle_step=data.get('angle_step', 5)
         )
         
-        session.photos = data.get('photos', {})
+        # JSON speichert die Winkel-Schlüssel als Zeichenketten
+        session.photos = cls._int_keys(data.get('photos', {}))
+        session.frame_angles = cls._int_keys(data.get('frame_angles', {}))
+        session.mode = data.get('mode', 'step')
+        session.position = data.get('position', 0.0)
         session.completed = data.get('completed', False)
+        # Ältere Sessions ohne Zustand gelten als abgeschlossen, sofern sie Fotos enthalten
+        default_status = cls.STATUS_COMPLETED if session.completed or session.photos else cls.STATUS_FAILED
+        session.set_status(data.get('status', default_status))
         
         return session
@@ -7,8 +7,20 @@ import time
 import uuid
 import logging
 import shutil
+import threading
 from pathlib import Path
 
+# Sperren pro Projektverzeichnis: Laden, Zusammenführen und Speichern von project.json
+# laufen für dasselbe Projekt nacheinander (z.B. zwei Stationen oder Aufnahme und Bearbeiten)
+_project_locks = {}
+_project_locks_guard = threading.Lock()
+
+def project_lock(path):
+    """Gibt die Sperre eines Projektverzeichnisses zurück"""
+    key = os.path.realpath(path)
+    with _project_locks_guard:
+        return _project_locks.setdefault(key, threading.Lock())
+
 class Project:
     """Klasse zur Darstellung eines Projekts"""
     
@@ -22,10 +34,15 @@ class Project:
         self.updated_at = self.created_at
         self.sessions = []
         self.path = path or ""
+        # In diesem Objekt geänderte bzw. entfernte Sessions (nur diese überschreiben beim Speichern)
+        self._changed_sessions = set()
+        self._removed_sessions = set()
     
     def add_session(self, session):
         """Fügt eine Fotosession zum Projekt hinzu"""
         self.sessions.append(session)
+        self._changed_sessions.add(session.id)
+        self._removed_sessions.discard(session.id)
         self.updated_at = time.time()
     
     def get_session(self, session_id):
@@ -40,6 +57,8 @@ class Project:
         for i, session in enumerate(self.sessions):
             if session.id == session_id:
                 del self.sessions[i]
+                self._changed_sessions.discard(session_id)
+                self._removed_sessions.add(session_id)
                 self.updated_at = time.time()
                 return True
         return False
@@ -79,17 +98,62 @@ class Project:
         
         return project
     
+    def save_session(self, session):
+        """Speichert eine geänderte Session (die übrigen Sessions bleiben wie gespeichert)"""
+        if self.get_session(session.id) is None:
+            self.sessions.append(session)
+        self._changed_sessions.add(session.id)
+        self.updated_at = time.time()
+        return self.save()
+    
+    def _merge_sessions(self, stored):
+        """Führt die gespeicherten Sessions mit den in diesem Objekt geänderten zusammen"""
+        from .photo_session import PhotoSession
+        
+        own = {session.id: session for session in self.sessions}
+        merged = []
+        for data in stored:
+            session_id = data.get('id')
+            if session_id in self._removed_sessions:
+                continue
+            if session_id in self._changed_sessions or session_id not in own:
+                # Geänderte Sessions aus diesem Objekt, neue Sessions anderer Schreiber übernehmen
+                merged.append(own.get(session_id) or PhotoSession.from_dict(data))
+            else:
+                # Unveränderte Session: den gespeicherten (ggf. neueren) Stand übernehmen
+                merged.append(PhotoSession.from_dict(data))
+        stored_ids = {data.get('id') for data in stored}
+        merged.extend(session for session in self.sessions
+                      if session.id in self._changed_sessions and session.id not in stored_ids)
+        return merged
+    
     def save(self):
-        """Speichert das Projekt"""
+        """Speichert das Projekt
+
+        Unter der Sperre des Projekts wird project.json neu gelesen; nur die in
+        diesem Objekt hinzugefügten, geänderten oder entfernten Sessions ersetzen
+        den gespeicherten Stand. So gehen Sessions paralleler Aufnahmen nicht verloren.
+        """
         if not self.path:
             return False
         
         try:
-            # Metadaten-Datei speichern
             metadata_path = os.path.join(self.path, "project.json")
-            with open(metadata_path, 'w') as f:
-                json.dump(self.to_dict(), f, indent=4)
+            with project_lock(self.path):
+                if os.path.exists(metadata_path):
+                    with open(metadata_path, 'r') as f:
+                        stored = json.load(f).get('sessions', [])
+                    # Geänderte Sessions bleiben dieselben Objekte (laufende Aufnahmen halten Referenzen)
+                    self.sessions = self._merge_sessions(stored)
+                
+                # Metadaten-Datei atomar speichern (kein halb geschriebenes JSON bei Abbruch)
+                temp_path = metadata_path + '.tmp'
+                with open(temp_path, 'w') as f:
+                    json.dump(self.to_dict(), f, indent=4)
+                os.replace(temp_path, metadata_path)
             
+            self._changed_sessions.clear()
+            self._removed_sessions.clear()
             return True
         except Exception as e:
             logging.error(f"Fehler beim Speichern des Projekts {self.id}: {str(e)}")
@@ -250,7 +250,7 @@ document.addEventListener('DOMContentLoaded', function() {
     function loadFrame(frameIndex) {
         currentFrame = frameIndex;
         rotationSlider.value = frameIndex;
-        currentImage.src = photos[frameIndex].path;
+        currentImage.src = photos[frameIndex].url;
     }
     
     // Animation starten/stoppen
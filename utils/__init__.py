@@ -1,9 +1,20 @@
 # Datei: utils/__init__.py
 # Initialisierungsmodul für das Utils-Paket
 
-from .arduino_finder import ArduinoFinder
-from .camera_finder import CameraFinder
-from .image_processor import ImageProcessor
-from .path_manager import PathManager
+# Die Hilfsklassen werden erst beim ersten Zugriff importiert, damit das Laden
+# einzelner Module (z.B. utils.path_manager) nicht OpenCV oder pyserial nachzieht
+_EXPORTS = {
+    'ArduinoFinder': 'utils.arduino_finder',
+    'CameraFinder': 'utils.camera_finder',
+    'ImageProcessor': 'utils.image_processor',
+    'PathManager': 'utils.path_manager'
+}
 
 __all__ = ['ArduinoFinder', 'CameraFinder', 'ImageProcessor', 'PathManager']
+
+def __getattr__(name):
+    """Importiert eine Hilfsklasse beim ersten Zugriff"""
+    if name in _EXPORTS:
+        import importlib
+        return getattr(importlib.import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
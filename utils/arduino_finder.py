@@ -2,11 +2,15 @@
 # Modul zur Erkennung von Arduino-Geräten
 
 import logging
-import serial.tools.list_ports
 import platform
 import subprocess
 import re
 
+def _comports():
+    """Listet die seriellen Ports auf (pyserial wird erst bei Bedarf geladen)"""
+    from serial.tools import list_ports
+    return list_ports.comports()
+
 class ArduinoFinder:
     """Klasse zur Erkennung von Arduino-Geräten"""
     
@@ -20,7 +24,7 @@ class ArduinoFinder:
         
         try:
             # Alle seriellen Ports auflisten
-            all_ports = list(serial.tools.list_ports.comports())
+            all_ports = list(_comports())
             
             for port in all_ports:
                 port_info = {
@@ -93,7 +97,7 @@ class ArduinoFinder:
                 self._add_macos_port_info(port_info)
             else:
                 # Auf anderen Systemen nur Standardinformationen
-                for port in serial.tools.list_ports.comports():
+                for port in _comports():
                     port_info.append({
                         'device': port.device,
                         'description': port.description,
@@ -110,7 +114,7 @@ class ArduinoFinder:
     def _add_linux_port_info(self, port_info):
         """Sammelt detaillierte Informationen über serielle Ports unter Linux"""
         # Standardinformationen sammeln
-        for port in serial.tools.list_ports.comports():
+        for port in _comports():
             port_data = {
                 'device': port.device,
                 'description': port.description,
@@ -142,7 +146,7 @@ class ArduinoFinder:
     
     def _add_windows_port_info(self, port_info):
         """Sammelt detaillierte Informationen über serielle Ports unter Windows"""
-        for port in serial.tools.list_ports.comports():
+        for port in _comports():
             port_info.append({
                 'device': port.device,
                 'description': port.description,
@@ -154,7 +158,7 @@ class ArduinoFinder:
     def _add_macos_port_info(self, port_info):
         """Sammelt detaillierte Informationen über serielle Ports unter macOS"""
         # Standardinformationen sammeln
-        for port in serial.tools.list_ports.comports():
+        for port in _comports():
             port_data = {
                 'device': port.device,
                 'description': port.description,
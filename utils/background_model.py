@@ -0,0 +1,133 @@
+# Datei: utils/background_model.py
+# Modul für ein pixelweises Hintergrundmodell aus mehreren Referenzaufnahmen
+
+import os
+import json
+import logging
+import numpy as np
+import cv2
+
+class BackgroundModel:
+    """Pixelweises Hintergrundmodell (Mittelwert und Schwellenwert) aus N Referenzbildern
+
+    Statt eines festen Schwellenwerts erhält jedes Pixel einen eigenen, aus der
+    Streuung der Referenzaufnahmen gelernten Schwellenwert. Rauschen und
+    Flackern werden so bereits bei der Klassifikation unterdrückt.
+    """
+
+    CACHE_FILE = 'background_model.npz'
+
+    def __init__(self, k=4.0, min_threshold=8, max_threshold=60):
+        """Initialisiert das Modell
+
+        k: Vielfaches der Standardabweichung, ab dem ein Pixel als Vordergrund gilt
+        min_threshold/max_threshold: Grenzen des pixelweisen Schwellenwerts (0-255)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.k = k
+        self.min_threshold = min_threshold
+        self.max_threshold = max_threshold
+        self.mean = None  # uint8 (H, W, 3)
+        self.threshold = None  # uint8 (H, W)
+        self.frame_count = 0
+        self.key = None
+
+    @staticmethod
+    def source_key(paths):
+        """Kennung der Referenzbilder (Pfad, Größe, Änderungszeit) zur Cache-Prüfung"""
+        key = []
+        for path in sorted(paths):
+            stat = os.stat(path)
+            key.append([os.path.basename(path), stat.st_size, stat.st_mtime_ns])
+        return json.dumps(key)
+
+    def build(self, frames):
+        """Baut das Modell aus einer Folge von BGR-Bildern (werden nacheinander verarbeitet)"""
+        total = None
+        total_sq = None
+        count = 0
+
+        for frame in frames:
+            if total is None:
+                total = np.zeros(frame.shape, dtype=np.float32)
+                total_sq = np.zeros(frame.shape, dtype=np.float32)
+            elif frame.shape != total.shape:
+                frame = cv2.resize(frame, (total.shape[1], total.shape[0]), interpolation=cv2.INTER_AREA)
+
+            # Akkumulation ohne Zwischenkopien
+            cv2.accumulate(frame, total)
+            cv2.accumulateSquare(frame, total_sq)
+            count += 1
+
+        if not count:
+            raise ValueError("Keine Referenzbilder für das Hintergrundmodell")
+
+        # Mittelwert und Varianz pro Pixel und Kanal (Puffer werden wiederverwendet)
+        total /= count
+        total_sq /= count
+        total_sq -= total * total
+        np.maximum(total_sq, 0, out=total_sq)
+        np.sqrt(total_sq, out=total_sq)
+
+        # Schwellenwert je Pixel: größte Kanal-Streuung
+        std = np.maximum(np.maximum(total_sq[:, :, 0], total_sq[:, :, 1]), total_sq[:, :, 2])
+        std *= self.k
+        np.clip(std, self.min_threshold, self.max_threshold, out=std)
+
+        self.mean = np.rint(total).astype(np.uint8)
+        self.threshold = np.rint(std).astype(np.uint8)
+        self.frame_count = count
+        self.logger.info(f"Hintergrundmodell aus {count} Referenzbildern erstellt "
+                         f"(mittlerer Schwellenwert {float(self.threshold.mean()):.1f})")
+        return self
+
+    def build_from_paths(self, paths):
+        """Baut das Modell aus Bilddateien"""
+        def frames():
+            for path in paths:
+                frame = cv2.imread(path)
+                if frame is None:
+                    self.logger.warning(f"Referenzbild konnte nicht geladen werden: {path}")
+                    continue
+                yield frame
+
+        self.build(frames())
+        self.key = self.source_key(paths)
+        return self
+
+    def save(self, directory):
+        """Speichert das Modell im Session-Verzeichnis (unkomprimiert, schnell ladbar)"""
+        path = os.path.join(directory, self.CACHE_FILE)
+        temp_path = path + '.tmp.npz'
+        np.savez(temp_path, mean=self.mean, threshold=self.threshold,
+                 frame_count=self.frame_count, key=self.key or '')
+        os.replace(temp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, directory, paths=None):
+        """Lädt ein gespeichertes Modell; mit paths nur, wenn es zu diesen Referenzbildern passt"""
+        path = os.path.join(directory, cls.CACHE_FILE)
+        if not os.path.exists(path):
+            return None
+
+        with np.load(path) as data:
+            key = str(data['key'])
+            if paths is not None and key != cls.source_key(paths):
+                return None
+
+            model = cls()
+            model.mean = data['mean']
+            model.threshold = data['threshold']
+            model.frame_count = int(data['frame_count'])
+            model.key = key
+        return model
+
+    @classmethod
+    def get_or_build(cls, directory, paths, **kwargs):
+        """Gibt das gecachte Modell zurück oder baut und speichert es neu"""
+        model = cls.load(directory, paths)
+        if model is None:
+            model = cls(**kwargs).build_from_paths(paths)
+            model.save(directory)
+        return model
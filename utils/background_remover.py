@@ -3,27 +3,53 @@
 
 import os
 import logging
+import time
+import threading
 import numpy as np
 import cv2
-import torch
 from pathlib import Path
+from utils.reference_remover import ReferenceRemover
+from utils.background_model import BackgroundModel
+from utils.transparent_writer import TransparentWriter
+from utils.metrics import SEGMENTATION_SECONDS, MODEL_MEMORY_BYTES, FRAMES_TOTAL, FAILURES_TOTAL
 
 class BackgroundRemover:
     """Klasse zur KI-basierten Entfernung des Hintergrunds von Bildern"""
     
-    def __init__(self):
-        """Initialisiert den BackgroundRemover"""
+    def __init__(self, transparent_writer=None):
+        """Initialisiert den BackgroundRemover
+
+        transparent_writer: Ausgabeformat der freigestellten Bilder (Standard: ungeschnittenes PNG)
+        """
         self.logger = logging.getLogger(__name__)
-        self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        self.transparent_writer = transparent_writer or TransparentWriter()
+        self._device = None
         self.model = None
         self.initialized = False
-        
-        # Wenn CUDA verfügbar ist, sofort initialisieren
-        if self.device == 'cuda':
-            self.logger.info("NVIDIA GPU erkannt, verwende CUDA für KI-Verarbeitung")
-            self._initialize_model()
-        else:
-            self.logger.warning("Keine NVIDIA GPU erkannt, KI-Funktionen werden CPU verwenden (langsamer)")
+        # Differenzverfahren mit Referenzbild (leerer Teller), Puffer nur von einem Thread zugleich
+        self.reference_remover = ReferenceRemover()
+        self.reference_lock = threading.Lock()
+    
+    @property
+    def device(self):
+        """Rechengerät für die KI-Segmentierung ('cuda' oder 'cpu')
+
+        PyTorch wird erst hier beim ersten Zugriff geladen, da der Import mehrere
+        Sekunden dauert und für das Referenzverfahren nicht benötigt wird.
+        """
+        if self._device is None:
+            try:
+                import torch
+                self._device = 'cuda' if torch.cuda.is_available() else 'cpu'
+            except ImportError:
+                self.logger.warning("PyTorch nicht installiert, KI-Segmentierung nicht verfügbar")
+                self._device = 'cpu'
+            
+            if self._device == 'cuda':
+                self.logger.info("NVIDIA GPU erkannt, verwende CUDA für KI-Verarbeitung")
+            else:
+                self.logger.warning("Keine NVIDIA GPU erkannt, KI-Funktionen werden CPU verwenden (langsamer)")
+        return self._device
     
     def _initialize_model(self):
         """Initialisiert das KI-Modell für Segmentierung"""
@@ -33,6 +59,7 @@ class BackgroundRemover:
             self.model_type = 'u2net'
             self.model = u2net.load_model(self.device)
             self.initialized = True
+            self._record_model_memory()
             self.logger.info("U^2-Net Segmentierungsmodell geladen")
             return
         except ImportError:
@@ -48,6 +75,7 @@ class BackgroundRemover:
             self.model.to(self.device)
             self.model.eval()
             self.initialized = True
+            self._record_model_memory()
             self.logger.info("DeepLabV3 Segmentierungsmodell geladen")
             return
         except ImportError:
@@ -68,59 +96,75 @@ class BackgroundRemover:
         
         self.logger.error("Keines der Segmentierungsmodelle konnte initialisiert werden")
     
+    def _record_model_memory(self):
+        """Trägt den Speicherbedarf der Modellparameter in die Metriken ein"""
+        try:
+            size = sum(parameter.numel() * parameter.element_size() for parameter in self.model.parameters())
+        except Exception:
+            return
+        MODEL_MEMORY_BYTES.set(size, model=self.model_type)
+    
     def is_available(self):
         """Prüft, ob die Hintergrundentfernung verfügbar ist"""
         if not self.initialized and self.device == 'cuda':
             self._initialize_model()
         return self.initialized
     
+    def load_background_model(self, reference_paths, cache_dir=None):
+        """Lädt oder erstellt das Hintergrundmodell aus mehreren Referenzbildern
+
+        Das Modell wird als background_model.npz im cache_dir (z.B. dem
+        Session-Verzeichnis) gespeichert und nur bei geänderten Referenzen neu berechnet.
+        """
+        try:
+            cache_dir = cache_dir or os.path.dirname(os.path.abspath(reference_paths[0]))
+            return BackgroundModel.get_or_build(cache_dir, reference_paths)
+        except Exception as e:
+            self.logger.error(f"Fehler beim Erstellen des Hintergrundmodells: {str(e)}")
+            return None
+    
     def remove_background_with_reference(self, image_path, reference_path, output_path):
-        """Entfernt den Hintergrund mit einem Referenzbild (Hintergrund ohne Objekt)"""
+        """Entfernt den Hintergrund mit einem Referenzbild (Hintergrund ohne Objekt)
+
+        image_path: Bildpfad oder bereits dekodiertes BGR-Bild (z.B. aus dem FrameStore)
+        reference_path: Pfad eines Referenzbildes, Liste von Referenzbildern oder BackgroundModel
+        """
         try:
-            # Bilder laden
-            image = cv2.imread(image_path)
-            reference = cv2.imread(reference_path)
-            
-            if image is None or reference is None:
-                self.logger.error(f"Konnte Bilder nicht laden: {image_path} oder {reference_path}")
-                return False
-            
-            # Stellen Sie sicher, dass die Bilder die gleiche Größe haben
-            if image.shape != reference.shape:
-                reference = cv2.resize(reference, (image.shape[1], image.shape[0]))
-            
-            # Differenzbild berechnen
-            diff = cv2.absdiff(image, reference)
-            
-            # Schwellenwertbildung für die Maske
-            gray_diff = cv2.cvtColor(diff, cv2.COLOR_BGR2GRAY)
-            _, mask = cv2.threshold(gray_diff, 30, 255, cv2.THRESH_BINARY)
-            
-            # Rauschen aus der Maske entfernen
-            mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, np.ones((5, 5), np.uint8))
-            mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, np.ones((10, 10), np.uint8))
-            
-            # Maske erweitern
-            mask = cv2.dilate(mask, np.ones((5, 5), np.uint8), iterations=2)
-            
-            # Maske als 3-Kanal-Bild für die Verwendung mit transparentem Hintergrund
-            rgba_mask = cv2.cvtColor(mask, cv2.COLOR_GRAY2BGRA)
-            rgba_mask[:, :, 3] = mask
-            
-            # Bild mit transparentem Hintergrund
-            rgba_image = cv2.cvtColor(image, cv2.COLOR_BGR2BGRA)
-            rgba_image[:, :, 3] = mask
-            
-            # Ergebnis speichern
-            output_dir = os.path.dirname(output_path)
-            os.makedirs(output_dir, exist_ok=True)
+            if isinstance(reference_path, (list, tuple)):
+                if len(reference_path) == 1:
+                    reference_path = reference_path[0]
+                else:
+                    reference_path = self.load_background_model(reference_path)
+                    if reference_path is None:
+                        return False
             
-            cv2.imwrite(output_path, rgba_image)
+            model_label = 'background_model' if isinstance(reference_path, BackgroundModel) else 'reference'
+            with self.reference_lock:
+                # Referenz nur bei Änderung neu laden, Puffer werden über alle Bilder wiederverwendet
+                if isinstance(reference_path, BackgroundModel):
+                    self.reference_remover.set_model(reference_path)
+                elif not self.reference_remover.set_reference(reference_path):
+                    FAILURES_TOTAL.inc(stage='segmentation')
+                    return False
+                
+                start = time.perf_counter()
+                if isinstance(image_path, np.ndarray):
+                    success = self.reference_remover.apply(image_path, output_path, self.transparent_writer)
+                else:
+                    success = self.reference_remover.remove(image_path, output_path, self.transparent_writer)
+                SEGMENTATION_SECONDS.observe(time.perf_counter() - start, model=model_label)
+                MODEL_MEMORY_BYTES.set(self.reference_remover.memory_bytes(), model='reference')
+                if not success:
+                    FAILURES_TOTAL.inc(stage='segmentation')
+                    self.logger.error(f"Hintergrundentfernung mit Referenz fehlgeschlagen: {output_path}")
+                    return False
             
-            self.logger.info(f"Hintergrund mit Referenzbild entfernt und gespeichert: {output_path}")
+            FRAMES_TOTAL.inc(stage='segmentation')
+            self.logger.info(f"Hintergrund mit Referenzbild entfernt und gespeichert: {self.transparent_writer.output_path(output_path)}")
             return True
         
         except Exception as e:
+            FAILURES_TOTAL.inc(stage='segmentation')
             self.logger.error(f"Fehler bei der Hintergrundentfernung mit Referenz: {str(e)}")
             return False
     
@@ -139,6 +183,7 @@ class BackgroundRemover:
                 return False
             
             # KI-Segmentierung basierend auf dem geladenen Modell
+            start = time.perf_counter()
             if self.model_type == 'u2net':
                 # U^2-Net-spezifischer Code
                 mask = self._segment_with_u2net(image)
@@ -151,25 +196,23 @@ class BackgroundRemover:
             else:
                 self.logger.error("Kein unterstütztes Segmentierungsmodell verfügbar")
                 return False
+            SEGMENTATION_SECONDS.observe(time.perf_counter() - start, model=self.model_type)
             
             # Maske nachbearbeiten
             mask = cv2.GaussianBlur(mask, (5, 5), 0)
             _, mask = cv2.threshold(mask, 127, 255, cv2.THRESH_BINARY)
             
-            # Bild mit transparentem Hintergrund
-            rgba_image = cv2.cvtColor(image, cv2.COLOR_BGR2BGRA)
-            rgba_image[:, :, 3] = mask
-            
-            # Ergebnis speichern
-            output_dir = os.path.dirname(output_path)
-            os.makedirs(output_dir, exist_ok=True)
-            
-            cv2.imwrite(output_path, rgba_image)
+            # Bild mit transparentem Hintergrund im eingestellten Format speichern
+            if self.transparent_writer.write(image, mask, output_path) is None:
+                FAILURES_TOTAL.inc(stage='segmentation')
+                return False
             
-            self.logger.info(f"Hintergrund mit KI entfernt und gespeichert: {output_path}")
+            FRAMES_TOTAL.inc(stage='segmentation')
+            self.logger.info(f"Hintergrund mit KI entfernt und gespeichert: {self.transparent_writer.output_path(output_path)}")
             return True
             
         except Exception as e:
+            FAILURES_TOTAL.inc(stage='segmentation')
             self.logger.error(f"Fehler bei der KI-basierten Hintergrundentfernung: {str(e)}")
             return False
     
@@ -183,6 +226,7 @@ class BackgroundRemover:
     def _segment_with_deeplabv3(self, image):
         """Segmentierung mit DeepLabV3"""
         # Bild für das Modell vorbereiten
+        import torch
         from torchvision import transforms
         
         transform = transforms.Compose([
@@ -231,24 +275,49 @@ class BackgroundRemover:
         return mask2
     
     def process_project_images(self, project, session, reference_image=None, use_ai=True):
-        """Verarbeitet alle Bilder einer Projekt-Session für transparenten Hintergrund"""
+        """Verarbeitet alle Bilder einer Projekt-Session für transparenten Hintergrund
+
+        reference_image: Pfad eines Referenzbildes oder Liste von Referenzbildern. Mehrere
+        Referenzbilder ergeben ein Hintergrundmodell, das mit der Session gespeichert wird;
+        ohne Referenz wird ein bereits gespeichertes Modell der Session verwendet.
+        """
         if not project or not session:
             self.logger.error("Ungültiges Projekt oder Session für die Bildverarbeitung")
             return False
         
         # Verzeichnis für transparente Bilder erstellen
-        transparent_dir = os.path.join(project.path, "sessions", session.id, "transparent")
+        session_dir = os.path.join(project.path, "sessions", session.id)
+        transparent_dir = os.path.join(session_dir, "transparent")
         os.makedirs(transparent_dir, exist_ok=True)
         
+        # Hintergrundmodell einmal pro Session laden bzw. erstellen
+        if isinstance(reference_image, (list, tuple)):
+            reference_paths = [path for path in reference_image if path and os.path.exists(path)]
+            if len(reference_paths) > 1:
+                reference_image = self.load_background_model(reference_paths, session_dir)
+            else:
+                reference_image = reference_paths[0] if reference_paths else None
+        if not reference_image:
+            reference_image = BackgroundModel.load(session_dir)
+        
+        use_reference = isinstance(reference_image, BackgroundModel) or bool(reference_image and os.path.exists(reference_image))
+        
+        if use_reference:
+            # Bilder im Hintergrund vorausladen (bzw. aus dem Frame-Store lesen), während das vorige verarbeitet wird
+            photos = session.iter_frames(session_dir=session_dir)
+        else:
+            photos = ((angle, session.photos[angle], None) for angle in sorted(session.photos))
+        
         success_count = 0
         total_count = len(session.photos)
         
-        for angle, photo_path in session.photos.items():
+        for angle, photo_path, frame in photos:
             output_path = os.path.join(transparent_dir, f"angle_{int(angle):03d}.png")
             
-            if reference_image and os.path.exists(reference_image):
+            if use_reference:
                 # Mit Referenzbild
-                success = self.remove_background_with_reference(photo_path, reference_image, output_path)
+                source = frame if frame is not None else photo_path
+                success = self.remove_background_with_reference(source, reference_image, output_path)
             elif use_ai and self.is_available():
                 # Mit KI
                 success = self.remove_background_with_ai(photo_path, output_path)
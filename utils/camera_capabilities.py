@@ -0,0 +1,212 @@
+# Datei: utils/camera_capabilities.py
+# Modul zur Ermittlung und Zwischenspeicherung der Webcam-Fähigkeiten (Formate, Auflösungen, FPS)
+
+import os
+import re
+import json
+import logging
+import threading
+import subprocess
+from utils.path_manager import PathManager
+
+class CameraCapabilities:
+    """Klasse zur einmaligen Abfrage der unterstützten Pixelformate, Bildgrößen und Bildraten"""
+
+    # Komprimierte Formate sind über USB 2 bei hohen Auflösungen deutlich schneller
+    PREFERRED_FORMATS = ('MJPG', 'JPEG', 'YUYV')
+
+    # Videocodecs, die das V4L2-Backend von OpenCV nicht zu Einzelbildern dekodiert
+    UNSUPPORTED_FORMATS = ('H264', 'H265', 'HEVC', 'VP80', 'VP90', 'MPEG')
+
+    # Kandidaten für die OpenCV-Abfrage, falls v4l2-ctl fehlt
+    FALLBACK_RESOLUTIONS = [(640, 480), (1280, 720), (1920, 1080), (2560, 1440), (3840, 2160)]
+
+    def __init__(self, cache_dir=None):
+        """Initialisiert den Capability-Cache"""
+        self.logger = logging.getLogger(__name__)
+        if cache_dir is None:
+            cache_dir = PathManager().cache_dir
+        self.cache_file = os.path.join(cache_dir, 'camera_capabilities.json')
+        self._cache = None
+        self._lock = threading.Lock()
+
+    def _load_cache(self):
+        """Lädt den Cache aus der Datei (einmalig)"""
+        if self._cache is None:
+            self._cache = {}
+            try:
+                if os.path.exists(self.cache_file):
+                    with open(self.cache_file, 'r') as f:
+                        self._cache = json.load(f)
+            except Exception as e:
+                self.logger.error(f"Fehler beim Laden des Capability-Caches: {str(e)}")
+        return self._cache
+
+    def _save_cache(self):
+        """Speichert den Cache atomar in die Datei"""
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            temp_file = self.cache_file + '.tmp'
+            with open(temp_file, 'w') as f:
+                json.dump(self._cache, f, indent=4)
+            os.replace(temp_file, self.cache_file)
+        except Exception as e:
+            self.logger.error(f"Fehler beim Speichern des Capability-Caches: {str(e)}")
+
+    def get_device_id(self, device):
+        """Ermittelt eine stabile Kennung (USB-Seriennummer oder Bus-Pfad) für ein Video-Gerät"""
+        name = os.path.basename(str(device))
+        sys_device = os.path.join('/sys/class/video4linux', name, 'device')
+
+        if os.path.exists(sys_device):
+            path = os.path.realpath(sys_device)
+            # Im sysfs nach oben laufen, bis das USB-Gerät mit Hersteller-/Produkt-ID erreicht ist
+            while path and path != '/':
+                vendor_file = os.path.join(path, 'idVendor')
+                if os.path.exists(vendor_file):
+                    parts = []
+                    for attribute in ('idVendor', 'idProduct', 'serial'):
+                        attribute_file = os.path.join(path, attribute)
+                        if os.path.exists(attribute_file):
+                            with open(attribute_file, 'r') as f:
+                                parts.append(f.read().strip())
+                    # Ohne Seriennummer den USB-Port verwenden (z.B. 1-1.2)
+                    if len(parts) < 3:
+                        parts.append(os.path.basename(path))
+                    return 'usb:' + ':'.join(parts)
+                path = os.path.dirname(path)
+
+        return f"device:{device}"
+
+    def _probe_v4l2(self, device):
+        """Fragt die Formate über v4l2-ctl --list-formats-ext ab"""
+        result = subprocess.run(['v4l2-ctl', '-d', str(device), '--list-formats-ext'],
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                text=True, timeout=10)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip())
+
+        formats = {}
+        current_format = None
+        current_size = None
+
+        for line in result.stdout.splitlines():
+            line = line.strip()
+
+            match = re.match(r"\[\d+\]:\s*'(\w+)'", line)
+            if match:
+                current_format = formats.setdefault(match.group(1), [])
+                current_size = None
+                continue
+
+            match = re.match(r"Size:\s*\w+\s+(\d+)x(\d+)", line)
+            if match and current_format is not None:
+                current_size = {'width': int(match.group(1)), 'height': int(match.group(2)), 'fps': []}
+                current_format.append(current_size)
+                continue
+
+            match = re.search(r"\(([\d.]+)\s*fps\)", line)
+            if match and current_size is not None:
+                current_size['fps'].append(float(match.group(1)))
+
+        return formats
+
+    def _probe_opencv(self, device):
+        """Fallback: probiert gängige Auflösungen mit OpenCV durch (einmalig, danach gecacht)"""
+        import cv2
+
+        device_id = int(device) if str(device).isdigit() else device
+        formats = {}
+        cap = cv2.VideoCapture(device_id)
+        if not cap.isOpened():
+            raise RuntimeError(f"Webcam konnte nicht geöffnet werden: {device}")
+
+        try:
+            for fourcc in ('MJPG', 'YUYV'):
+                sizes = []
+                for width, height in self.FALLBACK_RESOLUTIONS:
+                    cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+                    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+                    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+
+                    actual_fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+                    actual = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+                    fourcc_name = ''.join(chr((actual_fourcc >> (8 * i)) & 0xFF) for i in range(4))
+
+                    if fourcc_name == fourcc and actual == (width, height):
+                        fps = cap.get(cv2.CAP_PROP_FPS)
+                        sizes.append({'width': width, 'height': height, 'fps': [fps] if fps > 0 else []})
+                if sizes:
+                    formats[fourcc] = sizes
+        finally:
+            cap.release()
+
+        return formats
+
+    def get_capabilities(self, device, refresh=False):
+        """Gibt die (gecachten) Fähigkeiten eines Video-Geräts zurück"""
+        device_id = self.get_device_id(device)
+
+        with self._lock:
+            cache = self._load_cache()
+            if not refresh and device_id in cache:
+                return cache[device_id]
+
+            try:
+                formats = self._probe_v4l2(device)
+                method = 'v4l2-ctl'
+            except Exception as e:
+                self.logger.info(f"v4l2-ctl-Abfrage für {device} nicht möglich ({str(e)}), verwende OpenCV")
+                try:
+                    formats = self._probe_opencv(device)
+                    method = 'opencv'
+                except Exception as e:
+                    self.logger.error(f"Fähigkeiten von {device} konnten nicht ermittelt werden: {str(e)}")
+                    return None
+
+            capabilities = {
+                'device_id': device_id,
+                'device': str(device),
+                'method': method,
+                'formats': formats
+            }
+            cache[device_id] = capabilities
+            self._save_cache()
+
+            self.logger.info(f"Fähigkeiten von {device} ermittelt: {', '.join(formats) or 'keine Formate'}")
+            return capabilities
+
+    def choose_format(self, device, width, height, fps=None):
+        """Wählt das schnellste Format für die gewünschte Auflösung (z.B. MJPEG statt YUYV)"""
+        capabilities = self.get_capabilities(device)
+        if not capabilities or not capabilities['formats']:
+            return None
+
+        candidates = []
+        for fourcc, sizes in capabilities['formats'].items():
+            if fourcc in self.UNSUPPORTED_FORMATS:
+                continue
+            for size in sizes:
+                max_fps = max(size['fps']) if size['fps'] else 0.0
+                exact = size['width'] == width and size['height'] == height
+                large_enough = size['width'] >= width and size['height'] >= height
+                rank = self.PREFERRED_FORMATS.index(fourcc) if fourcc in self.PREFERRED_FORMATS else len(self.PREFERRED_FORMATS)
+                # Gewünschte Bildrate erreicht? Dann zählt nur noch die Formatpräferenz
+                fps_score = min(max_fps, fps) if fps else max_fps
+                area = size['width'] * size['height']
+                key = (exact, large_enough, fps_score, -rank, -area if large_enough else area)
+                candidates.append((key, fourcc, size, max_fps))
+
+        if not candidates:
+            return None
+        _, fourcc, size, max_fps = max(candidates, key=lambda candidate: candidate[0])
+        chosen_fps = min(fps, max_fps) if fps and max_fps else max_fps
+        return {
+            'fourcc': fourcc,
+            'width': size['width'],
+            'height': size['height'],
+            'fps': chosen_fps or None
+        }
+
+# Instanz erstellen
+camera_capabilities = CameraCapabilities()
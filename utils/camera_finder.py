@@ -212,8 +212,12 @@ class CameraFinder:
         
         return cameras
     
-    def test_webcam(self, device):
-        """Testet, ob eine Webcam funktioniert"""
+    def test_webcam(self, device, resolution=None):
+        """Testet, ob eine Webcam funktioniert
+
+        resolution: gewünschte Auflösung ('1920x1080' oder Tupel); getestet wird mit dem
+        Format, das auch der Kamera-Controller für diese Auflösung aushandelt.
+        """
         try:
             import cv2
             
@@ -223,8 +227,21 @@ class CameraFinder:
             else:
                 device_id = device
             
+            # Format wie im CameraController aus den gecachten Fähigkeiten wählen
+            capture_format = None
+            if resolution and device.startswith('/dev/'):
+                from utils.camera_capabilities import camera_capabilities
+                if isinstance(resolution, str):
+                    resolution = tuple(int(value) for value in resolution.split('x'))
+                capture_format = camera_capabilities.choose_format(device, *resolution)
+            
             # Versuche, die Kamera zu öffnen
             cap = cv2.VideoCapture(device_id)
+            if capture_format:
+                # Das Pixelformat muss vor der Auflösung gesetzt werden
+                cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*capture_format['fourcc']))
+                cap.set(cv2.CAP_PROP_FRAME_WIDTH, capture_format['width'])
+                cap.set(cv2.CAP_PROP_FRAME_HEIGHT, capture_format['height'])
             
             if not cap.isOpened():
                 self.logger.error(f"Webcam konnte nicht geöffnet werden: {device}")
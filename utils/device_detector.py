@@ -4,7 +4,6 @@ Device Detector - Verbesserte Erkennung für Arduino und Kameras
 
 import os
 import subprocess
-from serial.tools import list_ports
 
 class DeviceDetector:
     """Klasse zur Erkennung von Geräten (Arduino, Webcams, Kameras)"""
@@ -21,6 +20,7 @@ class DeviceDetector:
         arduino_devices = []
         
         # Methode 1: Serial Tools
+        from serial.tools import list_ports
         for port in list_ports.comports():
             desc = port.description.lower()
             device = port.device
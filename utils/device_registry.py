@@ -0,0 +1,273 @@
+"""
+Device Registry - Zwischengespeicherte Geräteliste mit Hotplug-Überwachung
+
+Die Geräteliste wird einmal mit dem DeviceDetector aufgebaut und danach nur
+noch aktualisiert, wenn sich unter /dev etwas ändert (pyudev, inotify oder
+als Fallback ein günstiger Verzeichnisvergleich). Abfragen werden aus dem
+Speicher beantwortet und starten keine Prozesse.
+"""
+
+import os
+import copy
+import time
+import select
+import struct
+import logging
+import threading
+from utils.device_detector import DeviceDetector
+
+# inotify-Konstanten (linux/inotify.h)
+IN_ATTRIB = 0x00000004
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+_INOTIFY_EVENT = struct.Struct('iIII')
+
+class DeviceRegistry:
+    """Klasse zur Verwaltung der erkannten Geräte mit Hotplug-Erkennung"""
+
+    CATEGORIES = ('arduino', 'webcam', 'gphoto2')
+
+    def __init__(self, detector=None, debounce=0.5, poll_interval=2.0):
+        """Initialisiert die Registry (die Überwachung startet beim ersten Zugriff)"""
+        self.logger = logging.getLogger(__name__)
+        self.detector = detector or DeviceDetector()
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.version = 0
+        self.watch_method = None
+
+        self._devices = {category: [] for category in self.CATEGORIES}
+        self._lock = threading.Lock()
+        self._scan_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._started = False
+        self._pending = set()
+        self._pending_event = threading.Event()
+
+    def start(self):
+        """Baut die Geräteliste auf und startet die Hotplug-Überwachung"""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+
+        threading.Thread(target=self._initial_scan, name='DeviceRegistryScan', daemon=True).start()
+        threading.Thread(target=self._rescan_worker, name='DeviceRegistryRescan', daemon=True).start()
+        threading.Thread(target=self._watch, name='DeviceRegistryWatch', daemon=True).start()
+
+    def _initial_scan(self):
+        """Erster vollständiger Scan aller Gerätetypen"""
+        try:
+            self._scan(self.CATEGORIES)
+        finally:
+            self._ready.set()
+
+    def _scan(self, categories):
+        """Aktualisiert die angegebenen Gerätetypen und erhöht bei Änderungen die Version"""
+        scanners = {
+            'arduino': self.detector.find_arduino_devices,
+            'webcam': self.detector.find_webcam_devices,
+            'gphoto2': self.detector.find_gphoto2_cameras
+        }
+
+        # Scans nacheinander ausführen, der DeviceDetector ist nicht threadsicher
+        with self._scan_lock:
+            results = {}
+            for category in categories:
+                try:
+                    results[category] = scanners[category]()
+                except Exception as e:
+                    self.logger.error(f"Fehler beim Scannen von {category}: {str(e)}")
+
+        with self._lock:
+            changed = any(self._devices.get(category) != devices for category, devices in results.items())
+            self._devices.update(results)
+            if changed:
+                self.version += 1
+                self.logger.info(f"Geräteliste aktualisiert (Version {self.version}): {', '.join(results)}")
+
+        return changed
+
+    def _schedule_rescan(self, categories):
+        """Merkt Gerätetypen für einen erneuten Scan vor"""
+        with self._lock:
+            self._pending.update(categories)
+        self._pending_event.set()
+
+    def _rescan_worker(self):
+        """Führt vorgemerkte Scans gebündelt aus (Entprellung von Hotplug-Ereignissen)"""
+        while True:
+            self._pending_event.wait()
+            # Kurz warten, damit zusammengehörige Ereignisse gemeinsam verarbeitet werden
+            time.sleep(self.debounce)
+            self._ready.wait()
+
+            with self._lock:
+                categories = tuple(self._pending)
+                self._pending.clear()
+                self._pending_event.clear()
+
+            if categories:
+                self._scan(categories)
+
+    @staticmethod
+    def _categories_for_name(name):
+        """Ordnet einen Gerätenamen (relativ zu /dev) den betroffenen Gerätetypen zu
+
+        Andere Einträge (pts, shm, loop* usw.) lösen keine Suche aus.
+        """
+        if name.startswith('tty'):
+            return {'arduino'}
+        if name.startswith('video'):
+            return {'webcam'}
+        # Nur USB-Geräteknoten (/dev/bus/usb/...) betreffen DSLR-Kameras
+        if name == 'bus' or name.startswith('bus/usb'):
+            return {'gphoto2'}
+        return set()
+
+    def _watch(self):
+        """Startet die beste verfügbare Überwachungsmethode"""
+        for method in (self._watch_pyudev, self._watch_inotify, self._watch_polling):
+            try:
+                if method():
+                    return
+            except Exception as e:
+                self.logger.debug(f"Überwachung mit {method.__name__} nicht möglich: {str(e)}")
+
+    def _watch_pyudev(self):
+        """Überwachung über udev-Ereignisse (pyudev)"""
+        import pyudev
+
+        context = pyudev.Context()
+        monitor = pyudev.Monitor.from_netlink(context)
+        monitor.filter_by('tty')
+        monitor.filter_by('video4linux')
+        monitor.filter_by('usb', device_type='usb_device')
+
+        subsystems = {'tty': {'arduino'}, 'video4linux': {'webcam'}, 'usb': {'gphoto2', 'arduino'}}
+
+        self.watch_method = 'pyudev'
+        self.logger.info("Geräteüberwachung über pyudev aktiv")
+
+        for device in iter(monitor.poll, None):
+            if device.action in ('add', 'remove'):
+                self._schedule_rescan(subsystems.get(device.subsystem, set(self.CATEGORIES)))
+        return True
+
+    def _watch_inotify(self):
+        """Überwachung von /dev und /dev/bus/usb über inotify"""
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        fd = libc.inotify_init1(os.O_CLOEXEC)
+        if fd < 0:
+            return False
+
+        watches = {}
+
+        def add_watch(path):
+            wd = libc.inotify_add_watch(fd, path.encode(), IN_CREATE | IN_DELETE | IN_ATTRIB)
+            if wd >= 0:
+                watches[wd] = path
+
+        add_watch('/dev')
+        usb_root = '/dev/bus/usb'
+        if os.path.isdir(usb_root):
+            add_watch(usb_root)
+            for bus in os.listdir(usb_root):
+                add_watch(os.path.join(usb_root, bus))
+
+        if not watches:
+            os.close(fd)
+            return False
+
+        self.watch_method = 'inotify'
+        self.logger.info("Geräteüberwachung über inotify aktiv")
+
+        while True:
+            select.select([fd], [], [])
+            data = os.read(fd, 8192)
+
+            categories = set()
+            offset = 0
+            while offset + _INOTIFY_EVENT.size <= len(data):
+                wd, mask, _, length = _INOTIFY_EVENT.unpack_from(data, offset)
+                offset += _INOTIFY_EVENT.size
+                name = data[offset:offset + length].rstrip(b'\0').decode(errors='ignore')
+                offset += length
+
+                directory = watches.get(wd, '')
+                if directory.startswith(usb_root):
+                    categories.add('gphoto2')
+                    # Neue USB-Busse ebenfalls überwachen
+                    new_path = os.path.join(directory, name)
+                    if directory == usb_root and mask & IN_CREATE and os.path.isdir(new_path):
+                        add_watch(new_path)
+                elif name:
+                    categories.update(self._categories_for_name(name))
+
+            if categories:
+                self._schedule_rescan(categories)
+
+    def _watch_polling(self):
+        """Fallback: vergleicht regelmäßig die Einträge in /dev (ohne Prozesse zu starten)"""
+        self.watch_method = 'polling'
+        self.logger.info("Geräteüberwachung über Verzeichnisvergleich aktiv")
+
+        def snapshot():
+            try:
+                names = set(os.listdir('/dev'))
+            except OSError:
+                return set()
+            # USB-Geräteknoten für DSLR-Kameras (bus/usb/<Bus>/<Gerät>)
+            for root, _, files in os.walk('/dev/bus/usb'):
+                relative = os.path.relpath(root, '/dev')
+                names.update(os.path.join(relative, name) for name in files)
+            return names
+
+        previous = snapshot()
+        while True:
+            time.sleep(self.poll_interval)
+            current = snapshot()
+            changed = previous ^ current
+            if changed:
+                categories = set()
+                for name in changed:
+                    categories.update(self._categories_for_name(name))
+                if categories:
+                    self._schedule_rescan(categories)
+            previous = current
+
+    def get_snapshot(self, timeout=10.0):
+        """Gibt (Version, Geräteliste) aus dem Speicher zurück"""
+        self.start()
+        self._ready.wait(timeout)
+        with self._lock:
+            return self.version, copy.deepcopy(self._devices)
+
+    def get_devices(self, timeout=10.0):
+        """Gibt alle erkannten Geräte zurück (Format wie DeviceDetector.get_devices)"""
+        return self.get_snapshot(timeout)[1]
+
+    def refresh(self):
+        """Erzwingt einen vollständigen Scan (z.B. über die Schaltfläche 'Aktualisieren')"""
+        self.start()
+        self._ready.wait()
+        self._scan(self.CATEGORIES)
+        return self.get_snapshot()
+
+    def get_available_ports(self):
+        """Gibt eine Liste der verfügbaren Arduino-Ports zurück"""
+        return [device['port'] for device in self.get_devices()['arduino']]
+
+    def get_available_webcams(self):
+        """Gibt eine Liste der verfügbaren Webcams zurück"""
+        return [device['device'] for device in self.get_devices()['webcam']]
+
+    def get_available_cameras(self):
+        """Gibt eine Liste der verfügbaren DSLR-Kameras zurück"""
+        return [device['model'] for device in self.get_devices()['gphoto2']]
+
+# Instanz erstellen
+device_registry = DeviceRegistry()
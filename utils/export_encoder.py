@@ -0,0 +1,142 @@
+# Datei: utils/export_encoder.py
+# Modul zum parallelen JPEG-Kodieren der Exportbilder mit Qualitäts- bzw. Größenvorgabe
+
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+from utils.metrics import IMAGE_WRITE_SECONDS, QUEUE_DEPTH
+
+class ExportEncoder:
+    """Kodiert Bilder in einem Thread-Pool (OpenCV gibt beim Kodieren den GIL frei)
+
+    Verwendet progressive JPEGs mit optimierten Huffman-Tabellen. Die Chroma-
+    Unterabtastung richtet sich nach der Qualität (4:4:4 ab sharp_quality, sonst
+    4:2:0). Mit target_bytes wird die Qualität je Bild per Binärsuche so gewählt,
+    dass die Datei höchstens so groß wird.
+    """
+
+    SAMPLING_FACTORS = {
+        '420': 'IMWRITE_JPEG_SAMPLING_FACTOR_420',
+        '422': 'IMWRITE_JPEG_SAMPLING_FACTOR_422',
+        '444': 'IMWRITE_JPEG_SAMPLING_FACTOR_444'
+    }
+
+    def __init__(self, quality=90, target_bytes=None, workers=None, progressive=True, optimize=True,
+                 subsampling='auto', sharp_quality=92, min_quality=30, max_quality=95):
+        """Initialisiert den Encoder
+
+        quality: JPEG-Qualität ohne Größenvorgabe
+        target_bytes: maximale Dateigröße pro Bild (None = feste Qualität)
+        workers: Anzahl der Threads (None = Anzahl der CPU-Kerne)
+        subsampling: 'auto', '420', '422' oder '444'
+        """
+        self.logger = logging.getLogger(__name__)
+        self.quality = quality
+        self.target_bytes = target_bytes
+        self.workers = workers or os.cpu_count() or 1
+        self.progressive = progressive
+        self.optimize = optimize
+        self.subsampling = subsampling
+        self.sharp_quality = sharp_quality
+        self.min_quality = min_quality
+        self.max_quality = max_quality
+
+        self._executor = None
+        self._lock = threading.Lock()
+        # Begrenzt die Anzahl gleichzeitig gehaltener Bilder auf zwei pro Thread
+        self._slots = threading.BoundedSemaphore(self.workers * 2)
+
+    def params(self, quality):
+        """Parameter für cv2.imencode bei einer Qualität"""
+        params = [cv2.IMWRITE_JPEG_QUALITY, int(quality),
+                  cv2.IMWRITE_JPEG_PROGRESSIVE, int(self.progressive),
+                  cv2.IMWRITE_JPEG_OPTIMIZE, int(self.optimize)]
+
+        subsampling = self.subsampling
+        if subsampling == 'auto':
+            subsampling = '444' if quality >= self.sharp_quality else '420'
+        # Ältere OpenCV-Versionen kennen keine Einstellung der Unterabtastung
+        factor = getattr(cv2, self.SAMPLING_FACTORS.get(subsampling, ''), None)
+        if factor is not None:
+            params += [cv2.IMWRITE_JPEG_SAMPLING_FACTOR, factor]
+        return params
+
+    def _encode_quality(self, frame, quality):
+        """Kodiert ein Bild mit einer festen Qualität"""
+        ok, data = cv2.imencode('.jpg', frame, self.params(quality))
+        if not ok:
+            raise ValueError("JPEG-Kodierung fehlgeschlagen")
+        return data
+
+    def encode(self, frame):
+        """Kodiert ein Bild und gibt (Daten, Qualität) zurück"""
+        if not self.target_bytes:
+            return self._encode_quality(frame, self.quality), self.quality
+
+        # Binärsuche nach der höchsten Qualität, die die Zielgröße einhält
+        low, high = self.min_quality, self.max_quality
+        best = None
+        while low <= high:
+            quality = (low + high) // 2
+            data = self._encode_quality(frame, quality)
+            if data.size <= self.target_bytes:
+                best = (data, quality)
+                low = quality + 1
+            else:
+                high = quality - 1
+
+        if best is None:
+            # Zielgröße auch mit der Mindestqualität nicht erreichbar
+            self.logger.warning(f"Zielgröße {self.target_bytes} Bytes nicht erreichbar, verwende Qualität {self.min_quality}")
+            best = (self._encode_quality(frame, self.min_quality), self.min_quality)
+        return best
+
+    def _write(self, frame, output_path):
+        """Kodiert ein Bild und schreibt es (läuft im Thread-Pool)"""
+        try:
+            with IMAGE_WRITE_SECONDS.time(kind='export'):
+                data, quality = self.encode(frame)
+                with open(output_path, 'wb') as f:
+                    f.write(data.tobytes())
+            return {'path': output_path, 'bytes': int(data.size), 'quality': quality}
+        finally:
+            QUEUE_DEPTH.dec(queue='export_encoder')
+            self._slots.release()
+
+    def submit(self, frame, output_path):
+        """Reiht ein Bild zum Kodieren ein und gibt ein Future zurück
+
+        Blockiert, solange bereits zwei Bilder pro Thread auf die Kodierung warten.
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='ExportEncoder')
+
+        self._slots.acquire()
+        QUEUE_DEPTH.inc(queue='export_encoder')
+        try:
+            return self._executor.submit(self._write, frame, output_path)
+        except Exception:
+            QUEUE_DEPTH.dec(queue='export_encoder')
+            self._slots.release()
+            raise
+
+    def encode_all(self, items):
+        """Kodiert (Bild, Pfad)-Paare parallel und gibt die Ergebnisse in Eingabereihenfolge zurück"""
+        futures = [self.submit(frame, output_path) for frame, output_path in items]
+        return [future.result() for future in futures]
+
+    def close(self):
+        """Beendet den Thread-Pool"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
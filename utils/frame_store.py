@@ -0,0 +1,175 @@
+# Datei: utils/frame_store.py
+# Modul für einen speicherabgebildeten Bild-Cache (dekodierte Frames) pro Session
+
+import os
+import json
+import logging
+import numpy as np
+import cv2
+
+class FrameStore:
+    """Dekodierte Bilder einer Session als .npy-Datei für den Zugriff per np.memmap
+
+    Die Bilder werden einmal dekodiert (optional verkleinert) und in einem
+    einzigen Array (Anzahl, Höhe, Breite, 3) gespeichert. Spätere Verarbeitungs-
+    schritte lesen die Frames ohne JPEG-Dekodierung und ohne Kopie direkt aus den
+    Seiten der Datei; mehrere Prozesse teilen sich dabei den Seiten-Cache.
+    """
+
+    DATA_FILE = 'frames.npy'
+    HEADER_FILE = 'frames.json'
+
+    # Verkleinerungsfaktoren, die der JPEG-Decoder direkt unterstützt
+    REDUCED_FLAGS = {
+        2: cv2.IMREAD_REDUCED_COLOR_2,
+        4: cv2.IMREAD_REDUCED_COLOR_4,
+        8: cv2.IMREAD_REDUCED_COLOR_8
+    }
+
+    def __init__(self, session_dir):
+        """Initialisiert den Frame-Store im Session-Verzeichnis"""
+        self.logger = logging.getLogger(__name__)
+        self.session_dir = session_dir
+        self.data_path = os.path.join(session_dir, self.DATA_FILE)
+        self.header_path = os.path.join(session_dir, self.HEADER_FILE)
+        self.header = None
+        self.frames = None
+        self._index = {}
+
+    @staticmethod
+    def source_key(path):
+        """Kennung eines Quellbildes (Name, Größe, Änderungszeit)"""
+        stat = os.stat(path)
+        return [os.path.basename(path), stat.st_size, stat.st_mtime_ns]
+
+    @classmethod
+    def read_frame(cls, path, scale=1):
+        """Dekodiert ein Bild, bei scale 2/4/8 direkt verkleinert im Decoder"""
+        if scale in cls.REDUCED_FLAGS:
+            return cv2.imread(path, cls.REDUCED_FLAGS[scale])
+
+        frame = cv2.imread(path)
+        if frame is not None and scale > 1:
+            frame = cv2.resize(frame, (frame.shape[1] // scale, frame.shape[0] // scale), interpolation=cv2.INTER_AREA)
+        return frame
+
+    def build(self, session, scale=1):
+        """Dekodiert alle Fotos der Session (nach Winkel sortiert) in den Frame-Store"""
+        angles = sorted(angle for angle, path in session.photos.items() if path and os.path.exists(path))
+        if not angles:
+            self.logger.error(f"Keine Fotos für den Frame-Store der Session {session.id}")
+            return False
+
+        temp_path = os.path.join(self.session_dir, 'frames.tmp.npy')
+        frames = None
+        sources = []
+        try:
+            for index, angle in enumerate(angles):
+                path = session.photos[angle]
+                frame = self.read_frame(path, scale)
+                if frame is None:
+                    raise ValueError(f"Foto konnte nicht geladen werden: {path}")
+
+                if frames is None:
+                    # Ausgabedatei in voller Größe anlegen, Frames direkt hineinschreiben
+                    frames = np.lib.format.open_memmap(temp_path, mode='w+', dtype=np.uint8,
+                                                       shape=(len(angles),) + frame.shape)
+                if frame.shape != frames.shape[1:]:
+                    frame = cv2.resize(frame, (frames.shape[2], frames.shape[1]), interpolation=cv2.INTER_AREA)
+
+                frames[index] = frame
+                sources.append(self.source_key(path))
+
+            frames.flush()
+            del frames
+
+            header = {
+                'version': 1,
+                'angles': angles,
+                'sources': sources,
+                'scale': scale,
+                'shape': list(np.load(temp_path, mmap_mode='r').shape)
+            }
+            os.replace(temp_path, self.data_path)
+            with open(self.header_path + '.tmp', 'w') as f:
+                json.dump(header, f, indent=4)
+            os.replace(self.header_path + '.tmp', self.header_path)
+        except Exception as e:
+            self.logger.error(f"Fehler beim Erstellen des Frame-Stores: {str(e)}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return False
+
+        self.logger.info(f"Frame-Store erstellt: {len(angles)} Bilder, Form {header['shape']}")
+        self.close()
+        return True
+
+    def is_valid(self, session, scale=None):
+        """Prüft, ob der Frame-Store zu den aktuellen Fotos der Session passt"""
+        if not os.path.exists(self.data_path) or not os.path.exists(self.header_path):
+            return False
+        try:
+            with open(self.header_path, 'r') as f:
+                header = json.load(f)
+
+            if scale is not None and header.get('scale') != scale:
+                return False
+            angles = sorted(angle for angle, path in session.photos.items() if path and os.path.exists(path))
+            if header.get('angles') != angles:
+                return False
+            return header.get('sources') == [self.source_key(session.photos[angle]) for angle in angles]
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Frame-Store-Header ungültig: {str(e)}")
+            return False
+
+    def open(self):
+        """Öffnet den Frame-Store lesend als Speicherabbild"""
+        if self.frames is not None:
+            return True
+        try:
+            with open(self.header_path, 'r') as f:
+                self.header = json.load(f)
+            self.frames = np.load(self.data_path, mmap_mode='r')
+            self._index = {angle: index for index, angle in enumerate(self.header['angles'])}
+            return True
+        except Exception as e:
+            self.logger.error(f"Frame-Store konnte nicht geöffnet werden: {str(e)}")
+            self.close()
+            return False
+
+    def close(self):
+        """Gibt das Speicherabbild frei"""
+        self.frames = None
+        self.header = None
+        self._index = {}
+
+    def get_frame(self, angle):
+        """Gibt den Frame eines Winkels als schreibgeschützte Sicht zurück (None, falls nicht vorhanden)"""
+        if self.frames is None or angle not in self._index:
+            return None
+        return self.frames[self._index[angle]]
+
+    def items(self):
+        """Liefert (Winkel, Frame) in Winkelreihenfolge"""
+        if self.frames is None:
+            return
+        for angle, index in self._index.items():
+            yield angle, self.frames[index]
+
+    @classmethod
+    def open_for_session(cls, session, session_dir, scale=None):
+        """Öffnet den Frame-Store einer Session, falls er aktuell ist (sonst None)"""
+        store = cls(session_dir)
+        if store.is_valid(session, scale) and store.open():
+            return store
+        return None
+
+    @classmethod
+    def get_or_build(cls, session, session_dir, scale=1):
+        """Öffnet den Frame-Store oder erstellt ihn neu"""
+        store = cls.open_for_session(session, session_dir, scale)
+        if store is None:
+            store = cls(session_dir)
+            if not store.build(session, scale) or not store.open():
+                return None
+        return store
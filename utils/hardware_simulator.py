@@ -0,0 +1,337 @@
+# Datei: utils/hardware_simulator.py
+# Modul zur Simulation von Drehteller (Arduino) und Kamera ohne Hardware
+
+import os
+import math
+import time
+import random
+import logging
+import threading
+import numpy as np
+import cv2
+from utils.motor_model import MotorModel
+
+class SimulatedTurntable:
+    """Physikalisches Modell des Drehtellers (Motor an/aus, Anlaufzeit, Nachschwingen)"""
+
+    def __init__(self, degrees_per_second=MotorModel.DEFAULT_DEGREES_PER_SECOND, startup_lag=0.1, settle_time=0.3):
+        """Initialisiert das Drehteller-Modell"""
+        self.degrees_per_second = degrees_per_second
+        self.startup_lag = startup_lag  # Sekunden bis der Motor tatsächlich dreht
+        self.settle_time = settle_time  # Zeitkonstante des Nachschwingens nach dem Stopp
+        self.motor_running = False
+        self._base_angle = 0.0
+        self._start_time = None
+        self._stop_time = None
+        self._lock = threading.Lock()
+
+    def _rotation_since_start(self, now):
+        """Gedrehter Winkel seit dem letzten Einschalten"""
+        moving_time = max(0.0, now - self._start_time - self.startup_lag)
+        return moving_time * self.degrees_per_second
+
+    def start_motor(self):
+        """Schaltet den Motor ein"""
+        with self._lock:
+            if not self.motor_running:
+                self.motor_running = True
+                self._start_time = time.monotonic()
+
+    def stop_motor(self):
+        """Schaltet den Motor aus"""
+        with self._lock:
+            if self.motor_running:
+                now = time.monotonic()
+                self._base_angle = (self._base_angle + self._rotation_since_start(now)) % 360
+                self.motor_running = False
+                self._stop_time = now
+
+    def get_angle(self):
+        """Gibt den aktuellen Winkel des Tellers in Grad zurück"""
+        with self._lock:
+            if self.motor_running:
+                return (self._base_angle + self._rotation_since_start(time.monotonic())) % 360
+            return self._base_angle
+
+    def get_wobble(self):
+        """Gibt die aktuelle Auslenkung des Nachschwingens in Pixeln zurück"""
+        with self._lock:
+            if self.motor_running or self._stop_time is None or self.settle_time <= 0:
+                return 0.0
+            elapsed = time.monotonic() - self._stop_time
+
+        # Gedämpfte Schwingung mit ca. 4 Hz
+        return 6.0 * math.exp(-elapsed / self.settle_time) * math.sin(2 * math.pi * 4.0 * elapsed)
+
+    def reset(self, angle=0.0):
+        """Setzt den Teller auf einen Winkel zurück (ohne Bewegung)"""
+        with self._lock:
+            self.motor_running = False
+            self._base_angle = angle % 360
+            self._stop_time = None
+
+
+class SimulatedArduino:
+    """Simuliert den Arduino-Sketch (turntable_controller.ino) über ein Pseudo-Terminal"""
+
+    def __init__(self, turntable, latency_ms=5.0, jitter_ms=2.0, failure_rate=0.0):
+        """Initialisiert den simulierten Arduino"""
+        self.logger = logging.getLogger(__name__)
+        self.turntable = turntable
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.port = None
+        self._master_fd = None
+        self._slave_fd = None
+        self._thread = None
+        self._running = False
+
+    def start(self):
+        """Öffnet das Pseudo-Terminal und startet die Befehlsverarbeitung"""
+        if self._running:
+            return self.port
+
+        import tty
+
+        self._master_fd, self._slave_fd = os.openpty()
+        # Rohmodus, damit Bytes unverändert ankommen (kein Echo, keine Zeilenpufferung)
+        tty.setraw(self._slave_fd)
+        self.port = os.ttyname(self._slave_fd)
+
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, name='SimulatedArduino', daemon=True)
+        self._thread.start()
+
+        self.logger.info("Simulierter Arduino bereit auf %s", self.port)
+        return self.port
+
+    def stop(self):
+        """Beendet die Simulation und schließt das Pseudo-Terminal"""
+        self._running = False
+        for fd in (self._master_fd, self._slave_fd):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self._master_fd = None
+        self._slave_fd = None
+        self.port = None
+
+    def _delay(self):
+        """Wartet die konfigurierte Antwortzeit inklusive Streuung"""
+        delay_ms = max(0.0, random.gauss(self.latency_ms, self.jitter_ms))
+        time.sleep(delay_ms / 1000.0)
+
+    def _reply(self, line):
+        """Sendet eine Antwortzeile an den Host (oder verliert sie gemäß Fehlerrate)"""
+        self._delay()
+        if random.random() < self.failure_rate:
+            self.logger.debug("Simulierter Arduino: Antwort '%s' verworfen", line)
+            return
+        os.write(self._master_fd, f"{line}\r\n".encode())
+
+    def _handle_command(self, command):
+        """Verarbeitet einen Befehl wie der Arduino-Sketch"""
+        if command == '1':
+            self.turntable.start_motor()
+            self._reply("OK")
+        elif command == '0':
+            self.turntable.stop_motor()
+            self._reply("OK")
+        elif command == 'S':
+            self._reply("STATUS: RUNNING" if self.turntable.motor_running else "STATUS: STOPPED")
+        else:
+            self._reply("ERROR: Unknown command")
+
+    def _serve(self):
+        """Liest Befehle vom Pseudo-Terminal"""
+        while self._running:
+            try:
+                data = os.read(self._master_fd, 64)
+            except OSError:
+                break
+
+            # Wie im Sketch: erstes Zeichen auswerten, Rest des Puffers verwerfen.
+            # Zeilenenden (vom ArduinoController angehängt) werden ignoriert.
+            command = data.decode(errors='ignore').strip()
+            if command:
+                self._handle_command(command[0])
+
+
+class SimulatedCamera:
+    """Simuliert eine Kamera, die einen rotierenden Gegenstand auf dem Teller rendert"""
+
+    def __init__(self, turntable, resolution=(1280, 720), latency_ms=50.0, jitter_ms=10.0,
+                 failure_rate=0.0, noise=2.0):
+        """Initialisiert die simulierte Kamera"""
+        self.logger = logging.getLogger(__name__)
+        self.turntable = turntable
+        self.resolution = resolution
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.noise = noise
+        self._background = None
+        self._rng = np.random.default_rng()
+
+    def _get_background(self):
+        """Erzeugt den statischen Hintergrund einmalig (Farbverlauf)"""
+        width, height = self.resolution
+        if self._background is None or self._background.shape[:2] != (height, width):
+            gradient = np.linspace(200, 150, height, dtype=np.float32)[:, None]
+            background = np.empty((height, width, 3), dtype=np.uint8)
+            background[:] = np.repeat(gradient, width, axis=1)[:, :, None].astype(np.uint8)
+            self._background = background
+        return self._background
+
+    def render_frame(self, angle=None, include_object=True):
+        """Rendert ein Bild des Tellers beim angegebenen (oder aktuellen) Winkel"""
+        width, height = self.resolution
+        if angle is None:
+            angle = self.turntable.get_angle()
+
+        frame = self._get_background().copy()
+
+        # Teller als Ellipse, leicht versetzt durch das Nachschwingen
+        cx = width / 2.0 + self.turntable.get_wobble()
+        cy = height * 0.65
+        plate_rx = width * 0.35
+        plate_ry = plate_rx * 0.3
+        center = (int(cx), int(cy))
+        cv2.ellipse(frame, center, (int(plate_rx), int(plate_ry)), 0, 0, 360, (90, 90, 90), -1)
+
+        # Markierungen auf dem Teller, die sich mitdrehen
+        for k in range(12):
+            theta = math.radians(angle + k * 30)
+            x = cx + plate_rx * 0.9 * math.cos(theta)
+            y = cy + plate_ry * 0.9 * math.sin(theta)
+            cv2.circle(frame, (int(x), int(y)), max(2, width // 200), (230, 230, 230), -1)
+
+        if include_object:
+            self._draw_object(frame, cx, cy, plate_rx * 0.45, angle)
+
+        if self.noise > 0:
+            # Sensorrauschen
+            noise = self._rng.normal(0, self.noise, frame.shape).astype(np.int16)
+            frame = np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+        return frame
+
+    def _draw_object(self, frame, cx, cy, radius, angle):
+        """Zeichnet einen Quader mit unterschiedlich gefärbten Seiten"""
+        colors = [(40, 40, 200), (40, 180, 40), (200, 60, 40), (40, 200, 220)]
+        object_height = radius * 1.6
+        squash = 0.3
+
+        bottom = []
+        for k in range(4):
+            theta = math.radians(angle + 45 + k * 90)
+            bottom.append((cx + radius * math.cos(theta), cy + radius * squash * math.sin(theta)))
+        top = [(x, y - object_height) for x, y in bottom]
+
+        # Seitenflächen von hinten nach vorne zeichnen (Maler-Algorithmus)
+        faces = []
+        for k in range(4):
+            j = (k + 1) % 4
+            depth = (bottom[k][1] + bottom[j][1]) / 2.0
+            polygon = np.array([bottom[k], bottom[j], top[j], top[k]], dtype=np.int32)
+            faces.append((depth, polygon, colors[k]))
+
+        for _, polygon, color in sorted(faces, key=lambda face: face[0]):
+            cv2.fillConvexPoly(frame, polygon, color)
+
+        cv2.fillConvexPoly(frame, np.array(top, dtype=np.int32), (220, 220, 220))
+
+    def read_frame(self):
+        """Liest ein Bild wie cv2.VideoCapture.read() (inklusive Latenz und Fehlern)"""
+        delay_ms = max(0.0, random.gauss(self.latency_ms, self.jitter_ms))
+        time.sleep(delay_ms / 1000.0)
+
+        if random.random() < self.failure_rate:
+            return False, None
+
+        return True, self.render_frame()
+
+    def capture(self, output_path, include_object=True):
+        """Nimmt ein simuliertes Foto auf und speichert es als JPEG"""
+        if include_object:
+            ret, frame = self.read_frame()
+        else:
+            ret, frame = True, self.render_frame(include_object=False)
+
+        if not ret:
+            self.logger.error("Simulierte Kamera: Aufnahme fehlgeschlagen")
+            return False
+
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+        return cv2.imwrite(output_path, frame)
+
+
+class HardwareSimulator:
+    """Bündelt Drehteller, Arduino und Kamera mit gemeinsamem Zustand"""
+
+    def __init__(self, options=None):
+        """Initialisiert den Simulator mit optionalen Einstellungen"""
+        self.turntable = SimulatedTurntable()
+        self.arduino = SimulatedArduino(self.turntable)
+        self.camera = SimulatedCamera(self.turntable)
+        self.configure(options or {})
+
+    def configure(self, options):
+        """Übernimmt Einstellungen (z.B. aus dem 'simulator'-Abschnitt der Konfiguration)"""
+        turntable = self.turntable
+        turntable.degrees_per_second = options.get('degrees_per_second', turntable.degrees_per_second)
+        turntable.startup_lag = options.get('startup_lag', turntable.startup_lag)
+        turntable.settle_time = options.get('settle_time', turntable.settle_time)
+
+        arduino = self.arduino
+        arduino.latency_ms = options.get('serial_latency_ms', arduino.latency_ms)
+        arduino.jitter_ms = options.get('serial_jitter_ms', arduino.jitter_ms)
+        arduino.failure_rate = options.get('serial_failure_rate', arduino.failure_rate)
+
+        camera = self.camera
+        camera.latency_ms = options.get('capture_latency_ms', camera.latency_ms)
+        camera.jitter_ms = options.get('capture_jitter_ms', camera.jitter_ms)
+        camera.failure_rate = options.get('capture_failure_rate', camera.failure_rate)
+        camera.noise = options.get('noise', camera.noise)
+
+        resolution = options.get('resolution')
+        if isinstance(resolution, dict):
+            camera.resolution = (int(resolution.get('width', 1280)), int(resolution.get('height', 720)))
+        elif isinstance(resolution, (tuple, list)) and len(resolution) == 2:
+            camera.resolution = (int(resolution[0]), int(resolution[1]))
+
+    def start(self):
+        """Startet den simulierten Arduino und gibt den seriellen Port zurück"""
+        return self.arduino.start()
+
+    def stop(self):
+        """Beendet die Simulation"""
+        self.arduino.stop()
+
+
+# Ein Simulator pro Schlüssel ('simulator' oder 'simulator:<station>'): Arduino und Kamera
+# mit demselben Schlüssel sehen denselben Teller, simulierte Stationen laufen unabhängig
+DEFAULT_KEY = 'simulator'
+_simulators = {}
+_simulators_lock = threading.Lock()
+
+def simulator_key(name):
+    """Schlüssel eines Simulator-Ports bzw. -Geräts (sonst der Standardschlüssel)"""
+    name = str(name or '')
+    return name if name.startswith(DEFAULT_KEY + ':') else DEFAULT_KEY
+
+def get_hardware_simulator(options=None, key=DEFAULT_KEY):
+    """Gibt die Simulator-Instanz zum Schlüssel zurück (und konfiguriert sie optional)"""
+    with _simulators_lock:
+        simulator = _simulators.get(key)
+        if simulator is None:
+            simulator = _simulators[key] = HardwareSimulator(options)
+        elif options:
+            simulator.configure(options)
+        return simulator
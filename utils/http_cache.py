@@ -0,0 +1,96 @@
+# Datei: utils/http_cache.py
+# Modul zur Auslieferung von Dateien mit HTTP-Caching (ETag, 304, Range)
+
+import os
+import hashlib
+import logging
+import threading
+from flask import current_app, request, send_file, abort
+from werkzeug.utils import safe_join
+
+logger = logging.getLogger(__name__)
+
+# Cache-Control für inhaltsadressierte URLs (?v=<version>)
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Ohne Version muss der Browser jedes Mal per ETag nachfragen (meist 304)
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+# Zwischenspeicher für Inhalts-Hashes: (Pfad, mtime_ns, Größe) -> Hash
+_content_hashes = {}
+_content_hashes_lock = threading.Lock()
+_MAX_CONTENT_HASHES = 4096
+
+
+def _content_hash(path, stat):
+    """Berechnet den SHA1-Hash des Dateiinhalts (mit Zwischenspeicher)"""
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    with _content_hashes_lock:
+        cached = _content_hashes.get(key)
+    if cached:
+        return cached
+
+    sha1 = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            sha1.update(chunk)
+    digest = sha1.hexdigest()
+
+    with _content_hashes_lock:
+        if len(_content_hashes) >= _MAX_CONTENT_HASHES:
+            _content_hashes.clear()
+        _content_hashes[key] = digest
+    return digest
+
+
+def file_version(path, content_hash=False):
+    """Liefert eine kurze, starke Version einer Datei (Basis für ETag und ?v=)"""
+    stat = os.stat(path)
+    if content_hash:
+        return _content_hash(path, stat)[:16]
+
+    key = f"{stat.st_ino}|{stat.st_size}|{stat.st_mtime_ns}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+
+def send_cached_file(path, content_hash=False, mimetype=None):
+    """Liefert eine Datei mit starkem ETag, bedingtem GET und Range-Unterstützung aus"""
+    if not os.path.isfile(path):
+        abort(404)
+
+    version = file_version(path, content_hash)
+
+    # conditional=True beantwortet If-None-Match (304) und Range-Anfragen (206)
+    response = send_file(path, mimetype=mimetype, conditional=True, etag=version)
+    response.headers['Accept-Ranges'] = 'bytes'
+
+    # Nur wenn die URL die aktuelle Version enthält, darf der Browser dauerhaft cachen
+    if request.args.get('v') == version:
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    else:
+        response.headers['Cache-Control'] = REVALIDATE_CACHE_CONTROL
+
+    return response
+
+
+def send_cached_from_directory(directory, filename, content_hash=False, mimetype=None):
+    """Wie send_from_directory, aber mit dem Caching-Verhalten von send_cached_file"""
+    if not os.path.isabs(directory):
+        directory = os.path.join(current_app.root_path, directory)
+
+    path = safe_join(directory, filename)
+    if path is None:
+        logger.warning(f"Ungültiger Dateipfad angefragt: {filename}")
+        abort(404)
+
+    return send_cached_file(path, content_hash=content_hash, mimetype=mimetype)
+
+
+def versioned_url(url, path, content_hash=False):
+    """Hängt die Dateiversion an eine URL an (inhaltsadressiert, statt ?t=<Zeit>)"""
+    try:
+        version = file_version(path, content_hash)
+    except OSError:
+        return url
+
+    separator = '&' if '?' in url else '?'
+    return f"{url}{separator}v={version}"
@@ -2,10 +2,12 @@
 # Modul für die Bildverarbeitung
 
 import os
+import time
 import logging
 import shutil
 import json
 from pathlib import Path
+from utils.metrics import EXPORT_SECONDS, FRAMES_TOTAL, FAILURES_TOTAL
 
 class ImageProcessor:
     """Klasse zur Verarbeitung von Bildern für die 360°-Anzeige"""
@@ -16,8 +18,15 @@ class ImageProcessor:
         self.path_manager = path_manager
         self.template_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates', 'viewer')
     
-    def prepare_360_viewer(self, project, session):
-        """Bereitet die Bilder für die 360°-Anzeige vor"""
+    def prepare_360_viewer(self, project, session, crop=False, recenter=False, padding=0.05, reference_path=None,
+                           quality=None, target_kb=None):
+        """Bereitet die Bilder für die 360°-Anzeige vor
+
+        crop: Bilder auf den gemeinsamen Objektausschnitt zuschneiden (statt sie zu kopieren)
+        recenter: jeden Ausschnitt horizontal am Schwerpunkt des Objekts ausrichten
+        quality/target_kb: Bilder mit fester JPEG-Qualität bzw. auf eine Zielgröße pro Bild neu kodieren
+        """
+        start = time.perf_counter()
         try:
             # Exportverzeichnis erstellen
             export_name = f"{project.id}_{session.id}_360"
@@ -37,20 +46,32 @@ class ImageProcessor:
                 'images': []
             }
             
-            # Bilder kopieren und Konfiguration aktualisieren
-            for angle, photo_path in sorted(session.photos.items()):
-                # Zieldateiname
-                target_filename = f"frame_{int(angle):03d}.jpg"
-                target_path = os.path.join(images_dir, target_filename)
-                
-                # Bild kopieren
-                shutil.copy2(photo_path, target_path)
-                
-                # Zur Konfiguration hinzufügen
-                config['images'].append({
-                    'angle': angle,
-                    'path': f"images/{target_filename}"
-                })
+            # Ausschnitte um das Objekt bestimmen
+            windows = None
+            if crop:
+                windows = self._compute_crop_windows(project, session, recenter, padding, reference_path)
+            
+            mode = 'copy'
+            if windows is not None or quality or target_kb:
+                mode = 'crop' if windows is not None else 'encode'
+                from utils.export_encoder import ExportEncoder
+                encoder = ExportEncoder(quality=quality or 90, target_bytes=int(target_kb * 1024) if target_kb else None)
+                self._export_encoded(project, session, images_dir, config, windows, encoder)
+            else:
+                # Bilder kopieren und Konfiguration aktualisieren
+                for angle, photo_path in sorted(session.photos.items()):
+                    # Zieldateiname
+                    target_filename = f"frame_{int(angle):03d}.jpg"
+                    target_path = os.path.join(images_dir, target_filename)
+                    
+                    # Bild kopieren
+                    shutil.copy2(photo_path, target_path)
+                    
+                    # Zur Konfiguration hinzufügen
+                    config['images'].append({
+                        'angle': angle,
+                        'path': f"images/{target_filename}"
+                    })
             
             # Konfigurationsdatei speichern
             config_path = os.path.join(export_path, "config.json")
@@ -60,13 +81,67 @@ class ImageProcessor:
             # HTML-Viewer kopieren
             self._create_viewer_html(export_path, config)
             
+            EXPORT_SECONDS.observe(time.perf_counter() - start, mode=mode)
+            FRAMES_TOTAL.inc(len(config['images']), stage='export')
             self.logger.info(f"360°-Viewer erfolgreich erstellt: {export_path}")
             return export_path
         
         except Exception as e:
+            FAILURES_TOTAL.inc(stage='export')
             self.logger.error(f"Fehler bei der Vorbereitung des 360°-Viewers: {str(e)}")
             return None
     
+    def _compute_crop_windows(self, project, session, recenter, padding, reference_path=None):
+        """Bestimmt die Ausschnitte aller Winkel, None wenn kein Objekt gefunden wurde"""
+        from utils.object_cropper import ObjectCropper
+        
+        session_dir = os.path.join(project.path, "sessions", session.id)
+        cropper = ObjectCropper(padding=padding, recenter=recenter)
+        
+        try:
+            layout = cropper.measure(session, session_dir, reference_path)
+        except ValueError as e:
+            self.logger.warning(f"Zuschnitt nicht möglich, exportiere vollständige Bilder: {str(e)}")
+            return None
+        
+        if layout is None:
+            self.logger.warning("Kein Objekt gefunden, exportiere vollständige Bilder")
+            return None
+        return cropper.compute_windows(layout)
+    
+    def _export_encoded(self, project, session, images_dir, config, windows, encoder):
+        """Schneidet die Bilder optional zu und kodiert sie parallel in das Exportverzeichnis"""
+        from utils.object_cropper import ObjectCropper
+        
+        session_dir = os.path.join(project.path, "sessions", session.id)
+        if windows is not None:
+            windows, default_window = windows
+            config['width'] = default_window[2]
+            config['height'] = default_window[3]
+        
+        futures = []
+        with encoder:
+            # Dekodieren (Vorausladen), Zuschneiden und Kodieren laufen überlappend
+            for angle, photo_path, frame in session.iter_frames(session_dir=session_dir):
+                if frame is None:
+                    continue
+                
+                target_filename = f"frame_{int(angle):03d}.jpg"
+                image = {'angle': angle, 'path': f"images/{target_filename}"}
+                if windows is not None:
+                    # Position des Ausschnitts im Originalbild
+                    window = windows.get(angle, default_window)
+                    image['crop'] = list(window)
+                    frame = ObjectCropper.crop(frame, window)
+                
+                config['images'].append(image)
+                futures.append(encoder.submit(frame, os.path.join(images_dir, target_filename)))
+            
+            results = [future.result() for future in futures]
+        
+        total_bytes = sum(result['bytes'] for result in results)
+        self.logger.info(f"{len(results)} Bilder kodiert ({total_bytes / 1024:.0f} KB)")
+    
     def _create_viewer_html(self, export_path, config):
         """Erstellt die HTML-Dateien für den 360°-Viewer"""
         try:
@@ -0,0 +1,257 @@
+# Datei: utils/metrics.py
+# Modul für Laufzeitmetriken im Prometheus-Textformat (Zähler, Messwerte, Histogramme)
+
+import time
+import threading
+from contextlib import contextmanager
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Standard-Bucketgrenzen in Sekunden (von Schreibzugriffen bis zu vollen Umdrehungen)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value):
+    """Maskiert einen Label-Wert für das Textformat"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=None):
+    """Formatiert Labels als {name="wert",...} (leer ohne Labels)"""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{_escape(extra[1])}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    """Formatiert einen Zahlenwert (Ganzzahlen ohne Nachkommastellen)"""
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Gemeinsame Basis: Name, Beschreibung, Labelnamen und Werte pro Labelkombination"""
+
+    TYPE = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        """Initialisiert die Metrik"""
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        """Schlüssel der Labelkombination (fehlende Labels werden leer)"""
+        unknown = set(labels) - set(self.labelnames)
+        if unknown:
+            raise ValueError(f"Unbekannte Labels für {self.name}: {', '.join(sorted(unknown))}")
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def _samples(self):
+        """Liefert (Suffix, Labelwerte, Zusatzlabel, Wert) für die Ausgabe"""
+        with self._lock:
+            return [('', key, None, value) for key, value in sorted(self._values.items())]
+
+    def get(self, **labels):
+        """Aktueller Wert einer Labelkombination"""
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def render(self):
+        """Gibt die Metrik im Textformat zurück"""
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.TYPE}']
+        for suffix, key, extra, value in self._samples():
+            lines.append(f'{self.name}{suffix}{_format_labels(self.labelnames, key, extra)} {_format_value(value)}')
+        return '\n'.join(lines)
+
+
+class Counter(_Metric):
+    """Monoton steigender Zähler (z.B. Anzahl der Bilder oder Fehler)"""
+
+    TYPE = 'counter'
+
+    def inc(self, amount=1, **labels):
+        """Erhöht den Zähler"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Messwert, der steigen und fallen kann (z.B. Warteschlangenlänge, Speicher)
+
+    Mit set_function werden Werte erst beim Abruf der Metriken bestimmt; die
+    Funktion gibt eine Zahl oder ein Dict {Labelwerte (Tupel): Zahl} zurück,
+    das die gesetzten Werte ergänzt.
+    """
+
+    TYPE = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=()):
+        """Initialisiert den Messwert"""
+        super().__init__(name, documentation, labelnames)
+        self._function = None
+
+    def set(self, value, **labels):
+        """Setzt den Messwert"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        """Erhöht den Messwert"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        """Verringert den Messwert"""
+        self.inc(-amount, **labels)
+
+    def remove(self, **labels):
+        """Entfernt eine Labelkombination"""
+        key = self._key(labels)
+        with self._lock:
+            self._values.pop(key, None)
+
+    def set_function(self, function):
+        """Bestimmt den Wert beim Abruf über eine Funktion"""
+        self._function = function
+
+    def _samples(self):
+        with self._lock:
+            values = dict(self._values)
+        if self._function is not None:
+            result = self._function()
+            if not isinstance(result, dict):
+                result = {(): result}
+            values.update((tuple(str(value) for value in key), value) for key, value in result.items())
+        return [('', key, None, value) for key, value in sorted(values.items())]
+
+
+class Histogram(_Metric):
+    """Verteilung von Messwerten in kumulativen Buckets (z.B. Dauern in Sekunden)"""
+
+    TYPE = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """Initialisiert das Histogramm"""
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        """Erfasst einen Messwert"""
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            self._values[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels):
+        """Misst die Dauer eines Blocks (auch bei Ausnahmen)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def get(self, **labels):
+        """Gibt (Anzahl, Summe) der Messwerte zurück"""
+        with self._lock:
+            counts, total = self._values.get(self._key(labels), ([0], 0.0))
+            return sum(counts), total
+
+    def _samples(self):
+        samples = []
+        with self._lock:
+            for key, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    samples.append(('_bucket', key, ('le', _format_value(bound)), cumulative))
+                samples.append(('_sum', key, None, total))
+                samples.append(('_count', key, None, cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    """Sammlung aller Metriken eines Prozesses"""
+
+    def __init__(self):
+        """Initialisiert die Registry"""
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, documentation, labelnames, **kwargs):
+        """Legt eine Metrik an oder gibt die vorhandene gleichen Namens zurück"""
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metrik {name} ist bereits mit anderem Typ registriert")
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        """Registriert einen Zähler"""
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        """Registriert einen Messwert"""
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """Registriert ein Histogramm"""
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self):
+        """Gibt alle Metriken im Prometheus-Textformat zurück"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+
+registry = MetricsRegistry()
+
+# Aufnahme
+ROTATION_SECONDS = registry.histogram(
+    'drehteller_rotation_seconds', 'Dauer einer Drehtellerbewegung in Sekunden',
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0))
+SETTLE_SECONDS = registry.histogram(
+    'drehteller_settle_seconds', 'Wartezeit bis zur Ruhe des Tellers nach einer Bewegung in Sekunden',
+    ['method'], buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0))
+CAPTURE_SECONDS = registry.histogram(
+    'drehteller_capture_seconds', 'Dauer einer Fotoaufnahme in Sekunden', ['camera_type'])
+IMAGE_WRITE_SECONDS = registry.histogram(
+    'drehteller_image_write_seconds', 'Dauer des Kodierens und Schreibens eines Bildes in Sekunden', ['kind'])
+FRAMES_TOTAL = registry.counter(
+    'drehteller_frames_total', 'Anzahl der verarbeiteten Bilder', ['stage'])
+FAILURES_TOTAL = registry.counter(
+    'drehteller_failures_total', 'Anzahl der Fehler', ['stage'])
+SERIAL_RECONNECTS_TOTAL = registry.counter(
+    'drehteller_serial_reconnects_total', 'Anzahl der Neuverbindungen zum Arduino', ['port'])
+GPHOTO2_TIMEOUTS_TOTAL = registry.counter(
+    'drehteller_gphoto2_timeouts_total', 'Anzahl der gphoto2-Aufnahmen mit Zeitüberschreitung')
+
+# Verarbeitung und Export
+SEGMENTATION_SECONDS = registry.histogram(
+    'drehteller_segmentation_seconds', 'Dauer der Hintergrundentfernung pro Bild in Sekunden', ['model'])
+EXPORT_SECONDS = registry.histogram(
+    'drehteller_export_seconds', 'Dauer eines 360°-Exports in Sekunden', ['mode'],
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0))
+
+# Zustand
+QUEUE_DEPTH = registry.gauge(
+    'drehteller_queue_depth', 'Anzahl wartender Einträge pro Warteschlange', ['queue', 'station'])
+MODEL_MEMORY_BYTES = registry.gauge(
+    'drehteller_model_memory_bytes', 'Speicherbedarf geladener Segmentierungsmodelle und Referenzen in Bytes', ['model'])
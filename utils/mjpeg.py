@@ -0,0 +1,74 @@
+# Datei: utils/mjpeg.py
+# Hilfsfunktionen für rohe MJPEG-Frames (JPEG-Bitstrom direkt von der Webcam)
+
+import logging
+import numpy as np
+import cv2
+
+logger = logging.getLogger(__name__)
+
+SOI = b'\xff\xd8'
+DHT = b'\xff\xc4'
+SOS = b'\xff\xda'
+
+# Standard-Huffman-Tabellen (JPEG Annex K), einmalig aus einem libjpeg-Bild gewonnen
+_standard_dht = None
+
+
+def is_raw_jpeg(frame):
+    """Prüft, ob ein Frame ein roher JPEG-Bitstrom ist (CAP_PROP_CONVERT_RGB=0)"""
+    if frame is None or frame.dtype != np.uint8:
+        return False
+    if frame.ndim == 1 or (frame.ndim == 2 and frame.shape[0] == 1):
+        data = frame.reshape(-1)
+        return data.size > 4 and data[0] == 0xFF and data[1] == 0xD8
+    return False
+
+
+def _get_standard_dht():
+    """Liefert die DHT-Segmente der Standard-Tabellen, wie libjpeg sie ohne Optimierung schreibt"""
+    global _standard_dht
+    if _standard_dht is None:
+        success, buffer = cv2.imencode('.jpg', np.zeros((16, 16, 3), dtype=np.uint8),
+                                       [cv2.IMWRITE_JPEG_OPTIMIZE, 0])
+        data = buffer.tobytes() if success else b''
+
+        segments = []
+        offset = 2
+        while offset + 4 <= len(data) and data[offset] == 0xFF:
+            marker = data[offset:offset + 2]
+            length = int.from_bytes(data[offset + 2:offset + 4], 'big')
+            if marker == DHT:
+                segments.append(data[offset:offset + 2 + length])
+            if marker == SOS:
+                break
+            offset += 2 + length
+
+        _standard_dht = b''.join(segments)
+    return _standard_dht
+
+
+def ensure_huffman_tables(data):
+    """Ergänzt fehlende Huffman-Tabellen (viele Webcams lassen DHT in MJPEG-Frames weg)"""
+    sos = data.find(SOS)
+    if sos < 0 or data.find(DHT, 0, sos) >= 0:
+        return data
+    return data[:2] + _get_standard_dht() + data[2:]
+
+
+def frame_to_jpeg_bytes(frame):
+    """Wandelt einen rohen MJPEG-Frame in eine eigenständige JPEG-Datei (Bytes) um"""
+    return ensure_huffman_tables(frame.reshape(-1).tobytes())
+
+
+def decode_frame(frame, flags=cv2.IMREAD_COLOR):
+    """Dekodiert einen rohen MJPEG-Frame nur bei Bedarf, BGR-Frames bleiben unverändert"""
+    if not is_raw_jpeg(frame):
+        return frame
+
+    image = cv2.imdecode(frame.reshape(-1), flags)
+    if image is None:
+        # Manche Decoder benötigen die Huffman-Tabellen explizit
+        data = np.frombuffer(frame_to_jpeg_bytes(frame), dtype=np.uint8)
+        image = cv2.imdecode(data, flags)
+    return image
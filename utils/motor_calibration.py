@@ -0,0 +1,139 @@
+# Datei: utils/motor_calibration.py
+# Modul zur Kalibrierung des Motormodells anhand von Kamerabildern des Tellers
+
+import time
+import logging
+import threading
+import numpy as np
+import cv2
+from utils.motor_model import MotorModel
+
+class MotorCalibrator:
+    """Dreht den Teller für bekannte Zeiten und misst den Winkel per Phasenkorrelation"""
+
+    ANGLE_BINS = 1440  # Winkelauflösung der Polarabbildung (0,25° pro Zeile)
+    RADIAL_BINS = 256
+    KEYFRAME_STEP = 5.0  # Grad, ab denen ein neues Schlüsselbild verwendet wird
+    STILL_THRESHOLD = 0.05  # Grad Änderung zwischen zwei Bildern, die als Stillstand gelten
+    DEADLINE_MARGIN = 5.0  # Sekunden Reserve (Anlaufzeit, serielle Befehle) über Drehdauer und Ruhezeit hinaus
+
+    def __init__(self, arduino_controller, camera_controller, durations=(5.0, 10.0, 20.0, 40.0),
+                 center=(0.5, 0.5), radius=0.45, aspect=1.0, inner_radius=0.5,
+                 settle_time=0.5, settle_timeout=10.0):
+        """Initialisiert die Kalibrierung
+
+        center: Tellermitte relativ zur Bildgröße (x, y)
+        radius: Tellerradius relativ zur Bildbreite
+        aspect: Verhältnis Höhe/Breite des Tellers im Bild (Schrägsicht, 1.0 = Draufsicht)
+        inner_radius: innerer Radius des ausgewerteten Rings relativ zum Tellerradius
+        settle_timeout: maximale Wartezeit auf den Stillstand nach der Drehung in Sekunden
+        """
+        self.logger = logging.getLogger(__name__)
+        self.arduino = arduino_controller
+        self.camera = camera_controller
+        self.durations = durations
+        self.center = center
+        self.radius = radius
+        self.aspect = aspect
+        self.inner_radius = inner_radius
+        self.settle_time = settle_time  # Sekunden ohne Winkeländerung bis zum Messende
+        self.settle_timeout = settle_timeout
+
+    def unwrap(self, frame):
+        """Bildet den Tellerring in Polarkoordinaten ab (Zeilen = Winkel)"""
+        if frame.ndim == 3:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+        height, width = frame.shape[:2]
+        cx = self.center[0] * width
+        cy = self.center[1] * height
+        radius = self.radius * width
+
+        # Schrägsicht entzerren: Ellipse um die Tellermitte zum Kreis strecken
+        if self.aspect != 1.0:
+            matrix = np.float32([[1, 0, 0], [0, 1.0 / self.aspect, cy - cy / self.aspect]])
+            new_height = int(np.ceil(height / self.aspect))
+            frame = cv2.warpAffine(frame, matrix, (width, new_height), flags=cv2.INTER_LINEAR)
+
+        polar = cv2.warpPolar(frame.astype(np.float32), (self.RADIAL_BINS, self.ANGLE_BINS),
+                              (cx, cy), radius, cv2.WARP_POLAR_LINEAR)
+        # Nur den äußeren Ring verwenden, der Gegenstand in der Mitte stört durch seine Höhe
+        return polar[:, int(self.RADIAL_BINS * self.inner_radius):]
+
+    def measure_angle(self, before, after):
+        """Misst den Drehwinkel zwischen zwei Bildern des Tellers in Grad (-180 bis 180)"""
+        (shift_x, shift_y), response = cv2.phaseCorrelate(self.unwrap(before), self.unwrap(after))
+        angle = shift_y * 360.0 / self.ANGLE_BINS
+        return (angle + 180.0) % 360.0 - 180.0, response
+
+    def _read_frame(self):
+        """Liest ein dekodiertes Kamerabild"""
+        ret, frame = self.camera.read_decoded_frame()
+        if not ret:
+            raise RuntimeError("Kein Kamerabild für die Kalibrierung verfügbar")
+        return frame
+
+    def track_rotation(self, duration):
+        """Dreht für eine Dauer und verfolgt den Winkel fortlaufend bis zum Stillstand
+
+        Der Winkel wird schrittweise gegen ein Schlüsselbild gemessen, damit
+        symmetrische Tellermuster (z.B. 12 Markierungen) nicht mehrdeutig sind.
+        Kommt der Teller bis zur Frist (Drehdauer + settle_timeout + Reserve) nicht
+        zur Ruhe (z.B. flackernde Kamera, hängende Drehung), wird RuntimeError ausgelöst.
+        """
+        deadline = time.monotonic() + duration + self.settle_timeout + self.DEADLINE_MARGIN
+        keyframe = self._read_frame()
+        keyframe_angle = 0.0
+        angle = 0.0
+
+        result = {}
+        rotation = threading.Thread(
+            target=lambda: result.setdefault('success', self.arduino.rotate_for_duration(int(duration * 1000))),
+            name='MotorCalibration', daemon=True)
+        rotation.start()
+
+        still_since = None
+        while True:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Teller nach Drehung für {duration} s nicht rechtzeitig zur Ruhe gekommen")
+            frame = self._read_frame()
+            step, _ = self.measure_angle(keyframe, frame)
+            previous_angle = angle
+            angle = keyframe_angle + step
+
+            # Schlüsselbild nachziehen, bevor die Verschiebung mehrdeutig wird
+            if abs(step) >= self.KEYFRAME_STEP:
+                keyframe = frame
+                keyframe_angle = angle
+
+            if rotation.is_alive():
+                continue
+
+            # Nach dem Ausschalten messen, bis sich der Winkel nicht mehr ändert
+            if abs(angle - previous_angle) < self.STILL_THRESHOLD:
+                still_since = still_since or time.monotonic()
+                if time.monotonic() - still_since >= self.settle_time:
+                    break
+            else:
+                still_since = None
+
+        if not result.get('success'):
+            raise RuntimeError(f"Drehung für {duration} s fehlgeschlagen")
+        return angle
+
+    def run(self, repeats=1):
+        """Führt die Kalibrierung aus und gibt (MotorModel, Messpaare) zurück"""
+        if not self.arduino or not self.arduino.is_connected():
+            raise RuntimeError("Arduino ist nicht verbunden")
+
+        samples = []
+        for _ in range(repeats):
+            for duration in self.durations:
+                angle = self.track_rotation(duration)
+                self.logger.info("Kalibrierung: %.2f s -> %.2f Grad", duration, angle)
+                samples.append((duration, angle))
+
+        model = MotorModel.fit(samples)
+        self.logger.info("Motormodell kalibriert: %.4f Grad/s, Anlaufzeit %.3f s (RMS %.3f Grad)",
+                         model.degrees_per_second, model.startup_lag, model.rms_error)
+        return model, samples
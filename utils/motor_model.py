@@ -0,0 +1,77 @@
+# Datei: utils/motor_model.py
+# Modul für das Zeitmodell des Drehteller-Motors (Drehgeschwindigkeit und Anlaufzeit)
+
+import logging
+
+class MotorModel:
+    """Lineares Motormodell: Winkel = Geschwindigkeit * (Einschaltdauer - Anlaufzeit)"""
+
+    # Nennwert des Motors (0,8° in 5 Sekunden)
+    DEFAULT_DEGREES_PER_SECOND = 0.8 / 5.0
+
+    def __init__(self, degrees_per_second=DEFAULT_DEGREES_PER_SECOND, startup_lag=0.0):
+        """Initialisiert das Motormodell"""
+        self.logger = logging.getLogger(__name__)
+        self.degrees_per_second = float(degrees_per_second)
+        self.startup_lag = max(0.0, float(startup_lag))  # Sekunden bis der Teller sich bewegt
+
+    def duration_for(self, degrees):
+        """Einschaltdauer in Sekunden für einen Winkel"""
+        if degrees <= 0:
+            return 0.0
+        return self.startup_lag + degrees / self.degrees_per_second
+
+    def duration_ms_for(self, degrees):
+        """Einschaltdauer in Millisekunden für einen Winkel"""
+        return int(round(self.duration_for(degrees) * 1000))
+
+    def angle_for(self, duration):
+        """Erwarteter Drehwinkel für eine Einschaltdauer in Sekunden"""
+        return max(0.0, duration - self.startup_lag) * self.degrees_per_second
+
+    @classmethod
+    def fit(cls, samples):
+        """Passt das Modell per kleinster Quadrate an Messpaare (Dauer in s, Winkel in Grad) an
+
+        Die Drehrichtung im Bild (direction: 1 oder -1) wird aus den Messungen bestimmt,
+        z.B. negative Winkel bei gespiegelt montierter Kamera; das Modell beschreibt den Betrag.
+        """
+        import numpy as np
+
+        durations = np.array([duration for duration, _ in samples], dtype=np.float64)
+        angles = np.array([angle for _, angle in samples], dtype=np.float64)
+
+        if len(samples) < 2 or np.ptp(durations) <= 0:
+            raise ValueError("Mindestens zwei unterschiedliche Einschaltdauern erforderlich")
+
+        # Winkel = a * Dauer + b  mit  a = Geschwindigkeit, b = -Geschwindigkeit * Anlaufzeit
+        design = np.column_stack([durations, np.ones_like(durations)])
+        (slope, intercept), _, _, _ = np.linalg.lstsq(design, angles, rcond=None)
+        direction = -1 if slope < 0 else 1
+        slope, intercept = slope * direction, intercept * direction
+        if slope <= 0:
+            raise ValueError("Keine Drehung messbar (Geschwindigkeit = 0)")
+
+        model = cls(slope, -intercept / slope)
+        residuals = angles * direction - (slope * durations + intercept)
+        model.rms_error = float(np.sqrt(np.mean(residuals ** 2)))
+        model.direction = direction
+        return model
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Erstellt das Modell aus den gespeicherten Einstellungen"""
+        return cls(settings.motor_degrees_per_second, settings.motor_startup_lag)
+
+    def save_to_settings(self, settings):
+        """Schreibt das Modell in die Einstellungen und speichert sie"""
+        settings.motor_degrees_per_second = self.degrees_per_second
+        settings.motor_startup_lag = self.startup_lag
+        return settings.save()
+
+    def to_dict(self):
+        """Gibt das Modell als Dictionary zurück"""
+        return {
+            'degrees_per_second': self.degrees_per_second,
+            'startup_lag': self.startup_lag
+        }
@@ -0,0 +1,182 @@
+# Datei: utils/object_cropper.py
+# Modul zum Zuschneiden der Session-Bilder auf das Objekt und zum Zentrieren vor dem Export
+
+import os
+import logging
+import numpy as np
+import cv2
+from utils.background_model import BackgroundModel
+from utils.reference_remover import ReferenceRemover
+from utils.transparent_writer import TransparentWriter
+
+class ObjectCropper:
+    """Bestimmt einen gemeinsamen Bildausschnitt um das Objekt über alle Winkel
+
+    Grundlage sind die Masken der Hintergrundentfernung (Alphakanal der
+    transparenten Bilder) oder, falls diese fehlen, Differenzmasken gegen das
+    Hintergrundmodell bzw. ein Referenzbild. Alle Frames erhalten denselben
+    Ausschnitt (Vereinigung der Objektrahmen plus Rand); optional wird jeder
+    Ausschnitt auf den Schwerpunkt der Objektmaske des Frames verschoben.
+    """
+
+    def __init__(self, padding=0.05, recenter=False, recenter_vertical=False, min_area=0.0005, mask_scale=4):
+        """Initialisiert den Zuschnitt
+
+        padding: Rand um das Objekt relativ zur größeren Seite des Ausschnitts
+        recenter: Frames horizontal am Schwerpunkt der Maske ausrichten
+        recenter_vertical: zusätzlich vertikal ausrichten
+        min_area: Mindestfläche einer Maskenregion relativ zum Bild (kleinere gelten als Rauschen)
+        mask_scale: Verkleinerung für die Differenzmasken (1, 2, 4, 8)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.padding = padding
+        self.recenter = recenter
+        self.recenter_vertical = recenter_vertical
+        self.min_area = min_area
+        self.mask_scale = mask_scale
+
+    def measure_mask(self, mask, scale=1, offset=(0, 0)):
+        """Gibt Objektrahmen (x0, y0, x1, y1) und Schwerpunkt (cx, cy) einer Maske in voller Auflösung zurück
+
+        offset: Lage einer beschnittenen Maske im Vollbild
+        """
+        count, _, stats, centroids = cv2.connectedComponentsWithStats((mask > 127).view(np.uint8), connectivity=8)
+        min_pixels = self.min_area * mask.shape[0] * mask.shape[1]
+
+        # Hintergrund (Label 0) und kleine Störregionen ignorieren
+        regions = [label for label in range(1, count) if stats[label, cv2.CC_STAT_AREA] >= min_pixels]
+        if not regions:
+            return None
+
+        x0 = min(stats[label, cv2.CC_STAT_LEFT] for label in regions)
+        y0 = min(stats[label, cv2.CC_STAT_TOP] for label in regions)
+        x1 = max(stats[label, cv2.CC_STAT_LEFT] + stats[label, cv2.CC_STAT_WIDTH] for label in regions)
+        y1 = max(stats[label, cv2.CC_STAT_TOP] + stats[label, cv2.CC_STAT_HEIGHT] for label in regions)
+
+        areas = stats[regions, cv2.CC_STAT_AREA].astype(np.float64)
+        cx, cy = (centroids[regions] * areas[:, None]).sum(axis=0) / areas.sum()
+
+        ox, oy = offset
+        return ((x0 * scale + ox, y0 * scale + oy, x1 * scale + ox, y1 * scale + oy),
+                (cx * scale + ox, cy * scale + oy))
+
+    def _iter_masks(self, session, session_dir, reference=None):
+        """Liefert (Winkel, Maske, Skalierung, Bildgröße, Versatz) aus der besten verfügbaren Quelle"""
+        transparent_dir = os.path.join(session_dir, "transparent")
+        names = {angle: f"angle_{int(angle):03d}" for angle in session.photos}
+        metadata = TransparentWriter.load_metadata(transparent_dir)
+
+        if all(name in metadata or os.path.exists(os.path.join(transparent_dir, name + '.png')) for name in names.values()):
+            for angle in sorted(names):
+                result = TransparentWriter.read(transparent_dir, names[angle], metadata)
+                if result is None:
+                    yield angle, None, 1, None, (0, 0)
+                    continue
+                _, alpha, offset, full_size = result
+                yield angle, alpha, 1, full_size, offset
+            return
+
+        # Differenzmasken auf verkleinerten Bildern
+        remover = ReferenceRemover(tile_rows=None)
+        model = BackgroundModel.load(session_dir) if reference is None else None
+        if model is not None:
+            remover.set_model(model)
+        elif reference is None or not remover.set_reference(reference):
+            raise ValueError("Keine Masken verfügbar (weder transparente Bilder noch Hintergrundmodell oder Referenzbild)")
+
+        for angle, path, frame in session.iter_frames(scale=self.mask_scale, session_dir=session_dir):
+            if frame is None:
+                yield angle, None, 1, None, (0, 0)
+                continue
+            size = self._full_size(path, frame)
+            yield angle, remover.compute_mask(frame), size[0] / frame.shape[1], size, (0, 0)
+
+    @staticmethod
+    def _full_size(path, frame):
+        """Bildgröße in voller Auflösung (ohne das Bild vollständig zu dekodieren)"""
+        try:
+            from PIL import Image
+            with Image.open(path) as image:
+                return image.size
+        except Exception:
+            return frame.shape[1], frame.shape[0]
+
+    def measure(self, session, session_dir, reference=None):
+        """Misst Objektrahmen und Schwerpunkte aller Frames
+
+        Gibt {'size': (Breite, Höhe), 'frames': {Winkel: (Rahmen, Schwerpunkt)}} zurück
+        oder None, wenn in keinem Frame ein Objekt gefunden wurde.
+        """
+        frames = {}
+        size = None
+        for angle, mask, scale, image_size, offset in self._iter_masks(session, session_dir, reference):
+            if mask is None:
+                continue
+            size = size or image_size
+            measured = self.measure_mask(mask, scale, offset)
+            if measured is None:
+                self.logger.warning(f"Kein Objekt in der Maske für Winkel {angle} gefunden")
+                continue
+            frames[angle] = measured
+
+        if not frames:
+            return None
+        return {'size': tuple(int(value) for value in size), 'frames': frames}
+
+    def compute_windows(self, layout):
+        """Berechnet für jeden Winkel einen gleich großen Ausschnitt (x, y, Breite, Höhe)"""
+        image_width, image_height = layout['size']
+        frames = layout['frames']
+        centers = {angle: center for angle, (_, center) in frames.items()}
+        mean_center = np.mean(list(centers.values()), axis=0)
+
+        # Objektrahmen relativ zum Ausrichtungspunkt (Schwerpunkt oder Bildursprung) vereinigen
+        def anchor(angle):
+            cx, cy = centers.get(angle, mean_center)
+            return (cx if self.recenter else 0.0, cy if self.recenter_vertical else 0.0)
+
+        relative = []
+        for angle, (box, _) in frames.items():
+            ax, ay = anchor(angle)
+            relative.append((box[0] - ax, box[1] - ay, box[2] - ax, box[3] - ay))
+        relative = np.array(relative)
+        x0, y0 = relative[:, 0].min(), relative[:, 1].min()
+        x1, y1 = relative[:, 2].max(), relative[:, 3].max()
+
+        pad = self.padding * max(x1 - x0, y1 - y0)
+        x0, y0, x1, y1 = x0 - pad, y0 - pad, x1 + pad, y1 + pad
+        width = min(int(np.ceil(x1 - x0)), image_width) if not self.recenter else int(np.ceil(x1 - x0))
+        height = min(int(np.ceil(y1 - y0)), image_height) if not self.recenter_vertical else int(np.ceil(y1 - y0))
+
+        windows = {}
+        for angle in frames:
+            ax, ay = anchor(angle)
+            x = int(round(ax + x0))
+            y = int(round(ay + y0))
+            # Ohne Ausrichtung bleibt der Ausschnitt innerhalb des Bildes
+            if not self.recenter:
+                x = min(max(0, x), image_width - width)
+            if not self.recenter_vertical:
+                y = min(max(0, y), image_height - height)
+            windows[angle] = (x, y, width, height)
+
+        # Frames ohne erkanntes Objekt verwenden den mittleren Ausschnitt
+        default = tuple(int(round(value)) for value in np.mean(list(windows.values()), axis=0))
+        return windows, default
+
+    @staticmethod
+    def crop(frame, window):
+        """Schneidet einen Ausschnitt aus; Bereiche außerhalb des Bildes werden aufgefüllt"""
+        x, y, width, height = window
+        frame_height, frame_width = frame.shape[:2]
+
+        left, top = max(0, -x), max(0, -y)
+        right, bottom = max(0, x + width - frame_width), max(0, y + height - frame_height)
+        region = frame[max(0, y):min(frame_height, y + height), max(0, x):min(frame_width, x + width)]
+        if not (left or top or right or bottom):
+            return region
+
+        # Transparente Bilder leer auffüllen, Fotos mit dem Randpixel fortsetzen
+        if frame.ndim == 3 and frame.shape[2] == 4:
+            return cv2.copyMakeBorder(region, top, bottom, left, right, cv2.BORDER_CONSTANT, value=0)
+        return cv2.copyMakeBorder(region, top, bottom, left, right, cv2.BORDER_REPLICATE)
@@ -0,0 +1,155 @@
+# Datei: utils/preview_stream.py
+# Modul für die Live-Vorschau (MJPEG-Stream) über den gemeinsamen Kamera-Controller
+
+import time
+import logging
+import threading
+import cv2
+from utils.mjpeg import is_raw_jpeg, decode_frame
+
+class PreviewStream:
+    """Klasse für einen Vorschau-Stream, der von einem Aufnahme-Thread an mehrere Betrachter verteilt wird"""
+
+    BOUNDARY = 'frame'
+
+    def __init__(self, camera_controller, width=640, fps=10, quality=70):
+        """Initialisiert den Vorschau-Stream"""
+        self.logger = logging.getLogger(__name__)
+        self.camera = camera_controller
+        self.width = width
+        self.fps = fps
+        self.quality = quality
+
+        self.viewers = 0
+        self.paused = False  # True, solange eine Aufnahme die Kamera belegt
+        self._frame = None  # Zuletzt kodiertes Vorschaubild (JPEG-Bytes)
+        self._frame_id = 0
+        self._shared_frame = None  # Frame aus einer laufenden Aufnahme
+        self._condition = threading.Condition()
+        self._thread = None
+
+        # Frames aus Aufnahmen mitbenutzen, statt die Kamera parallel zu lesen
+        self.camera.frame_listeners.append(self._on_capture_frame)
+
+    def close(self):
+        """Meldet den Stream vom Kamera-Controller ab (z.B. wenn die Station zurückgesetzt wird)"""
+        try:
+            self.camera.frame_listeners.remove(self._on_capture_frame)
+        except ValueError:
+            pass
+
+    def configure(self, width=None, fps=None):
+        """Passt Vorschauauflösung und Bildrate an (gilt für alle Betrachter)"""
+        if width:
+            self.width = max(160, min(int(width), 1920))
+        if fps:
+            self.fps = max(1, min(int(fps), 30))
+
+    def _on_capture_frame(self, frame):
+        """Wird vom Kamera-Controller für jeden während einer Aufnahme gelesenen Frame aufgerufen"""
+        if self.viewers:
+            self._shared_frame = frame
+
+    def _encode_preview(self, frame):
+        """Verkleinert einen Frame auf Vorschaugröße und kodiert ihn als JPEG"""
+        if is_raw_jpeg(frame):
+            # Bei MJPEG direkt verkleinert dekodieren (DCT-Skalierung)
+            full_width = self.camera.capture_format['width'] if self.camera.capture_format else self.camera.resolution[0]
+            ratio = full_width / float(self.width)
+            if ratio >= 8:
+                flags = cv2.IMREAD_REDUCED_COLOR_8
+            elif ratio >= 4:
+                flags = cv2.IMREAD_REDUCED_COLOR_4
+            elif ratio >= 2:
+                flags = cv2.IMREAD_REDUCED_COLOR_2
+            else:
+                flags = cv2.IMREAD_COLOR
+            frame = decode_frame(frame, flags)
+            if frame is None:
+                return None
+
+        height, width = frame.shape[:2]
+        if width > self.width:
+            new_height = int(height * self.width / float(width))
+            frame = cv2.resize(frame, (self.width, new_height), interpolation=cv2.INTER_AREA)
+
+        success, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        return buffer.tobytes() if success else None
+
+    def _read_frame(self):
+        """Liest einen Frame, ohne eine laufende Aufnahme zu blockieren"""
+        shared = self._shared_frame
+        if shared is not None:
+            self._shared_frame = None
+            return shared
+
+        # Belegt eine Aufnahme die Kamera, pausiert die Vorschau
+        if not self.camera.lock.acquire(blocking=False):
+            self.paused = True
+            return None
+
+        try:
+            self.paused = False
+            ret, frame = self.camera.read_frame()
+            return frame if ret else None
+        finally:
+            self.camera.lock.release()
+
+    def _run(self):
+        """Aufnahme-Thread: liest Frames, solange Betrachter verbunden sind"""
+        self.logger.info("Vorschau-Stream gestartet")
+
+        while True:
+            # Ende unter der Sperre entscheiden, damit ein neuer Betrachter einen neuen Thread startet
+            with self._condition:
+                if self.viewers <= 0:
+                    self._thread = None
+                    break
+            start = time.monotonic()
+
+            try:
+                frame = self._read_frame()
+                if frame is not None:
+                    jpeg = self._encode_preview(frame)
+                    if jpeg:
+                        with self._condition:
+                            self._frame = jpeg
+                            self._frame_id += 1
+                            self._condition.notify_all()
+            except Exception as e:
+                self.logger.error(f"Fehler im Vorschau-Stream: {str(e)}")
+
+            elapsed = time.monotonic() - start
+            time.sleep(max(0.0, 1.0 / self.fps - elapsed))
+
+        self.logger.info("Vorschau-Stream beendet (keine Betrachter)")
+
+    def _ensure_running(self):
+        """Startet den Aufnahme-Thread, falls er nicht läuft (Aufrufer hält self._condition)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='PreviewStream', daemon=True)
+            self._thread.start()
+
+    def frames(self):
+        """Generator für einen Betrachter: liefert multipart/x-mixed-replace-Teile"""
+        with self._condition:
+            self.viewers += 1
+            self._ensure_running()
+
+        last_id = 0
+        try:
+            while True:
+                with self._condition:
+                    # Warten auf ein neues Bild (Timeout hält die Verbindung bei Pausen offen)
+                    self._condition.wait_for(lambda: self._frame_id != last_id, timeout=5.0)
+                    if self._frame_id == last_id or self._frame is None:
+                        continue
+                    last_id = self._frame_id
+                    jpeg = self._frame
+
+                yield (f"--{self.BOUNDARY}\r\n"
+                       f"Content-Type: image/jpeg\r\n"
+                       f"Content-Length: {len(jpeg)}\r\n\r\n").encode() + jpeg + b"\r\n"
+        finally:
+            with self._condition:
+                self.viewers -= 1
@@ -0,0 +1,200 @@
+# Datei: utils/reference_remover.py
+# Modul zur speichersparenden Hintergrundentfernung mit einem Referenzbild (leerer Teller)
+
+import os
+import logging
+import numpy as np
+import cv2
+
+class ReferenceRemover:
+    """Klasse zur Hintergrundentfernung per Differenz zum Referenzbild mit wiederverwendeten Puffern
+
+    Die Maske entsteht aus der maximalen Kanal-Differenz (statt Graustufen), der
+    Schwellenwert wird auf Wunsch aus dem Rauschen des Referenzbildes bestimmt.
+    Große Bilder werden in Streifen mit Überlappung (Halo) verarbeitet, so dass
+    nur streifengroße Zwischenpuffer benötigt werden. Mit einem BackgroundModel
+    aus mehreren Referenzbildern gilt ein eigener Schwellenwert je Pixel.
+    """
+
+    def __init__(self, threshold=None, noise_factor=4.0, min_threshold=12, max_threshold=60,
+                 open_size=5, close_size=10, dilate_size=5, dilate_iterations=2, tile_rows=1024):
+        """Initialisiert den ReferenceRemover
+
+        threshold: fester Schwellenwert (0-255) oder None für adaptiv aus dem Referenzrauschen
+        tile_rows: Zeilen pro Streifen (None oder 0 = ganzes Bild auf einmal)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.fixed_threshold = threshold
+        self.noise_factor = noise_factor
+        self.min_threshold = min_threshold
+        self.max_threshold = max_threshold
+        self.dilate_iterations = dilate_iterations
+        self.tile_rows = tile_rows
+
+        # Strukturelemente einmalig erzeugen
+        self.open_kernel = np.ones((open_size, open_size), np.uint8)
+        self.close_kernel = np.ones((close_size, close_size), np.uint8)
+        self.dilate_kernel = np.ones((dilate_size, dilate_size), np.uint8)
+        # Reichweite aller Morphologie-Schritte, so viele Zeilen überlappen die Streifen
+        self.halo = open_size + close_size + dilate_size * dilate_iterations
+
+        self.reference = None
+        self.reference_key = None
+        self.threshold = threshold if threshold is not None else min_threshold
+        self.noise_sigma = None
+        self.threshold_map = None  # pixelweise Schwellenwerte (uint8) aus einem BackgroundModel
+        self._buffers = {}
+
+    def _buffer(self, name, shape):
+        """Gibt einen wiederverwendbaren Puffer der gewünschten Form zurück
+
+        Puffer wachsen nur in der Zeilenzahl; kleinere Anforderungen (z.B. der
+        letzte Streifen) erhalten eine Sicht auf den vorhandenen Speicher.
+        """
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape[1:] != shape[1:] or buffer.shape[0] < shape[0]:
+            buffer = np.empty(shape, dtype=np.uint8)
+            self._buffers[name] = buffer
+        return buffer[:shape[0]]
+
+    def memory_bytes(self):
+        """Speicherbedarf von Referenz, Schwellenwertkarte und Puffern in Bytes"""
+        arrays = [self.reference, self.threshold_map] + list(self._buffers.values())
+        return sum(array.nbytes for array in arrays if array is not None)
+
+    @staticmethod
+    def estimate_noise(reference, sample_rows=256):
+        """Schätzt das Sensorrauschen (Standardabweichung) des Referenzbildes
+
+        Robust per Median der absoluten Abweichung der Nachbarpixel-Differenzen,
+        so dass Kanten im Bild die Schätzung kaum beeinflussen. Ausgewertet wird
+        nur eine Stichprobe von Zeilen, um keine bildgroßen Kopien anzulegen.
+        """
+        sample = reference[::max(1, reference.shape[0] // sample_rows)]
+        diff = sample[:, 1:].astype(np.int16) - sample[:, :-1]
+        deviation = np.abs(diff - np.median(diff))
+        # MAD -> Standardabweichung, Differenz zweier Pixel hat die sqrt(2)-fache Streuung
+        return float(1.4826 * np.median(deviation) / np.sqrt(2.0))
+
+    def set_reference(self, reference, key=None):
+        """Setzt das Referenzbild (Array oder Pfad) und lernt den Schwellenwert"""
+        if isinstance(reference, str):
+            key = key or (reference, os.path.getmtime(reference))
+            if key == self.reference_key:
+                return True
+            reference = cv2.imread(reference)
+            if reference is None:
+                self.logger.error(f"Konnte Referenzbild nicht laden: {key[0]}")
+                return False
+
+        self.reference = reference
+        self.reference_key = key
+        self.threshold_map = None
+
+        if self.fixed_threshold is None:
+            # Differenz zweier verrauschter Bilder streut mit sqrt(2) * Sigma
+            self.noise_sigma = self.estimate_noise(reference)
+            threshold = self.noise_factor * self.noise_sigma * np.sqrt(2.0)
+            self.threshold = int(np.clip(round(threshold), self.min_threshold, self.max_threshold))
+            self.logger.info(f"Referenzrauschen {self.noise_sigma:.2f}, Schwellenwert {self.threshold}")
+        return True
+
+    def set_model(self, model):
+        """Setzt ein BackgroundModel (Mittelwertbild und pixelweise Schwellenwerte) als Referenz"""
+        key = ('model', model.key)
+        if key == self.reference_key and self.threshold_map is not None:
+            return True
+
+        self.reference = model.mean
+        self.reference_key = key
+        self.threshold_map = model.threshold
+        self.noise_sigma = None
+        self.logger.info(f"Hintergrundmodell aus {model.frame_count} Referenzbildern gesetzt")
+        return True
+
+    def _reference_for(self, shape):
+        """Gibt das Referenzbild in der Größe des Bildes zurück (einmalig skaliert)"""
+        if self.reference.shape != shape:
+            self.logger.info(f"Skaliere Referenzbild auf {shape[1]}x{shape[0]}")
+            self.reference = cv2.resize(self.reference, (shape[1], shape[0]), interpolation=cv2.INTER_AREA)
+            if self.threshold_map is not None:
+                self.threshold_map = cv2.resize(self.threshold_map, (shape[1], shape[0]), interpolation=cv2.INTER_AREA)
+        return self.reference
+
+    def _mask_region(self, image, reference, out, thresholds=None):
+        """Berechnet die Maske eines Bildausschnitts in den Ausgabepuffer"""
+        height, width = image.shape[:2]
+        diff = self._buffer('diff', (height, width, 3))
+        mask = self._buffer('mask', (height, width))
+        temp = self._buffer('temp', (height, width))
+
+        # Maximale Differenz über die Farbkanäle (erkennt auch reine Farbunterschiede)
+        # (paarweises np.maximum auf den Kanal-Sichten, np.max über die Kanalachse ist deutlich langsamer)
+        cv2.absdiff(image, reference, dst=diff)
+        np.maximum(diff[:, :, 0], diff[:, :, 1], out=mask)
+        np.maximum(mask, diff[:, :, 2], out=mask)
+        if thresholds is None:
+            cv2.threshold(mask, self.threshold, 255, cv2.THRESH_BINARY, dst=mask)
+        else:
+            # Pixelweiser Vergleich mit den Schwellenwerten des Hintergrundmodells
+            cv2.compare(mask, thresholds, cv2.CMP_GT, dst=mask)
+
+        # Rauschen entfernen, Löcher schließen, Maske erweitern
+        cv2.morphologyEx(mask, cv2.MORPH_OPEN, self.open_kernel, dst=temp)
+        cv2.morphologyEx(temp, cv2.MORPH_CLOSE, self.close_kernel, dst=mask)
+        cv2.dilate(mask, self.dilate_kernel, dst=out, iterations=self.dilate_iterations)
+
+    def compute_mask(self, image, out=None):
+        """Berechnet die Vordergrundmaske (uint8, 0/255) für ein BGR-Bild"""
+        if self.reference is None:
+            raise ValueError("Kein Referenzbild gesetzt")
+
+        height, width = image.shape[:2]
+        reference = self._reference_for(image.shape)
+        thresholds = self.threshold_map
+        if out is None:
+            out = self._buffer('result', (height, width))
+
+        tile_rows = self.tile_rows or height
+        if tile_rows >= height:
+            self._mask_region(image, reference, out, thresholds)
+            return out
+
+        # Streifenweise mit Halo verarbeiten, nur der innere Teil wird übernommen
+        for top in range(0, height, tile_rows):
+            bottom = min(height, top + tile_rows)
+            ext_top = max(0, top - self.halo)
+            ext_bottom = min(height, bottom + self.halo)
+
+            strip = self._buffer('strip', (ext_bottom - ext_top, width))
+            self._mask_region(image[ext_top:ext_bottom], reference[ext_top:ext_bottom], strip,
+                              thresholds[ext_top:ext_bottom] if thresholds is not None else None)
+            out[top:bottom] = strip[top - ext_top:bottom - ext_top]
+
+        return out
+
+    def apply(self, image, output_path, writer=None):
+        """Entfernt den Hintergrund eines BGR-Bildes und speichert es als BGRA (PNG)
+
+        writer: optionaler TransparentWriter für kompakte Formate (WebP, JPEG + Maske, beschnitten)
+        """
+        mask = self.compute_mask(image)
+        if writer is not None:
+            return writer.write(image, mask, output_path) is not None
+
+        bgra = self._buffer('bgra', image.shape[:2] + (4,))
+        cv2.cvtColor(image, cv2.COLOR_BGR2BGRA, dst=bgra)
+        bgra[:, :, 3] = mask
+
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        return bool(cv2.imwrite(output_path, bgra))
+
+    def remove(self, image_path, output_path, writer=None):
+        """Lädt ein Bild, entfernt den Hintergrund und speichert das Ergebnis"""
+        image = cv2.imread(image_path)
+        if image is None:
+            self.logger.error(f"Konnte Bild nicht laden: {image_path}")
+            return False
+        return self.apply(image, output_path, writer)
@@ -0,0 +1,92 @@
+# Datei: utils/session_reader.py
+# Modul zum gestreamten Lesen der Bilder einer Session mit Vorausladen im Hintergrund
+
+import os
+import queue
+import logging
+import threading
+from utils.frame_store import FrameStore
+
+class SessionReader:
+    """Liefert die Bilder einer Session nach Winkel sortiert als (Winkel, Pfad, Frame)
+
+    Ein Hintergrund-Thread dekodiert die nächsten Bilder, während der Aufrufer
+    das aktuelle verarbeitet. Die Warteschlange ist begrenzt, so dass höchstens
+    prefetch + 2 Bilder gleichzeitig im Speicher liegen. Ist ein passender
+    FrameStore vorhanden, werden die Frames ohne Dekodierung daraus gelesen.
+    Nicht lesbare Bilder werden mit Frame None geliefert.
+    """
+
+    _END = object()
+
+    def __init__(self, session, scale=1, prefetch=4, session_dir=None):
+        """Initialisiert den Reader
+
+        scale: Verkleinerungsfaktor beim Dekodieren (1, 2, 4, 8)
+        prefetch: Anzahl der im Voraus dekodierten Bilder
+        session_dir: Session-Verzeichnis, um einen vorhandenen FrameStore zu nutzen
+        """
+        self.logger = logging.getLogger(__name__)
+        self.session = session
+        self.scale = scale
+        self.prefetch = max(1, prefetch)
+        self.session_dir = session_dir
+
+    def __iter__(self):
+        """Startet das Vorausladen und liefert die Bilder"""
+        items = [(angle, self.session.photos[angle]) for angle in sorted(self.session.photos)]
+
+        store = None
+        if self.session_dir:
+            store = FrameStore.open_for_session(self.session, self.session_dir, self.scale)
+
+        frames = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+        worker = threading.Thread(target=self._load, args=(items, store, frames, stop),
+                                  name='SessionReader', daemon=True)
+        worker.start()
+
+        try:
+            while True:
+                item = frames.get()
+                if item is self._END:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Bei vorzeitigem Abbruch den Thread beenden und die Warteschlange leeren
+            stop.set()
+            while worker.is_alive():
+                try:
+                    frames.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            worker.join()
+
+    def _put(self, frames, stop, item):
+        """Legt ein Element in die Warteschlange, bricht bei gesetztem Stopp ab"""
+        while not stop.is_set():
+            try:
+                frames.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _load(self, items, store, frames, stop):
+        """Hintergrund-Thread: dekodiert die Bilder der Reihe nach"""
+        try:
+            for angle, path in items:
+                frame = store.get_frame(angle) if store else None
+                if frame is None and path and os.path.exists(path):
+                    frame = FrameStore.read_frame(path, self.scale)
+                if frame is None:
+                    self.logger.warning(f"Bild konnte nicht geladen werden: {path}")
+                if not self._put(frames, stop, (angle, path, frame)):
+                    return
+        except Exception as e:
+            self.logger.error(f"Fehler beim Lesen der Session-Bilder: {str(e)}")
+            self._put(frames, stop, e)
+            return
+        self._put(frames, stop, self._END)
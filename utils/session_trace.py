@@ -0,0 +1,292 @@
+# Datei: utils/session_trace.py
+# Modul zum Aufzeichnen und Auswerten des Zeitverlaufs einer Fotosession (Spans als JSON Lines)
+#
+# Auswertung (aus dem Projektverzeichnis):
+#   python -m utils.session_trace projects/<projekt>/sessions/<session>
+#   python -m utils.session_trace <session-verzeichnis> --top 10 --chrome trace.json
+
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+import threading
+from contextlib import contextmanager
+
+TRACE_FILE = 'trace.jsonl'
+
+
+class SessionTrace:
+    """Schreibt Spans (Bewegen, Ruhe, Aufnahme, Schreiben, Checkpoint) einer Session
+
+    Jede Zeile der Datei ist ein JSON-Objekt: ein Kopf pro Lauf ("event": "start"),
+    je ein Span mit monotonen Zeitstempeln in Sekunden ("span") und ein Abschluss
+    ("event": "end"). Fortsetzungen einer Session hängen einen weiteren Lauf an.
+    Zeilen werden sofort geschrieben, so dass auch abgebrochene Sessions auswertbar sind.
+    Spans übernehmen die Felder umschließender Spans (bzw. von tagged) desselben Threads,
+    z.B. den Winkel für das Schreiben innerhalb einer Aufnahme.
+    """
+
+    def __init__(self, session_dir, session_id=None, kind='capture'):
+        """Öffnet die Trace-Datei im Session-Verzeichnis und schreibt den Kopf des Laufs"""
+        self.logger = logging.getLogger(__name__)
+        self.path = os.path.join(session_dir, TRACE_FILE)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._file = open(self.path, 'a', buffering=1)
+        self._write({'event': 'start', 'session': session_id, 'kind': kind,
+                     'time': time.time(), 'monotonic': time.monotonic(),
+                     'thread': threading.current_thread().name})
+
+    def _write(self, record):
+        """Schreibt einen Eintrag als Zeile"""
+        with self._lock:
+            if self._file is not None:
+                self._file.write(json.dumps(record) + '\n')
+
+    def _finish(self, record, start, end, depth):
+        """Ergänzt Zeitstempel, Tiefe und Thread und schreibt den Span"""
+        record.setdefault('ok', True)
+        record.update(start=round(start, 6), end=round(end, 6), duration=round(end - start, 6),
+                      depth=depth, thread=threading.current_thread().name)
+        self._write(record)
+
+    @contextmanager
+    def tagged(self, **fields):
+        """Gibt allen Spans des Threads innerhalb des Blocks zusätzliche Felder (z.B. angle)"""
+        inherited = getattr(self._local, 'fields', {})
+        self._local.fields = {**inherited, **fields}
+        try:
+            yield
+        finally:
+            self._local.fields = inherited
+
+    @contextmanager
+    def span(self, name, **fields):
+        """Misst einen Abschnitt; über das gelieferte Dict lassen sich Felder ergänzen (z.B. ok)
+
+        Verschachtelte Spans desselben Threads erhalten eine höhere Tiefe.
+        """
+        depth = getattr(self._local, 'depth', 0)
+        record = {'span': name, **getattr(self._local, 'fields', {}), **fields}
+        self._local.depth = depth + 1
+        start = time.monotonic()
+        try:
+            with self.tagged(**fields):
+                yield record
+        except Exception:
+            record['ok'] = False
+            raise
+        finally:
+            self._local.depth = depth
+            self._finish(record, start, time.monotonic(), depth)
+
+    def add_span(self, name, start, end, depth=0, **fields):
+        """Schreibt einen bereits gemessenen Span (monotone Zeitstempel, z.B. aus einer Schleife)"""
+        self._finish({'span': name, **getattr(self._local, 'fields', {}), **fields}, start, end, depth)
+
+    def close(self, success=None):
+        """Schreibt den Abschluss des Laufs und schließt die Datei"""
+        self._write({'event': 'end', 'success': success, 'monotonic': time.monotonic()})
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def load_runs(path):
+    """Liest eine Trace-Datei (oder ein Session-Verzeichnis) als Liste von Läufen
+
+    Jeder Lauf ist ein Dict mit 'header', 'spans' und 'end' (None bei Abbruch).
+    """
+    if os.path.isdir(path):
+        path = os.path.join(path, TRACE_FILE)
+
+    runs = []
+    with open(path, 'r') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # Unvollständige letzte Zeile nach einem Absturz
+            if record.get('event') == 'start':
+                runs.append({'header': record, 'spans': [], 'end': None})
+            elif not runs:
+                continue
+            elif record.get('event') == 'end':
+                runs[-1]['end'] = record
+            elif 'span' in record:
+                runs[-1]['spans'].append(record)
+    return runs
+
+
+def _percentile(values, fraction):
+    """Perzentil einer sortierten Liste (nächster Rang)"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+def summarize_run(run, top=5, outlier_factor=3.0):
+    """Wertet einen Lauf aus
+
+    Der kritische Pfad ist die Summe der Spans oberster Ebene im Thread der Session
+    (sie laufen nacheinander; Hintergrundschreiber laufen parallel dazu); der Rest der
+    Laufzeit ist Verwaltungsaufwand. Die Zeit eines Frames umfasst alle Spans oberster
+    Ebene zu seinem Winkel (Bewegung, Ruhe, Aufnahme, Schreiben, Checkpoint).
+    """
+    spans = run['spans']
+    header = run['header']
+    start = header['monotonic']
+    end = run['end']['monotonic'] if run['end'] else max((span['end'] for span in spans), default=start)
+    top_level = [span for span in spans if span.get('depth', 0) == 0]
+    # Ältere Traces ohne Thread im Kopf: alle Spans oberster Ebene
+    main_thread = header.get('thread')
+    critical = sum(span['duration'] for span in top_level
+                   if main_thread is None or span.get('thread') == main_thread)
+
+    stages = {}
+    for span in spans:
+        stages.setdefault(span['span'], []).append(span['duration'])
+    breakdown = []
+    for name, durations in stages.items():
+        durations.sort()
+        breakdown.append({
+            'name': name,
+            'count': len(durations),
+            'total': sum(durations),
+            'mean': sum(durations) / len(durations),
+            'p95': _percentile(durations, 0.95),
+            'max': durations[-1],
+            'median': _percentile(durations, 0.5)
+        })
+    breakdown.sort(key=lambda stage: stage['total'], reverse=True)
+
+    frames = {}
+    for span in top_level:
+        if 'angle' in span:
+            frame = frames.setdefault(span['angle'], {'angle': span['angle'], 'total': 0.0, 'spans': {}})
+            frame['total'] += span['duration']
+            frame['spans'][span['span']] = frame['spans'].get(span['span'], 0.0) + span['duration']
+    slowest = sorted(frames.values(), key=lambda frame: frame['total'], reverse=True)[:top]
+
+    # Spans, die deutlich länger als der Median ihrer Art dauern (z.B. hängender USB-Hub)
+    medians = {stage['name']: stage['median'] for stage in breakdown}
+    outliers = [span for span in spans
+                if medians[span['span']] > 0 and span['duration'] > outlier_factor * medians[span['span']]]
+    outliers.sort(key=lambda span: span['duration'], reverse=True)
+
+    return {
+        'session': header.get('session'),
+        'kind': header.get('kind'),
+        'started': header.get('time'),
+        'success': run['end']['success'] if run['end'] else None,
+        'wall_time': end - start,
+        'critical_path': critical,
+        'overhead': max(0.0, end - start - critical),
+        'frames': len(frames),
+        'failures': sum(1 for span in spans if not span.get('ok', True)),
+        'stages': breakdown,
+        'slowest_frames': slowest,
+        'outliers': outliers[:top]
+    }
+
+
+def to_chrome_trace(runs):
+    """Wandelt die Läufe in das Chrome-Trace-Format (chrome://tracing, Perfetto) um"""
+    events = []
+    threads = {}
+    for index, run in enumerate(runs, 1):
+        origin = run['header']['monotonic']
+        events.append({'name': 'process_name', 'ph': 'M', 'pid': index,
+                       'args': {'name': f"{run['header'].get('kind')} {run['header'].get('session')}"}})
+        for span in run['spans']:
+            tid = threads.setdefault(span.get('thread'), len(threads) + 1)
+            args = {key: value for key, value in span.items()
+                    if key not in ('span', 'start', 'end', 'duration', 'depth', 'thread')}
+            events.append({
+                'name': span['span'] if 'angle' not in span else f"{span['span']} {span['angle']}°",
+                'cat': span['span'],
+                'ph': 'X',
+                'ts': round((span['start'] - origin) * 1e6, 1),
+                'dur': round(span['duration'] * 1e6, 1),
+                'pid': index,
+                'tid': tid,
+                'args': args
+            })
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def print_summary(summary):
+    """Gibt die Auswertung eines Laufs aus"""
+    status = {True: 'erfolgreich', False: 'fehlgeschlagen', None: 'abgebrochen'}[summary['success']]
+    started = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(summary['started'])) if summary['started'] else '?'
+    wall = summary['wall_time']
+    print(f"Lauf {summary['kind']} vom {started} ({status}), {summary['frames']} Frames, "
+          f"{summary['failures']} Fehler")
+    print(f"  Laufzeit {wall:.2f} s, kritischer Pfad {summary['critical_path']:.2f} s, "
+          f"Verwaltung {summary['overhead']:.2f} s")
+
+    print(f"\n  {'Abschnitt':<12} {'Anzahl':>7} {'Summe':>9} {'Anteil':>7} {'Mittel':>9} {'p95':>9} {'Max':>9}")
+    for stage in summary['stages']:
+        share = stage['total'] / wall * 100 if wall else 0.0
+        print(f"  {stage['name']:<12} {stage['count']:>7} {stage['total']:>8.2f}s {share:>6.1f}% "
+              f"{stage['mean'] * 1000:>7.1f}ms {stage['p95'] * 1000:>7.1f}ms {stage['max'] * 1000:>7.1f}ms")
+
+    if summary['slowest_frames']:
+        print("\n  Langsamste Frames:")
+        for frame in summary['slowest_frames']:
+            parts = ', '.join(f"{name} {duration * 1000:.0f} ms" for name, duration in frame['spans'].items())
+            print(f"    {frame['angle']:>5}° {frame['total'] * 1000:>8.0f} ms  ({parts})")
+
+    if summary['outliers']:
+        print("\n  Ausreißer (mehr als das Dreifache des Medians):")
+        for span in summary['outliers']:
+            angle = f" bei {span['angle']}°" if 'angle' in span else ''
+            print(f"    {span['span']}{angle}: {span['duration'] * 1000:.0f} ms")
+
+
+def parse_args(argv=None):
+    """Liest die Kommandozeilenargumente"""
+    parser = argparse.ArgumentParser(description='Zeitverlauf einer Fotosession auswerten')
+    parser.add_argument('path', help='Session-Verzeichnis oder trace.jsonl')
+    parser.add_argument('--top', type=int, default=5, help='Anzahl der langsamsten Frames und Ausreißer')
+    parser.add_argument('--run', type=int, help='Nur diesen Lauf auswerten (1 = erster, -1 = letzter)')
+    parser.add_argument('--chrome', help='Zusätzlich als Chrome-Trace (JSON) speichern')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Gibt die Auswertung aller Läufe einer Session aus"""
+    args = parse_args(argv)
+    try:
+        runs = load_runs(args.path)
+    except OSError as e:
+        print(f"Trace konnte nicht gelesen werden: {e}")
+        return 2
+    if not runs:
+        print("Keine Läufe im Trace gefunden")
+        return 1
+
+    selected = runs
+    if args.run is not None:
+        index = args.run - 1 if args.run > 0 else args.run
+        selected = runs[index:index + 1 or None]
+        if args.run == 0 or not selected:
+            print(f"Lauf {args.run} nicht vorhanden (1 bis {len(runs)} oder -1 bis -{len(runs)})")
+            return 1
+    for number, run in enumerate(selected):
+        if number:
+            print()
+        print_summary(summarize_run(run, args.top))
+
+    if args.chrome:
+        with open(args.chrome, 'w') as f:
+            json.dump(to_chrome_trace(selected), f)
+        print(f"\nChrome-Trace gespeichert: {args.chrome} (in chrome://tracing oder ui.perfetto.dev öffnen)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+# Datei: utils/settle_detector.py
+# Modul zur Erkennung, wann der Drehteller nach einer Bewegung zur Ruhe gekommen ist
+
+import time
+import logging
+import numpy as np
+import cv2
+from utils.mjpeg import is_raw_jpeg, decode_frame
+
+class SettleDetector:
+    """Klasse zur Ruheerkennung über die Differenz aufeinanderfolgender Vorschau-Frames"""
+
+    def __init__(self, threshold=1.0, timeout=3.0, stable_frames=2, roi=0.6, width=160):
+        """Initialisiert den Detektor
+
+        threshold: mittlere absolute Differenz (Grauwerte 0-255), unter der der Teller als ruhig gilt
+        timeout: maximale Wartezeit in Sekunden
+        stable_frames: Anzahl aufeinanderfolgender ruhiger Frame-Paare
+        roi: Anteil der Bildbreite/-höhe um die Bildmitte, der ausgewertet wird
+        width: Breite des verkleinerten Auswertungsbildes in Pixeln
+        """
+        self.logger = logging.getLogger(__name__)
+        self.threshold = threshold
+        self.timeout = timeout
+        self.stable_frames = stable_frames
+        self.roi = roi
+        self.width = width
+
+    def prepare(self, frame):
+        """Wandelt einen Frame in ein kleines Graustufenbild des zentralen Ausschnitts um"""
+        if is_raw_jpeg(frame):
+            # MJPEG direkt in 1/8 Auflösung als Graustufen dekodieren
+            frame = decode_frame(frame, cv2.IMREAD_REDUCED_GRAYSCALE_8)
+            if frame is None:
+                return None
+        elif frame.ndim == 3:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+        height, width = frame.shape[:2]
+        margin_y = int(height * (1.0 - self.roi) / 2)
+        margin_x = int(width * (1.0 - self.roi) / 2)
+        frame = frame[margin_y:height - margin_y, margin_x:width - margin_x]
+
+        # Flächenmittelung unterdrückt gleichzeitig das Sensorrauschen
+        if frame.shape[1] > self.width:
+            new_height = max(1, int(frame.shape[0] * self.width / float(frame.shape[1])))
+            frame = cv2.resize(frame, (self.width, new_height), interpolation=cv2.INTER_AREA)
+
+        return frame.astype(np.int16)
+
+    @staticmethod
+    def motion(previous, current):
+        """Mittlere absolute Differenz zweier vorbereiteter Frames"""
+        if previous is None or current is None or previous.shape != current.shape:
+            return float('inf')
+        return float(np.mean(np.abs(current - previous)))
+
+    def wait(self, read_frame):
+        """Liest Frames, bis die Bewegung unter die Schwelle fällt oder das Timeout erreicht ist
+
+        read_frame: Funktion, die (ret, frame) liefert (z.B. CameraController.read_frame)
+        Gibt (settled, elapsed, last_motion) zurück.
+        """
+        start = time.monotonic()
+        previous = None
+        stable = 0
+        last_motion = float('inf')
+
+        while time.monotonic() - start < self.timeout:
+            ret, frame = read_frame()
+            if not ret:
+                self.logger.warning("Kein Frame für die Ruheerkennung verfügbar")
+                break
+
+            current = self.prepare(frame)
+            last_motion = self.motion(previous, current)
+            previous = current
+
+            if last_motion < self.threshold:
+                stable += 1
+                if stable >= self.stable_frames:
+                    elapsed = time.monotonic() - start
+                    self.logger.debug("Teller nach %.2f s ruhig (Differenz %.2f)", elapsed, last_motion)
+                    return True, elapsed, last_motion
+            else:
+                stable = 0
+
+        elapsed = time.monotonic() - start
+        self.logger.info("Ruheerkennung ohne Ergebnis nach %.2f s (Differenz %.2f)", elapsed, last_motion)
+        return False, elapsed, last_motion
@@ -0,0 +1,198 @@
+# Datei: utils/thumbnail_cache.py
+# Modul für Vorschaubilder (Thumbnails) mit Festplatten-Cache
+
+import os
+import hashlib
+import logging
+import threading
+
+class ThumbnailCache:
+    """Klasse zur Erzeugung und Zwischenspeicherung von Vorschaubildern"""
+
+    # Standardwerte für Vorschaubilder und Cache-Größe
+    DEFAULT_SIZE = 320
+    DEFAULT_MAX_BYTES = 200 * 1024 * 1024  # 200 MB
+    FORMATS = {
+        'jpeg': '.jpg',
+        'webp': '.webp'
+    }
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES, quality=80):
+        """Initialisiert den Thumbnail-Cache"""
+        self.logger = logging.getLogger(__name__)
+        self.cache_dir = os.path.join(cache_dir, 'thumbnails')
+        self.max_bytes = max_bytes
+        self.quality = quality
+        self._lock = threading.Lock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # Aktuelle Cache-Größe einmalig ermitteln, danach inkrementell pflegen
+        self.total_bytes = self._scan_cache_size()
+
+    def _scan_cache_size(self):
+        """Ermittelt die Gesamtgröße aller Dateien im Cache"""
+        total = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for filename in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, filename))
+                except OSError:
+                    pass
+        return total
+
+    def _cache_key(self, source_path, stat, size, fmt):
+        """Berechnet den Cache-Schlüssel aus Pfad, Änderungszeit und Größe"""
+        key = f"{os.path.abspath(source_path)}|{stat.st_mtime_ns}|{stat.st_size}|{size}|{fmt}"
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def get_cache_path(self, source_path, size=DEFAULT_SIZE, fmt='jpeg'):
+        """Gibt den Cache-Pfad für ein Vorschaubild zurück (ohne es zu erzeugen)"""
+        stat = os.stat(source_path)
+        key = self._cache_key(source_path, stat, size, fmt)
+        return os.path.join(self.cache_dir, key[:2], key + self.FORMATS[fmt])
+
+    def get_thumbnail(self, source_path, size=DEFAULT_SIZE, fmt='jpeg'):
+        """Gibt den Pfad zu einem Vorschaubild zurück und erzeugt es bei Bedarf"""
+        if fmt not in self.FORMATS:
+            self.logger.error(f"Nicht unterstütztes Thumbnail-Format: {fmt}")
+            return None
+
+        try:
+            cache_path = self.get_cache_path(source_path, size, fmt)
+        except OSError as e:
+            self.logger.error(f"Quellbild für Thumbnail nicht gefunden: {source_path} ({str(e)})")
+            return None
+
+        if os.path.exists(cache_path):
+            # Zugriffszeit aktualisieren, damit häufig genutzte Einträge nicht verdrängt werden
+            try:
+                os.utime(cache_path)
+            except OSError:
+                pass
+            return cache_path
+
+        if not self._create_thumbnail(source_path, cache_path, size, fmt):
+            return None
+
+        self._evict_if_needed()
+        return cache_path
+
+    def _create_thumbnail(self, source_path, cache_path, size, fmt):
+        """Erzeugt ein Vorschaubild mit reduzierter Dekodierung"""
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        temp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+
+        try:
+            try:
+                self._create_with_pillow(source_path, temp_path, size, fmt)
+            except Exception as e:
+                self.logger.debug(f"Pillow konnte Thumbnail nicht erzeugen ({str(e)}), verwende OpenCV")
+                if not self._create_with_opencv(source_path, temp_path, size, fmt):
+                    return False
+
+            # Atomar ersetzen, damit parallele Anfragen nie halbe Dateien sehen
+            os.replace(temp_path, cache_path)
+
+            with self._lock:
+                self.total_bytes += os.path.getsize(cache_path)
+
+            self.logger.debug(f"Thumbnail erstellt: {cache_path}")
+            return True
+        except Exception as e:
+            self.logger.error(f"Fehler beim Erstellen des Thumbnails für {source_path}: {str(e)}")
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            return False
+
+    def _create_with_pillow(self, source_path, output_path, size, fmt):
+        """Erzeugt ein Vorschaubild mit Pillow (JPEG-Draft-Modus dekodiert verkleinert)"""
+        from PIL import Image
+
+        with Image.open(source_path) as image:
+            # Bei JPEG skaliert der Decoder direkt in der DCT-Ebene (1/2, 1/4, 1/8)
+            image.draft('RGB', (size, size))
+
+            if fmt == 'jpeg' and image.mode != 'RGB':
+                image = image.convert('RGB')
+
+            image.thumbnail((size, size), Image.BILINEAR)
+
+            if fmt == 'jpeg':
+                image.save(output_path, 'JPEG', quality=self.quality, optimize=True)
+            else:
+                image.save(output_path, 'WEBP', quality=self.quality)
+
+    def _create_with_opencv(self, source_path, output_path, size, fmt):
+        """Erzeugt ein Vorschaubild mit OpenCV (reduzierte Dekodierung)"""
+        import cv2
+
+        image = cv2.imread(source_path, cv2.IMREAD_REDUCED_COLOR_4)
+        if image is None:
+            self.logger.error(f"Konnte Bild nicht laden: {source_path}")
+            return False
+
+        height, width = image.shape[:2]
+        scale = size / float(max(width, height))
+        if scale < 1.0:
+            image = cv2.resize(image, (max(1, int(width * scale)), max(1, int(height * scale))),
+                               interpolation=cv2.INTER_AREA)
+
+        if fmt == 'jpeg':
+            params = [cv2.IMWRITE_JPEG_QUALITY, self.quality]
+        else:
+            params = [cv2.IMWRITE_WEBP_QUALITY, self.quality]
+
+        success, buffer = cv2.imencode(self.FORMATS[fmt], image, params)
+        if not success:
+            return False
+
+        with open(output_path, 'wb') as f:
+            f.write(buffer.tobytes())
+        return True
+
+    def _evict_if_needed(self):
+        """Entfernt die am längsten nicht genutzten Einträge, wenn der Cache zu groß ist"""
+        with self._lock:
+            if self.total_bytes <= self.max_bytes:
+                return
+
+            entries = []
+            for root, _, files in os.walk(self.cache_dir):
+                for filename in files:
+                    file_path = os.path.join(root, filename)
+                    try:
+                        stat = os.stat(file_path)
+                        entries.append((stat.st_mtime, stat.st_size, file_path))
+                    except OSError:
+                        pass
+
+            # Älteste zuerst löschen, bis 90 % der Maximalgröße erreicht sind
+            entries.sort()
+            target = int(self.max_bytes * 0.9)
+            total = sum(entry[1] for entry in entries)
+            removed = 0
+
+            for _, file_size, file_path in entries:
+                if total <= target:
+                    break
+                try:
+                    os.unlink(file_path)
+                    total -= file_size
+                    removed += 1
+                except OSError:
+                    pass
+
+            self.total_bytes = total
+            self.logger.info(f"Thumbnail-Cache bereinigt: {removed} Dateien entfernt")
+
+    def clear(self):
+        """Löscht alle Vorschaubilder aus dem Cache"""
+        with self._lock:
+            for root, _, files in os.walk(self.cache_dir):
+                for filename in files:
+                    try:
+                        os.unlink(os.path.join(root, filename))
+                    except OSError:
+                        pass
+            self.total_bytes = 0
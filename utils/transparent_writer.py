@@ -0,0 +1,184 @@
+# Datei: utils/transparent_writer.py
+# Modul zum kompakten Speichern freigestellter Bilder (WebP/AVIF mit Alpha, JPEG + Maske, PNG)
+
+import os
+import json
+import logging
+import threading
+import numpy as np
+import cv2
+from utils.metrics import IMAGE_WRITE_SECONDS
+
+class TransparentWriter:
+    """Speichert Bild und Maske als transparentes Bild, optional auf den Alpha-Rahmen beschnitten
+
+    Formate:
+      png  - verlustfrei (BGRA), Kompressionsstufe einstellbar
+      webp - verlustbehaftet mit Alphakanal
+      avif - verlustbehaftet mit Alphakanal (falls OpenCV mit AVIF gebaut ist)
+      jpeg - Farbbild als JPEG und Maske als separates PNG (<name>_mask.png)
+
+    Beim Beschneiden werden Versatz und Originalgröße in transparent.json im
+    Ausgabeverzeichnis abgelegt, so dass sich das Vollbild rekonstruieren lässt.
+    Vollständig transparente Pixel werden auf Schwarz gesetzt (vormultipliziert),
+    damit sie sich besser komprimieren lassen.
+    """
+
+    META_FILE = 'transparent.json'
+    EXTENSIONS = {'png': '.png', 'webp': '.webp', 'avif': '.avif', 'jpeg': '.jpg'}
+
+    def __init__(self, fmt='png', quality=85, png_compression=3, trim=False, mask_bits=8):
+        """Initialisiert den Writer
+
+        quality: Qualität für webp/avif/jpeg (0-100)
+        png_compression: zlib-Stufe für PNG (0-9, niedriger = schneller)
+        trim: auf den Rahmen der Maske beschneiden
+        mask_bits: 1 oder 8 Bit für die separate Maske (Format jpeg)
+        """
+        self.logger = logging.getLogger(__name__)
+        if fmt not in self.EXTENSIONS:
+            raise ValueError(f"Nicht unterstütztes Format für transparente Bilder: {fmt}")
+        if fmt == 'avif' and not cv2.haveImageWriter('.avif'):
+            self.logger.warning("OpenCV unterstützt kein AVIF, verwende WebP")
+            fmt = 'webp'
+
+        self.format = fmt
+        self.quality = quality
+        self.png_compression = png_compression
+        self.trim = trim
+        self.mask_bits = mask_bits
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Erstellt den Writer aus den Einstellungen"""
+        return cls(settings.transparent_format, settings.transparent_quality,
+                   settings.png_compression, settings.transparent_trim)
+
+    def output_path(self, output_path):
+        """Pfad der Ausgabedatei mit der Endung des gewählten Formats"""
+        return os.path.splitext(output_path)[0] + self.EXTENSIONS[self.format]
+
+    @staticmethod
+    def mask_path(output_path):
+        """Pfad der separaten Maske (Format jpeg)"""
+        return os.path.splitext(output_path)[0] + '_mask.png'
+
+    def _params(self):
+        """Kodierparameter des gewählten Formats"""
+        if self.format == 'png':
+            return [cv2.IMWRITE_PNG_COMPRESSION, self.png_compression]
+        if self.format == 'webp':
+            return [cv2.IMWRITE_WEBP_QUALITY, self.quality]
+        if self.format == 'avif':
+            return [cv2.IMWRITE_AVIF_QUALITY, self.quality]
+        return [cv2.IMWRITE_JPEG_QUALITY, self.quality, cv2.IMWRITE_JPEG_OPTIMIZE, 1]
+
+    def write(self, image, mask, output_path):
+        """Speichert ein BGR-Bild mit Maske und gibt den Metadaten-Eintrag zurück (None bei Fehler)"""
+        full_height, full_width = image.shape[:2]
+        x, y, width, height = 0, 0, full_width, full_height
+        if self.trim:
+            x, y, width, height = cv2.boundingRect(mask)
+            if width == 0 or height == 0:
+                # Kein Objekt: ein einzelnes transparentes Pixel speichern
+                x, y, width, height = 0, 0, 1, 1
+
+        region = image[y:y + height, x:x + width]
+        alpha = mask[y:y + height, x:x + width]
+
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        path = self.output_path(output_path)
+
+        # Farbe unter vollständig transparenten Pixeln verwerfen
+        color = cv2.bitwise_and(region, region, mask=alpha)
+        with IMAGE_WRITE_SECONDS.time(kind='transparent'):
+            if self.format == 'jpeg':
+                if self.mask_bits == 1:
+                    mask_params = [cv2.IMWRITE_PNG_BILEVEL, 1]
+                else:
+                    mask_params = [cv2.IMWRITE_PNG_COMPRESSION, self.png_compression]
+                success = (cv2.imwrite(path, color, self._params())
+                           and cv2.imwrite(self.mask_path(path), alpha, mask_params))
+            else:
+                bgra = cv2.merge((color[:, :, 0], color[:, :, 1], color[:, :, 2], alpha))
+                success = cv2.imwrite(path, bgra, self._params())
+
+        if not success:
+            self.logger.error(f"Transparentes Bild konnte nicht gespeichert werden: {path}")
+            return None
+
+        entry = {
+            'file': os.path.basename(path),
+            'mask': os.path.basename(self.mask_path(path)) if self.format == 'jpeg' else None,
+            'format': self.format,
+            'offset': [int(x), int(y)],
+            'size': [int(width), int(height)],
+            'full_size': [int(full_width), int(full_height)]
+        }
+        self._update_metadata(output_dir, entry)
+        return entry
+
+    def _update_metadata(self, directory, entry):
+        """Trägt ein Bild in die Metadaten des Verzeichnisses ein (atomar)"""
+        meta_path = os.path.join(directory, self.META_FILE)
+        with self._lock:
+            metadata = self.load_metadata(directory)
+            metadata[os.path.splitext(entry['file'])[0]] = entry
+            with open(meta_path + '.tmp', 'w') as f:
+                json.dump(metadata, f, indent=4)
+            os.replace(meta_path + '.tmp', meta_path)
+
+    @classmethod
+    def load_metadata(cls, directory):
+        """Lädt die Metadaten eines Verzeichnisses (leer, falls nicht vorhanden)"""
+        meta_path = os.path.join(directory, cls.META_FILE)
+        if not os.path.exists(meta_path):
+            return {}
+        try:
+            with open(meta_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @classmethod
+    def read(cls, directory, name, metadata=None):
+        """Liest ein transparentes Bild als (Farbbild, Alpha, Versatz, Originalgröße) oder None
+
+        name: Dateiname ohne Endung (z.B. angle_000); ohne Metadaten wird ein
+        ungeschnittenes PNG angenommen.
+        """
+        metadata = cls.load_metadata(directory) if metadata is None else metadata
+        entry = metadata.get(name)
+        if entry is None:
+            entry = {'file': name + '.png', 'mask': None, 'offset': [0, 0], 'full_size': None}
+
+        path = os.path.join(directory, entry['file'])
+        if not os.path.exists(path):
+            return None
+
+        if entry.get('mask'):
+            color = cv2.imread(path)
+            alpha = cv2.imread(os.path.join(directory, entry['mask']), cv2.IMREAD_GRAYSCALE)
+        else:
+            image = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+            if image is None or image.ndim != 3 or image.shape[2] != 4:
+                return None
+            color, alpha = image[:, :, :3], image[:, :, 3]
+        if color is None or alpha is None:
+            return None
+
+        full_size = entry.get('full_size') or [alpha.shape[1], alpha.shape[0]]
+        return color, alpha, tuple(entry['offset']), tuple(full_size)
+
+    @staticmethod
+    def expand(color, alpha, offset, full_size):
+        """Setzt ein beschnittenes Bild wieder in ein BGRA-Vollbild ein"""
+        full = np.zeros((full_size[1], full_size[0], 4), dtype=np.uint8)
+        x, y = offset
+        height, width = alpha.shape[:2]
+        full[y:y + height, x:x + width, :3] = color
+        full[y:y + height, x:x + width, 3] = alpha
+        return full
@@ -6,8 +6,10 @@ Dieses Skript startet die Weboberfläche für die Drehteller-Steuerung.
 
 import os
 import sys
+import argparse
 import logging
 from app import create_app
+from app.server import run_server, SERVER_TYPES
 from app.services.config_manager import config_manager
 
 # Konfiguriere Logging
@@ -23,6 +25,13 @@ logger = logging.getLogger('drehteller360')
 
 def main():
     """Hauptfunktion zum Starten der Anwendung"""
+    parser = argparse.ArgumentParser(description='Drehteller 360° Weboberfläche')
+    parser.add_argument('--server', choices=SERVER_TYPES,
+                        help='Servertyp (überschreibt web.server aus der Konfiguration)')
+    parser.add_argument('--threads', type=int,
+                        help='Anzahl der Request-Threads (überschreibt web.threads)')
+    args = parser.parse_args()
+    
     # Stelle sicher, dass die erforderlichen Verzeichnisse existieren
     os.makedirs('static/photos', exist_ok=True)
     os.makedirs('static/test', exist_ok=True)
@@ -33,10 +42,9 @@ def main():
     # Starte die Flask-App
     host = config_manager.get('web.host', '0.0.0.0')
     port = config_manager.get('web.port', 5000)
-    debug = config_manager.get('web.debug', True)
     
     logger.info(f"Starte Drehteller 360° Weboberfläche auf {host}:{port}")
-    app.run(host=host, port=port, debug=debug)
+    run_server(app, config_manager, server=args.server, threads=args.threads)
 
 if __name__ == '__main__':
     main()